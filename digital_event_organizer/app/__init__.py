@@ -3,7 +3,7 @@ Flask Application Factory
 Creates and configures the Flask application instance
 """
 
-from flask import Flask
+from flask import Flask, request
 from flask_mail import Mail
 import os
 from dotenv import load_dotenv
@@ -38,16 +38,58 @@ def create_app():
     app.config['RAZORPAY_KEY_ID'] = os.getenv('RAZORPAY_KEY_ID', '')
     app.config['RAZORPAY_KEY_SECRET'] = os.getenv('RAZORPAY_KEY_SECRET', '')
     
+    # Ticket signing (falls back to SECRET_KEY)
+    app.config['TICKET_SECRET'] = os.getenv('TICKET_SECRET', '')
+    
     # Initialize extensions
     mail.init_app(app)
     
+    # Admin-requested CPU/memory profiles of single requests (PROFILING=1)
+    from app.utils import profiling
+    profiling.init_app(app)
+    
+    # Server-Timing header, access log and query counts per request
+    from app.utils import request_timing
+    request_timing.init_app(app)
+    
+    # Fragment cache helper for templates
+    from app.utils import page_cache
+    page_cache.init_app(app)
+    
     # Register blueprints (routes)
-    from app.routes import user_routes, admin_routes, event_routes, payment_routes
+    from app.routes import user_routes, admin_routes, event_routes, payment_routes, api_routes, metrics_routes
     
     app.register_blueprint(user_routes.user_bp)
     app.register_blueprint(admin_routes.admin_bp)
     app.register_blueprint(event_routes.event_bp)
     app.register_blueprint(payment_routes.payment_bp)
+    app.register_blueprint(api_routes.api_bp)
+    app.register_blueprint(metrics_routes.metrics_bp)
+    
+    # Each worker tails the change outbox to evict caches after writes
+    # made by other workers (started on its first request, after forking)
+    from app.models.change import change_feed
+    app.before_request(change_feed.start)
+    
+    # With METRICS_DIR set, each worker also writes its metrics there so
+    # any worker can answer a scrape for all of them
+    from app.utils.metrics import start_flusher
+    app.before_request(start_flusher)
+    
+    # In debug mode, report lookups served from the request identity map
+    @app.after_request
+    def report_identity_map(response):
+        if app.debug:
+            from app.utils.identity_map import queries_avoided
+            avoided = queries_avoided()
+            if avoided:
+                response.headers['X-Queries-Avoided'] = str(avoided)
+                app.logger.debug(f"{request.path}: {avoided} queries avoided by identity map")
+        return response
+    
+    # Register CLI commands
+    from app.cli import register_commands
+    register_commands(app)
     
     # Home route
     @app.route('/')
@@ -0,0 +1,103 @@
+"""
+CLI Commands
+Maintenance and batch jobs run with the `flask` command
+"""
+
+import click
+
+def register_commands(app):
+    """Attach all CLI commands to the Flask application"""
+    
+    @app.cli.command('export-analytics')
+    @click.option('--out', 'out_dir', default='exports/registrations', show_default=True,
+                  help='Directory for the partitioned dataset')
+    @click.option('--chunk-size', default=50000, show_default=True,
+                  help='Registrations read per database round trip')
+    @click.option('--format', 'file_format', type=click.Choice(['parquet', 'arrow']),
+                  default='parquet', show_default=True)
+    @click.option('--full', is_flag=True, help='Ignore the watermark and export everything')
+    def export_analytics(out_dir, chunk_size, file_format, full):
+        """Export registrations, events and payments for analytics"""
+        from app.utils.analytics_export import export_registrations
+        
+        result = export_registrations(out_dir, chunk_size, file_format, full)
+        
+        if result is None:
+            raise click.ClickException("Export failed")
+        
+        click.echo(f"Exported {result['rows']} rows into {len(result['partitions'])} "
+                   f"partitions in {result['seconds']}s (watermark {result['watermark']})")
+        
+        if result['changed_rows'] is not None:
+            click.echo(f"Re-exported {result['changed_rows']} rows of changed registrations")
+        elif not full:
+            click.echo("No change watermark yet: status and payment changes made before "
+                       "this run are not included (use --full to rebuild)")
+    
+    @app.cli.command('snapshot')
+    @click.option('--out', 'out_root', default='snapshot', show_default=True,
+                  help='Snapshot root; nginx serves <out>/current')
+    @click.option('--workers', default=8, show_default=True, help='Rendering threads')
+    @click.option('--full', is_flag=True, help='Render every event, not only changed ones')
+    @click.option('--keep', default=3, show_default=True, help='Releases to keep on disk')
+    def snapshot(out_root, workers, full, keep):
+        """Render public event pages to static HTML and JSON"""
+        from app.utils.static_snapshot import build_snapshot
+        
+        result = build_snapshot(app, out_root, workers, full, keep)
+        
+        if result is None:
+            raise click.ClickException("Snapshot failed")
+        
+        click.echo(f"Published release {result['release']}: {result['pages']} pages, "
+                   f"{result['events_rendered']} events rendered, {result['events_reused']} reused, "
+                   f"{result['events_removed']} removed in {result['seconds']}s")
+    
+    @app.cli.command('promote-waitlist')
+    @click.option('--event', 'event_id', type=int, help='Only this event (default: all with free seats)')
+    @click.option('--limit', type=int, help='Maximum users promoted per event')
+    def promote_waitlist(event_id, limit):
+        """Fill free seats from event waitlists"""
+        from app.controllers.waitlist_controller import WaitlistController
+        
+        if event_id is not None:
+            success, message, promoted = WaitlistController.promote(event_id, limit)
+            if not success:
+                raise click.ClickException(message)
+            click.echo(message)
+            return
+        
+        results = WaitlistController.promote_all(limit)
+        
+        if results is None:
+            raise click.ClickException("Waitlist promotion failed")
+        
+        click.echo(f"Promoted {sum(results.values())} user(s) across {len(results)} event(s)")
+    
+    @app.cli.command('send-reminders')
+    @click.option('--hours', default=24, show_default=True,
+                  help='Remind about events starting within this many hours')
+    def send_reminders(hours):
+        """Post reminder notifications to attendees of upcoming events"""
+        from app.controllers.notification_controller import NotificationController
+        
+        results = NotificationController.send_reminders(hours)
+        
+        if results is None:
+            raise click.ClickException("Sending reminders failed")
+        
+        click.echo(f"Sent {sum(results.values())} reminder(s) for {len(results)} event(s)")
+    
+    @app.cli.command('prune-changes')
+    @click.option('--hours', default=24, show_default=True,
+                  help='Keep changes younger than this many hours')
+    def prune_changes(hours):
+        """Delete old rows from the change outbox"""
+        from app.models.change import Change
+        
+        deleted = Change.prune(hours)
+        
+        if deleted is None:
+            raise click.ClickException("Pruning the change outbox failed")
+        
+        click.echo(f"Deleted {deleted} change(s) older than {hours} hour(s)")
@@ -7,5 +7,9 @@ from .user_controller import UserController
 from .admin_controller import AdminController
 from .event_controller import EventController
 from .payment_controller import PaymentController
+from .waitlist_controller import WaitlistController
+from .seat_controller import SeatController
+from .checkin_controller import CheckinController
+from .notification_controller import NotificationController
 
-__all__ = ['UserController', 'AdminController', 'EventController', 'PaymentController']
+__all__ = ['UserController', 'AdminController', 'EventController', 'PaymentController', 'WaitlistController', 'SeatController', 'CheckinController', 'NotificationController']
@@ -7,6 +7,18 @@ from app.models.user import User
 from app.models.event import Event
 from app.models.registration import Registration
 from app.models.payment import Payment
+from app.controllers.seat_controller import SeatController
+from app.utils.csv_export import iter_csv
+from app.models.change import change_feed
+from app.utils.cache import cache_stats
+
+# Rows per page on the participants and payments tables
+PAGE_SIZE = 50
+
+PARTICIPANT_CSV_COLUMNS = ['registration_id', 'name', 'email', 'phone',
+                           'registration_date', 'status', 'payment_required']
+PAYMENT_CSV_COLUMNS = ['payment_id', 'registration_id', 'name', 'email', 'amount',
+                       'payment_status', 'transaction_id', 'payment_method', 'payment_date']
 
 class AdminController:
     """Controller for admin operations"""
@@ -62,7 +74,9 @@ class AdminController:
             'upcoming_events': len(upcoming_events),
             'total_users': len(all_users),
             'total_registrations': 0,
-            'total_revenue': 0.0
+            'total_revenue': 0.0,
+            'caches': cache_stats(),
+            'change_feed': change_feed.stats()
         }
         
         # Calculate total registrations and revenue
@@ -79,9 +93,9 @@ class AdminController:
         Get all events for admin
         
         Returns:
-            List of events
+            List of events (compact rows)
         """
-        return Event.get_all_events()
+        return Event.get_all_events(compact=True)
     
     @staticmethod
     def get_event_participants(event_id):
@@ -109,12 +123,129 @@ class AdminController:
         """
         return Payment.get_event_payments(event_id)
     
+    @staticmethod
+    def get_event_participants_page(event_id, page=1, per_page=PAGE_SIZE):
+        """
+        Get one page of participants for an event
+        
+        Args:
+            event_id: Event ID
+            page: Page number (1-based)
+            per_page: Rows per page
+        
+        Returns:
+            Pagination dictionary (items, page, per_page, total, pages)
+        """
+        total = Registration.count_event_registrations(event_id)
+        page = _clamp_page(page, total, per_page)
+        items = Registration.get_event_registrations_page(
+            event_id, per_page, (page - 1) * per_page, compact=True
+        ) or []
+        return _pagination(items, page, per_page, total)
+    
+    @staticmethod
+    def get_event_payments_page(event_id, page=1, per_page=PAGE_SIZE):
+        """
+        Get one page of payments for an event
+        
+        Args:
+            event_id: Event ID
+            page: Page number (1-based)
+            per_page: Rows per page
+        
+        Returns:
+            Pagination dictionary (items, page, per_page, total, pages)
+        """
+        total = Payment.count_event_payments(event_id)
+        page = _clamp_page(page, total, per_page)
+        items = Payment.get_event_payments_page(
+            event_id, per_page, (page - 1) * per_page, compact=True
+        ) or []
+        return _pagination(items, page, per_page, total)
+    
+    @staticmethod
+    def confirm_registrations(event_id, registration_ids):
+        """
+        Confirm several pending registrations of an event at once
+        
+        Args:
+            event_id: Event ID
+            registration_ids: List of registration IDs
+        
+        Returns:
+            Tuple: (success: Boolean, message: str)
+        """
+        ids = list(dict.fromkeys(int(rid) for rid in registration_ids if str(rid).isdigit()))
+        
+        if not ids:
+            return False, "No registrations selected"
+        
+        # Only pending registrations hold a place in current_participants;
+        # cancelled ones must not come back without taking one
+        confirmed = Registration.update_registrations_status(ids, 'confirmed', event_id,
+                                                             from_status='pending')
+        
+        if confirmed is None:
+            return False, "Failed to confirm registrations"
+        
+        if confirmed:
+            SeatController.confirm_seats(confirmed)
+        
+        skipped = len(ids) - len(confirmed)
+        message = f"{len(confirmed)} registration(s) confirmed"
+        if skipped:
+            message += f" ({skipped} skipped, not pending)"
+        return True, message
+    
+    @staticmethod
+    def export_event_participants_csv(event_id):
+        """
+        Stream all participants of an event as CSV
+        
+        Args:
+            event_id: Event ID
+        
+        Returns:
+            Generator of CSV text chunks
+        """
+        rows = Registration.iter_event_registrations(event_id)
+        return iter_csv(rows, PARTICIPANT_CSV_COLUMNS)
+    
+    @staticmethod
+    def export_event_payments_csv(event_id):
+        """
+        Stream all payments of an event as CSV
+        
+        Args:
+            event_id: Event ID
+        
+        Returns:
+            Generator of CSV text chunks
+        """
+        rows = Payment.iter_event_payments(event_id)
+        return iter_csv(rows, PAYMENT_CSV_COLUMNS)
+    
     @staticmethod
     def get_all_users():
         """
         Get all users
         
         Returns:
-            List of users
+            List of users (compact rows)
         """
-        return User.get_all_users()
+        return User.get_all_users(compact=True)
+
+def _clamp_page(page, total, per_page):
+    """Keep a requested page number within the available range"""
+    last_page = max(1, -(-total // per_page))
+    return min(max(1, page), last_page)
+
+def _pagination(items, page, per_page, total):
+    """Build the pagination dictionary used by admin templates"""
+    return {
+        'items': items,
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'pages': max(1, -(-total // per_page))
+    }
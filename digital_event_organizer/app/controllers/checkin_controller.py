@@ -0,0 +1,219 @@
+"""
+Check-in Controller
+Handles ticket issuance and gate check-in
+"""
+
+import os
+from datetime import datetime
+from app.models.checkin import Checkin
+from app.models.event import Event
+from app.models.registration import Registration
+from app.models.change import change_feed
+from app.utils.checkin_buffer import CheckinBuffer
+from app.utils.id_codec import encode_ids
+from app.utils.metrics import Gauge, register_collector
+from app.utils.tickets import get_signer, qr_svg
+
+# Scans are deduplicated in memory and written in batches
+checkin_buffer = CheckinBuffer(
+    Checkin.record_many, Checkin.get_event_state,
+    batch_size=int(os.getenv('CHECKIN_BATCH_SIZE', 200)),
+    flush_interval=float(os.getenv('CHECKIN_FLUSH_INTERVAL', 2.0)),
+    max_age=int(os.getenv('CHECKIN_STATE_MAX_AGE', 60))
+)
+# Tickets revoked or scanned offline through other workers
+change_feed.subscribe('tickets', checkin_buffer.invalidate)
+
+CHECKIN_PENDING = Gauge('checkin_pending_scans', 'Gate scans waiting for the next batched write')
+register_collector(lambda: [(CHECKIN_PENDING, (), checkin_buffer.pending_count())])
+
+# Delta snapshots repeat this many seconds before the device's version,
+# so changes committed late in the same second are not missed
+SYNC_OVERLAP_SECONDS = 5
+
+# Largest offline upload accepted in one request
+MAX_SYNC_SCANS = 200000
+
+class CheckinController:
+    """Controller for ticket and check-in operations"""
+    
+    @staticmethod
+    def get_ticket(registration_id, user_id):
+        """
+        Issue the ticket of a confirmed registration
+        
+        Args:
+            registration_id: Registration ID
+            user_id: User ID (must own the registration)
+        
+        Returns:
+            Tuple: (success: Boolean, message: str, ticket: dict or None)
+            The ticket has token, qr_svg (None without the qrcode
+            package) and the event.
+        """
+        registration = Registration.get_registration_by_id(registration_id)
+        
+        if not registration or registration['user_id'] != user_id:
+            return False, "Registration not found", None
+        
+        if registration['status'] != 'confirmed':
+            return False, "Tickets are issued once the registration is confirmed", None
+        
+        event = Event.get_event_by_id(registration['event_id'])
+        token = get_signer().sign(registration_id, registration['event_id'], user_id)
+        
+        return True, "", {'token': token, 'qr_svg': qr_svg(token), 'event': event}
+    
+    @staticmethod
+    def scan(token, event_id=None, gate=None):
+        """
+        Check in the holder of a scanned ticket
+        
+        The signature proves the ticket was issued by us, so a valid
+        ticket needs no database read; duplicates and cancelled
+        registrations are caught by the in-memory check-in state.
+        
+        Args:
+            token: Scanned ticket token
+            event_id: Event this gate admits (optional)
+            gate: Gate name stored with the check-in (optional)
+        
+        Returns:
+            Tuple: (status: str, message: str, data: dict or None)
+            status is 'ok', 'duplicate', 'invalid', 'wrong_event',
+            'revoked' or 'error'.
+        """
+        ticket = get_signer().verify(token or '')
+        
+        if ticket is None:
+            return 'invalid', "Invalid ticket", None
+        
+        registration_id, ticket_event_id, user_id = ticket
+        data = {'registration_id': registration_id, 'event_id': ticket_event_id, 'user_id': user_id}
+        
+        if event_id is not None and ticket_event_id != event_id:
+            return 'wrong_event', "Ticket is for another event", data
+        
+        status, scanned_at = checkin_buffer.record(registration_id, ticket_event_id, user_id, gate)
+        
+        if status == 'revoked':
+            # The state may predate a late confirmation; the database decides
+            registration = Registration.get_registration_by_id(registration_id)
+            if registration and registration['status'] == 'confirmed':
+                checkin_buffer.allow(ticket_event_id, registration_id)
+                status, scanned_at = checkin_buffer.record(registration_id, ticket_event_id, user_id, gate)
+        
+        if status == 'ok':
+            data['checked_in_at'] = scanned_at
+            return 'ok', "Checked in", data
+        if status == 'duplicate':
+            data['checked_in_at'] = scanned_at
+            return 'duplicate', f"Already checked in at {scanned_at:%H:%M:%S}", data
+        if status == 'revoked':
+            return 'revoked', "Registration is not confirmed", data
+        return 'error', "Check-in is unavailable. Please try again.", data
+    
+    @staticmethod
+    def get_snapshot(event_id, since=None):
+        """
+        Build the registration snapshot of an offline scanner
+        
+        ID lists are encoded with id_codec.encode_ids. A device applies a
+        delta by adding valid IDs, and by removing revoked IDs from its
+        valid set; applying the same delta twice is harmless.
+        
+        Args:
+            event_id: Event ID
+            since: Version of the device's last snapshot, or None for a
+                full snapshot
+        
+        Returns:
+            Tuple: (success: Boolean, message: str, snapshot: dict or None)
+        """
+        if not Event.get_event_by_id(event_id):
+            return False, "Event not found", None
+        
+        snapshot = Checkin.get_snapshot(
+            event_id, None if since is None else max(since - SYNC_OVERLAP_SECONDS, 0)
+        )
+        
+        if snapshot is None:
+            return False, "Could not load the snapshot. Please try again.", None
+        
+        return True, "", {
+            'event_id': event_id,
+            'version': snapshot['version'],
+            'full': since is None,
+            'encoding': 'delta-varint-base64',
+            'counts': {name: len(snapshot[name]) for name in ('valid', 'revoked', 'checked_in')},
+            'valid': encode_ids(snapshot['valid']),
+            'revoked': encode_ids(snapshot['revoked']),
+            'checked_in': encode_ids(snapshot['checked_in'])
+        }
+    
+    @staticmethod
+    def sync_scans(event_id, scans, device=None):
+        """
+        Merge the scans an offline scanner uploads
+        
+        Args:
+            event_id: Event ID
+            scans: List of [registration_id, unix_time] pairs
+            device: Device or gate name stored with the check-ins
+        
+        Returns:
+            Tuple: (success: Boolean, message: str, result: dict or None)
+            The result has accepted (number of merged scans) and rejected
+            (registration IDs that are not confirmed for the event).
+        """
+        if not isinstance(scans, list) or len(scans) > MAX_SYNC_SCANS:
+            return False, f"scans must be a list of at most {MAX_SYNC_SCANS} items", None
+        
+        parsed = []
+        try:
+            for registration_id, scanned_at in scans:
+                if not isinstance(registration_id, int) or not isinstance(scanned_at, (int, float)):
+                    raise ValueError
+                parsed.append((registration_id, datetime.fromtimestamp(scanned_at)))
+        except (TypeError, ValueError, OverflowError, OSError):
+            return False, "Each scan must be [registration_id, unix_time]", None
+        
+        if not Event.get_event_by_id(event_id):
+            return False, "Event not found", None
+        
+        merged = Checkin.merge_scans(event_id, parsed, device)
+        
+        if merged is None:
+            return False, "Could not save the scans. Please upload them again.", None
+        
+        rows, rejected = merged
+        checkin_buffer.merge(event_id, rows)
+        
+        return True, f"{len(rows)} scans merged", {'accepted': len(rows), 'rejected': rejected}
+    
+    @staticmethod
+    def revoke_ticket(event_id, registration_id):
+        """Refuse a cancelled registration's ticket right away in every worker"""
+        checkin_buffer.revoke(event_id, registration_id)
+        change_feed.publish('tickets', event_id)
+    
+    @staticmethod
+    def get_stats(event_id):
+        """
+        Get check-in progress of an event
+        
+        Args:
+            event_id: Event ID
+        
+        Returns:
+            Dictionary with checked_in, expected, pending (scans not
+            written yet) and recent check-ins
+        """
+        counts = Checkin.count_checked_in(event_id) or {'checked_in': 0, 'expected': 0}
+        
+        return {
+            'checked_in': counts['checked_in'],
+            'expected': counts['expected'],
+            'pending': checkin_buffer.pending_count(),
+            'recent': Checkin.get_recent(event_id) or []
+        }
@@ -3,11 +3,97 @@ Event Controller
 Handles event-related business logic
 """
 
-from app.models.event import Event
+from app.models.event import Event, seat_feed
+from app.models.change import change_feed
 from app.models.registration import Registration
+from app.models.user import User
+from app.controllers.waitlist_controller import WaitlistController
+from app.controllers.seat_controller import SeatController
+from app.controllers.checkin_controller import CheckinController
+from app.controllers.notification_controller import NotificationController
 from app.utils.validators import validate_date, validate_time, validate_required_fields
-from app.utils.email_service import send_registration_confirmation
-from datetime import datetime
+from app.utils.email_service import (send_registration_confirmation, send_bulk_emails,
+                                     registration_confirmation_email)
+from app.utils.venue_schedule import VenueSchedule, venue_key
+from app.utils.db_config import named_lock
+from datetime import datetime, date, time, timedelta
+import hashlib
+import os
+import mysql.connector
+
+# Calendar feeds cover events from a month ago to a year ahead
+FEED_PAST_DAYS = 30
+FEED_FUTURE_DAYS = 365
+
+# Largest team one member may register, leader included
+MAX_GROUP_SIZE = 20
+
+DEFAULT_DURATION_MINUTES = 120
+MAX_DURATION_MINUTES = 7 * 24 * 60
+
+# Interval index of venue bookings, used to reject double bookings
+# without scanning the events table
+venue_schedule = VenueSchedule(
+    Event.get_schedule_rows,
+    max_age=int(os.getenv('VENUE_INDEX_MAX_AGE', 300)),
+    range_loader=lambda start, end: Event.get_schedule_rows_between(start, end, MAX_DURATION_MINUTES)
+)
+# Events created, moved or deleted by other workers
+change_feed.subscribe('event', lambda event_id: venue_schedule.invalidate())
+
+def _combine(event_date, event_time):
+    """Combine form strings or database values into a start datetime"""
+    if isinstance(event_date, str):
+        event_date = datetime.strptime(event_date, '%Y-%m-%d').date()
+    if isinstance(event_time, timedelta):
+        # TIME columns come back as timedelta
+        return datetime.combine(event_date, time.min) + event_time
+    if isinstance(event_time, str):
+        time_format = '%H:%M:%S' if event_time.count(':') == 2 else '%H:%M'
+        event_time = datetime.strptime(event_time, time_format).time()
+    return datetime.combine(event_date, event_time)
+
+def _parse_duration(value):
+    """Parse a duration in minutes, returning None if invalid"""
+    try:
+        minutes = int(value)
+    except (TypeError, ValueError):
+        return None
+    return minutes if 0 < minutes <= MAX_DURATION_MINUTES else None
+
+def _deadline_passed(event):
+    """Check whether an event's registration deadline has passed"""
+    if not event['registration_deadline']:
+        return False
+    deadline = datetime.strptime(str(event['registration_deadline']), '%Y-%m-%d')
+    return datetime.now() > deadline
+
+def _parse_emails(value):
+    """Split a comma/whitespace separated list of emails, dropping duplicates"""
+    if isinstance(value, str):
+        value = value.replace(',', ' ').split()
+    emails = []
+    for email in value or []:
+        email = str(email).strip().lower()
+        if email and email not in emails:
+            emails.append(email)
+    return emails
+
+def _venue_lock(venue):
+    """
+    Named lock serializing bookings of one venue across all workers, so
+    two admins can't both find a slot free and both book it
+    """
+    return named_lock('venue:' + hashlib.sha1(venue_key(venue).encode('utf-8')).hexdigest())
+
+def _conflict_message(conflicts):
+    """Describe the first conflicting booking"""
+    booking = conflicts[0]
+    message = (f"Venue is already booked for '{booking['title']}' "
+               f"({booking['starts_at']:%Y-%m-%d %H:%M} - {booking['ends_at']:%H:%M})")
+    if len(conflicts) > 1:
+        message += f" and {len(conflicts) - 1} other event(s)"
+    return message
 
 class EventController:
     """Controller for event operations"""
@@ -49,22 +135,46 @@ class EventController:
         if registration_deadline and not validate_date(registration_deadline):
             return False, "Invalid registration deadline format", None
         
-        # Create event
-        event_id = Event.create_event(
-            title=data['title'].strip(),
-            description=data['description'].strip(),
-            event_date=data['event_date'],
-            event_time=data['event_time'],
-            venue=data['venue'].strip(),
-            category=data['category'].strip(),
-            price=price,
-            is_paid=is_paid,
-            max_participants=max_participants,
-            registration_deadline=registration_deadline,
-            created_by=admin_id
-        )
+        duration = _parse_duration(data.get('duration_minutes') or DEFAULT_DURATION_MINUTES)
+        if duration is None:
+            return False, "Invalid duration", None
+        
+        starts_at = _combine(data['event_date'], data['event_time'])
+        
+        # Reject double bookings of the venue; the check and the insert
+        # run under the venue's lock
+        try:
+            with _venue_lock(data['venue']):
+                conflicts = venue_schedule.find_conflicts(data['venue'], starts_at, duration,
+                                                          verify=True)
+                if conflicts is None:
+                    # Not knowing the bookings must not let a double booking through
+                    return False, "Could not check the venue schedule, please try again", None
+                if conflicts:
+                    return False, _conflict_message(conflicts), None
+                
+                # Create event
+                event_id = Event.create_event(
+                    title=data['title'].strip(),
+                    description=data['description'].strip(),
+                    event_date=data['event_date'],
+                    event_time=data['event_time'],
+                    venue=data['venue'].strip(),
+                    category=data['category'].strip(),
+                    price=price,
+                    is_paid=is_paid,
+                    max_participants=max_participants,
+                    registration_deadline=registration_deadline,
+                    created_by=admin_id,
+                    duration_minutes=duration
+                )
+        except mysql.connector.Error as err:
+            print(f"Venue lock error: {err}")
+            return False, "Could not check the venue schedule, please try again", None
         
         if event_id:
+            venue_schedule.upsert(event_id, data['title'].strip(), data['venue'].strip(),
+                                  starts_at, duration)
             return True, "Event created successfully", event_id
         else:
             return False, "Failed to create event", None
@@ -89,10 +199,42 @@ class EventController:
         if 'event_time' in data and not validate_time(data['event_time']):
             return False, "Invalid time format"
         
-        # Update event
-        affected = Event.update_event(event_id, **data)
+        if 'duration_minutes' in data:
+            data['duration_minutes'] = _parse_duration(data['duration_minutes'])
+            if data['duration_minutes'] is None:
+                return False, "Invalid duration"
+        
+        event = Event.get_event_by_id(event_id)
+        if not event:
+            return False, "No changes made or event not found"
+        
+        # Check the venue against the event's new slot
+        title = data.get('title', event['title'])
+        venue = data.get('venue', event['venue'])
+        starts_at = _combine(data.get('event_date', event['event_date']),
+                             data.get('event_time', event['event_time']))
+        duration = data.get('duration_minutes', event['duration_minutes'])
+        
+        try:
+            with _venue_lock(venue):
+                conflicts = venue_schedule.find_conflicts(venue, starts_at, duration,
+                                                          exclude_id=event_id, verify=True)
+                if conflicts is None:
+                    return False, "Could not check the venue schedule, please try again"
+                if conflicts:
+                    return False, _conflict_message(conflicts)
+                
+                # Update event
+                affected = Event.update_event(event_id, **data)
+        except mysql.connector.Error as err:
+            print(f"Venue lock error: {err}")
+            return False, "Could not check the venue schedule, please try again"
         
         if affected:
+            venue_schedule.upsert(event_id, title, venue, starts_at, duration)
+            if data.get('max_participants') is not None:
+                # More seats may have opened up for the waitlist
+                WaitlistController.promote(event_id)
             return True, "Event updated successfully"
         else:
             return False, "No changes made or event not found"
@@ -108,13 +250,37 @@ class EventController:
         Returns:
             Tuple: (success: Boolean, message: str)
         """
+        # Registrations go with the event, so collect the attendees first
+        event = Event.get_event_by_id(event_id)
+        recipients = NotificationController.get_event_recipients(event_id) if event else []
+        
         affected = Event.delete_event(event_id)
         
         if affected:
+            venue_schedule.remove(event_id)
+            if recipients:
+                NotificationController.notify_users(
+                    recipients, None, f"{event['title']} on {event['event_date']} has been cancelled",
+                    'cancellation'
+                )
             return True, "Event deleted successfully"
         else:
             return False, "Event not found or already deleted"
     
+    @staticmethod
+    def find_venue_conflicts(start=None, end=None):
+        """
+        Find all double-booked venue slots in a period
+        
+        Args:
+            start: Period start (datetime, optional)
+            end: Period end (datetime, optional)
+        
+        Returns:
+            List of (booking, booking) tuples, or None on database error
+        """
+        return venue_schedule.find_all_conflicts(start, end)
+    
     @staticmethod
     def get_all_events():
         """
@@ -135,6 +301,80 @@ class EventController:
         """
         return Event.get_upcoming_events()
     
+    @staticmethod
+    def get_events_page(fields, filters, after=None, limit=20):
+        """
+        Get one page of events for the API
+        
+        Args:
+            fields: Columns to select
+            filters: Dictionary with optional start_date, end_date,
+                category and is_paid
+            after: Cursor values of the previous page's last row
+            limit: Maximum number of rows
+        
+        Returns:
+            List of event dictionaries, or None on database error
+        """
+        return Event.get_events_page(fields, after=after, limit=limit, **filters)
+    
+    @staticmethod
+    def get_calendar_window():
+        """
+        Get the time range covered by calendar feeds
+        
+        Aligned to midnight so the range (and the feed ETag) only moves
+        once a day.
+        
+        Returns:
+            Tuple (start datetime, end datetime)
+        """
+        today = datetime.combine(date.today(), time.min)
+        return today - timedelta(days=FEED_PAST_DAYS), today + timedelta(days=FEED_FUTURE_DAYS)
+    
+    @staticmethod
+    def get_events_between(start, end, category=None):
+        """
+        Get events starting in a time range
+        
+        Args:
+            start: Range start (datetime)
+            end: Range end, exclusive (datetime)
+            category: Restrict to one category (optional)
+        
+        Returns:
+            List of events in start order
+        """
+        return Event.get_events_between(start, end, category)
+    
+    @staticmethod
+    def get_calendar_version(category=None):
+        """
+        Get the version of a public calendar feed
+        
+        Args:
+            category: Restrict to one category (optional)
+        
+        Returns:
+            Dictionary with count, updated_at and checksum, or None
+        """
+        start, end = EventController.get_calendar_window()
+        return Event.get_range_version(start, end, category)
+    
+    @staticmethod
+    def iter_calendar_events(category=None):
+        """
+        Stream the events of a public calendar feed
+        
+        Args:
+            category: Restrict to one category (optional)
+        
+        Returns:
+            Iterator of event dictionaries
+        """
+        start, end = EventController.get_calendar_window()
+        return Event.iter_events_between(start, end, category)
+    
     @staticmethod
     def get_event_details(event_id):
         """
@@ -148,6 +388,88 @@ class EventController:
         """
         return Event.get_event_by_id(event_id)
     
+    @staticmethod
+    def is_user_registered(user_id, event_id):
+        """
+        Check if a user is registered for an event
+        
+        Args:
+            user_id: User ID
+            event_id: Event ID
+        
+        Returns:
+            Boolean: True if user is registered
+        """
+        return Registration.is_user_registered(user_id, event_id)
+    
+    @staticmethod
+    def get_seats(event_ids, user_id=None):
+        """
+        Get live seat counts, and the user's registrations, for events
+        
+        Cached pages render the same markup for everyone; these values are
+        filled in by the browser afterwards.
+        
+        Args:
+            event_ids: List of event IDs
+            user_id: Logged-in user ID (optional)
+        
+        Returns:
+            Tuple (seats dictionary keyed by event ID, list of registered event IDs)
+        """
+        rows = Event.get_seats(event_ids) or []
+        seats = {row['event_id']: max(row['max_participants'] - row['current_participants'], 0)
+                 for row in rows}
+        
+        registered = []
+        if user_id:
+            registered = Registration.get_registered_event_ids(user_id, event_ids)
+        
+        return seats, registered
+    
+    @staticmethod
+    def watch_seats(event_id, heartbeat=15.0, max_duration=None):
+        """
+        Follow the seats left of an event
+        
+        Args:
+            event_id: Event ID
+            heartbeat: Seconds without a change before None is yielded
+            max_duration: Seconds after which the stream ends
+        
+        Returns:
+            Generator of seats left (an int per change, the current
+            count first) and None for quiet periods
+        """
+        for update in seat_feed.watch(event_id, heartbeat, max_duration):
+            yield None if update is None else update[1]
+    
+    @staticmethod
+    def get_event_version(event_id):
+        """
+        Get version info of an event for conditional requests
+        
+        Args:
+            event_id: Event ID
+        
+        Returns:
+            Dictionary with updated_at and current_participants, or None
+        """
+        return Event.get_event_version(event_id)
+    
+    @staticmethod
+    def get_listing_version(category=None):
+        """
+        Get version info of the upcoming-events listing
+        
+        Args:
+            category: Restrict to one category (optional)
+        
+        Returns:
+            Dictionary with count, updated_at and participants, or None
+        """
+        return Event.get_listing_version(category)
+    
     @staticmethod
     def register_for_event(user_id, event_id, user_email, user_name):
         """
@@ -168,23 +490,29 @@ class EventController:
         if not event:
             return False, "Event not found", None
         
-        # Check if event is full
-        if Event.is_event_full(event_id):
-            return False, "Event is full. No more seats available.", None
+        # Check if event is full (cheap early answer from the cached row;
+        # the place itself is taken below with a conditional update)
+        if event['current_participants'] >= event['max_participants']:
+            return False, "Event is full. Join the waitlist to get the next free seat.", None
         
         # Check if user already registered
         if Registration.is_user_registered(user_id, event_id):
             return False, "You are already registered for this event", None
         
         # Check registration deadline
-        if event['registration_deadline']:
-            deadline = datetime.strptime(str(event['registration_deadline']), '%Y-%m-%d')
-            if datetime.now() > deadline:
-                return False, "Registration deadline has passed", None
+        if _deadline_passed(event):
+            return False, "Registration deadline has passed", None
         
         # Check if payment is required
         payment_required = event['is_paid']
         
+        # Take a place first; 0 rows means another registration took the last one
+        taken = Event.increment_participants(event_id)
+        if taken is None:
+            return False, "Registration failed. Please try again.", None
+        if not taken:
+            return False, "Event is full. Join the waitlist to get the next free seat.", None
+        
         # Create registration
         registration_id = Registration.create_registration(
             user_id=user_id,
@@ -193,10 +521,17 @@ class EventController:
         )
         
         if not registration_id:
+            Event.decrement_participants(event_id)
             return False, "Registration failed. Please try again.", None
         
-        # Increment participant count
-        Event.increment_participants(event_id)
+        # Reserved seating: hold a seat until payment (free events: confirm it)
+        seated, seat_message, seats = SeatController.assign_seats(
+            event_id, [registration_id], confirmed=not payment_required
+        )
+        if not seated:
+            Registration.cancel_registration(registration_id)
+            Event.decrement_participants(event_id)
+            return False, seat_message, None
         
         # If free event, send confirmation email
         if not payment_required:
@@ -208,13 +543,137 @@ class EventController:
                 event_time=str(event['event_time']),
                 venue=event['venue']
             )
-            return True, "Registration successful!", registration_id
+            NotificationController.notify(user_id, event_id, f"You are registered for {event['title']}",
+                                          'registration')
+            return True, f"Registration successful! {seat_message}".strip(), registration_id
         else:
+            NotificationController.notify(
+                user_id, event_id, f"Your seat for {event['title']} is reserved. Complete payment to confirm it.",
+                'registration'
+            )
             # For paid events, return registration_id and indicate payment is needed
             return True, "Please complete payment to confirm registration", {
                 'registration_id': registration_id,
                 'payment_required': True,
-                'amount': float(event['price'])
+                'amount': float(event['price']),
+                'seats': seats
+            }
+    
+    @staticmethod
+    def register_group(leader_id, event_id, member_emails):
+        """
+        Register a team for an event in one transaction
+        
+        All seats are reserved and all registrations are written together,
+        or nothing is. Free teams are confirmed and emailed in one batch;
+        for paid events the leader pays for the whole team with one order.
+        
+        Args:
+            leader_id: User ID of the member registering the team
+            event_id: Event ID
+            member_emails: Teammates' account emails (list, or a comma or
+                whitespace separated string); the leader is always included
+        
+        Returns:
+            Tuple: (success: Boolean, message: str, data: dict or None)
+        """
+        event = Event.get_event_by_id(event_id)
+        
+        if not event:
+            return False, "Event not found", None
+        
+        if _deadline_passed(event):
+            return False, "Registration deadline has passed", None
+        
+        leader = User.get_user_by_id(leader_id)
+        if not leader:
+            return False, "User not found", None
+        
+        emails = [email for email in _parse_emails(member_emails) if email != leader['email'].lower()]
+        if not emails:
+            return False, "Please enter your teammates' email addresses", None
+        
+        if len(emails) + 1 > MAX_GROUP_SIZE:
+            return False, f"A team can have at most {MAX_GROUP_SIZE} members", None
+        
+        members = User.get_users_by_emails(emails)
+        if members is None:
+            return False, "Registration failed. Please try again.", None
+        
+        found = {member['email'].lower() for member in members}
+        unknown = [email for email in emails if email not in found]
+        if unknown:
+            return False, f"No account found for: {', '.join(unknown)}", None
+        
+        members = [leader] + members
+        size = len(members)
+        
+        seats = event['max_participants'] - event['current_participants']
+        if seats < size:
+            return False, f"Not enough seats for a team of {size} ({max(seats, 0)} left)", None
+        
+        payment_required = event['is_paid']
+        group, reason = Registration.create_group(
+            event_id, leader_id, [member['user_id'] for member in members], payment_required
+        )
+        
+        if not group:
+            if reason[0] == 'full':
+                return False, f"Not enough seats left for a team of {size}", None
+            if reason[0] == 'registered':
+                names = [member['name'] for member in members if member['user_id'] in reason[1]]
+                return False, f"Already registered for this event: {', '.join(names)}", None
+            return False, "Registration failed. Please try again.", None
+        
+        Event.invalidate_cache(event_id, counts_only=True)
+        
+        registration_ids = {row['user_id']: row['registration_id'] for row in group['registrations']}
+        
+        # Reserved seating: seat the team together where possible
+        seated, seat_message, seats = SeatController.assign_seats(
+            event_id, [registration_ids[member['user_id']] for member in members],
+            confirmed=not payment_required
+        )
+        if not seated:
+            Registration.update_registrations_status(list(registration_ids.values()), 'cancelled', event_id)
+            Event.decrement_participants(event_id, size)
+            return False, seat_message, None
+        
+        if not payment_required:
+            messages = []
+            for member in members:
+                subject, body = registration_confirmation_email(
+                    user_name=member['name'],
+                    event_title=event['title'],
+                    event_date=str(event['event_date']),
+                    event_time=str(event['event_time']),
+                    venue=event['venue']
+                )
+                messages.append((member['email'], subject, body))
+            send_bulk_emails(messages)
+            NotificationController.notify_users(
+                [member['user_id'] for member in members], event_id,
+                f"Your team of {size} is registered for {event['title']}", 'registration'
+            )
+            return True, f"Team of {size} registered successfully! {seat_message}".strip(), {
+                'group_id': group['group_id'],
+                'registration_ids': list(registration_ids.values()),
+                'seats': seats
+            }
+        else:
+            NotificationController.notify_users(
+                [member['user_id'] for member in members], event_id,
+                f"Your team of {size} has seats reserved for {event['title']}, pending {leader['name']}'s payment",
+                'registration'
+            )
+            # The leader pays for the whole team with one order
+            return True, "Please complete payment to confirm your team", {
+                'group_id': group['group_id'],
+                'registration_id': registration_ids[leader_id],
+                'registration_ids': list(registration_ids.values()),
+                'payment_required': True,
+                'amount': float(event['price']) * size,
+                'seats': seats
             }
     
     @staticmethod
@@ -232,15 +691,23 @@ class EventController:
         # Get registration
         registration = Registration.get_registration_by_user_event(user_id, event_id)
         
-        if not registration:
+        if not registration or registration['status'] == 'cancelled':
             return False, "Registration not found"
         
         # Cancel registration
         affected = Registration.cancel_registration(registration['registration_id'])
         
         if affected:
-            # Decrement participant count
+            # Decrement participant count and hand the seat to the waitlist
             Event.decrement_participants(event_id)
+            SeatController.release_seats(event_id, [registration['registration_id']])
+            CheckinController.revoke_ticket(event_id, registration['registration_id'])
+            WaitlistController.promote(event_id)
+            event = Event.get_event_by_id(event_id)
+            if event:
+                NotificationController.notify(user_id, event_id,
+                                              f"Your registration for {event['title']} was cancelled",
+                                              'cancellation')
             return True, "Registration cancelled successfully"
         else:
             return False, "Failed to cancel registration"
@@ -0,0 +1,220 @@
+"""
+Notification Controller
+Handles in-app notifications and the unread badge
+"""
+
+import os
+from datetime import datetime, timedelta
+from app.models.event import Event
+from app.models.notification import Notification
+from app.models.change import change_feed
+from app.utils.cache import get_cache
+
+# Unread counts shown in the navigation bar. Writes drop the user's
+# entry, so the count is only recomputed after something changed.
+unread_cache = get_cache(
+    'notifications',
+    maxsize=int(os.getenv('NOTIFICATION_CACHE_SIZE', 4096)),
+    ttl=int(os.getenv('NOTIFICATION_COUNT_TTL', 300))
+)
+
+def _evict_unread(user_id):
+    """Drop unread counts changed by another worker (None: all of them)"""
+    if user_id is None:
+        unread_cache.clear()
+    else:
+        unread_cache.invalidate(user_id)
+
+change_feed.subscribe('notifications', _evict_unread)
+
+FEED_PAGE_SIZE = 20
+
+class NotificationController:
+    """Controller for notification operations"""
+    
+    @staticmethod
+    def notify(user_id, event_id, message, notification_type):
+        """
+        Notify one user
+        
+        Args:
+            user_id: Recipient user ID
+            event_id: Related event ID (or None)
+            message: Notification text
+            notification_type: 'registration', 'reminder', 'cancellation'
+                or 'payment'
+        
+        Returns:
+            Boolean: True if the notification was stored
+        """
+        created = Notification.create(user_id, event_id, message, notification_type)
+        unread_cache.invalidate(user_id)
+        return bool(created)
+    
+    @staticmethod
+    def notify_users(user_ids, event_id, message, notification_type):
+        """
+        Notify many users with batched inserts
+        
+        Args:
+            user_ids: Recipient user IDs
+            event_id: Related event ID (or None)
+            message: Notification text
+            notification_type: Notification type
+        
+        Returns:
+            Number of notifications stored
+        """
+        user_ids = list(user_ids)
+        if not user_ids:
+            return 0
+        
+        created = Notification.create_many(user_ids, event_id, message, notification_type)
+        for user_id in user_ids:
+            unread_cache.invalidate(user_id)
+        return created or 0
+    
+    @staticmethod
+    def get_event_recipients(event_id):
+        """
+        Get the users registered for an event (e.g. before deleting it)
+        
+        Args:
+            event_id: Event ID
+        
+        Returns:
+            List of user IDs
+        """
+        return Notification.get_event_recipients(event_id) or []
+    
+    @staticmethod
+    def notify_event(event_id, message, notification_type):
+        """
+        Notify everyone with an active registration for an event
+        
+        Args:
+            event_id: Event ID
+            message: Notification text
+            notification_type: Notification type
+        
+        Returns:
+            Number of notifications stored
+        """
+        return NotificationController.notify_users(
+            NotificationController.get_event_recipients(event_id), event_id, message, notification_type
+        )
+    
+    @staticmethod
+    def get_unread_count(user_id):
+        """
+        Get a user's unread count for the navigation badge
+        
+        Served from the counter cache; COUNT(*) only runs after a change
+        or when the entry expires.
+        
+        Args:
+            user_id: User ID
+        
+        Returns:
+            Number of unread notifications (0 on error)
+        """
+        return unread_cache.get_or_load(user_id, lambda: Notification.count_unread(user_id)) or 0
+    
+    @staticmethod
+    def get_feed(user_id, before=None, limit=FEED_PAGE_SIZE):
+        """
+        Get a page of a user's notifications
+        
+        Args:
+            user_id: User ID
+            before: notification_id the page starts after (None for the
+                newest page)
+            limit: Page size
+        
+        Returns:
+            Tuple: (notifications: list, next_before: int or None)
+        """
+        rows = Notification.get_feed(user_id, before, limit + 1) or []
+        
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, rows[-1]['notification_id']
+        return rows, None
+    
+    @staticmethod
+    def get_feed_page(user_id, fields, unread_only=False, after=None, limit=20):
+        """
+        Get a page of notifications for the JSON API
+        
+        Args:
+            user_id: User ID
+            fields: Columns to select
+            unread_only: Only unread notifications
+            after: Last notification_id of the previous page
+            limit: Number of rows to fetch
+        
+        Returns:
+            List of notification dictionaries, or None on error
+        """
+        return Notification.get_feed(user_id, after, limit, fields, unread_only)
+    
+    @staticmethod
+    def mark_read(user_id, notification_ids=None):
+        """
+        Mark notifications as read
+        
+        Args:
+            user_id: User ID
+            notification_ids: IDs to mark (list of ints or numeric
+                strings), or None for all
+        
+        Returns:
+            Tuple: (success: Boolean, message: str)
+        """
+        if notification_ids is not None:
+            try:
+                notification_ids = [int(notification_id) for notification_id in notification_ids]
+            except (TypeError, ValueError):
+                return False, "Invalid notification IDs"
+        
+        affected = Notification.mark_read(user_id, notification_ids)
+        
+        if affected is None:
+            return False, "Could not update notifications"
+        
+        unread_cache.invalidate(user_id)
+        return True, f"{affected} notification(s) marked as read"
+    
+    @staticmethod
+    def send_reminders(hours_ahead=24):
+        """
+        Remind confirmed attendees of events starting soon
+        
+        Each attendee gets one reminder per event, so running this from
+        cron more often than the window is harmless.
+        
+        Args:
+            hours_ahead: Remind about events starting within this many hours
+        
+        Returns:
+            Dictionary of event_id -> reminders sent, or None on error
+        """
+        now = datetime.now()
+        events = Event.get_events_between(now, now + timedelta(hours=hours_ahead))
+        
+        if events is None:
+            return None
+        
+        sent = {}
+        for event in events:
+            user_ids = Notification.get_reminder_recipients(event['event_id'])
+            if not user_ids:
+                continue
+            
+            message = (f"Reminder: {event['title']} starts on {event['event_date']} "
+                       f"at {str(event['event_time'])[:5]} at {event['venue']}")
+            sent[event['event_id']] = NotificationController.notify_users(
+                user_ids, event['event_id'], message, 'reminder'
+            )
+        
+        return sent
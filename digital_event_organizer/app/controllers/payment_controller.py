@@ -7,8 +7,11 @@ from app.models.payment import Payment
 from app.models.registration import Registration
 from app.models.event import Event
 from app.models.user import User
+from app.controllers.seat_controller import SeatController
+from app.controllers.notification_controller import NotificationController
 from app.utils.payment_service import create_order, verify_payment_signature
-from app.utils.email_service import send_payment_confirmation, send_registration_confirmation
+from app.utils.email_service import (send_payment_confirmation, send_registration_confirmation,
+                                     send_bulk_emails, registration_confirmation_email)
 
 class PaymentController:
     """Controller for payment operations"""
@@ -48,8 +51,15 @@ class PaymentController:
         if existing_payment and existing_payment['payment_status'] == 'success':
             return False, "Payment already completed", None
         
-        # Create Razorpay order
+        # Create Razorpay order; a team leader pays for every pending member
         amount = float(event['price'])
+        if registration.get('group_id'):
+            group = Registration.get_group(registration['group_id'])
+            if not group or group['leader_id'] != user_id:
+                return False, "Your team leader pays for this registration", None
+            members = Registration.get_group_members(registration['group_id']) or []
+            pending = [member for member in members if member['status'] == 'pending']
+            amount *= max(len(pending), 1)
         receipt = f"reg_{registration_id}"
         
         order = create_order(amount, receipt=receipt)
@@ -123,6 +133,48 @@ class PaymentController:
         user = User.get_user_by_id(payment['user_id'])
         event = Event.get_event_by_id(payment['event_id'])
         
+        # A team leader's payment confirms the whole team
+        registration = Registration.get_registration_by_id(payment['registration_id'])
+        if registration and registration.get('group_id'):
+            Registration.confirm_group(registration['group_id'])
+            members = [member for member in Registration.get_group_members(registration['group_id']) or []
+                       if member['status'] != 'cancelled']
+            SeatController.confirm_seats([member['registration_id'] for member in members])
+            
+            if user and event:
+                send_payment_confirmation(
+                    user_email=user['email'],
+                    user_name=user['name'],
+                    event_title=event['title'],
+                    amount=payment['amount'],
+                    transaction_id=razorpay_payment_id
+                )
+                
+                messages = []
+                for member in members:
+                    subject, body = registration_confirmation_email(
+                        user_name=member['name'],
+                        event_title=event['title'],
+                        event_date=str(event['event_date']),
+                        event_time=str(event['event_time']),
+                        venue=event['venue']
+                    )
+                    messages.append((member['email'], subject, body))
+                send_bulk_emails(messages)
+                
+                NotificationController.notify(
+                    user['user_id'], event['event_id'],
+                    f"Payment of ₹{payment['amount']} for {event['title']} received", 'payment'
+                )
+                NotificationController.notify_users(
+                    [member['user_id'] for member in members], event['event_id'],
+                    f"Your team registration for {event['title']} is confirmed", 'registration'
+                )
+            
+            return True, "Payment successful! Team registration confirmed."
+        
+        SeatController.confirm_seats([payment['registration_id']])
+        
         if user and event:
             # Send payment confirmation email
             send_payment_confirmation(
@@ -142,6 +194,12 @@ class PaymentController:
                 event_time=str(event['event_time']),
                 venue=event['venue']
             )
+            
+            NotificationController.notify(
+                user['user_id'], event['event_id'],
+                f"Payment of ₹{payment['amount']} received. Your registration for {event['title']} is confirmed.",
+                'payment'
+            )
         
         return True, "Payment successful! Registration confirmed."
     
@@ -177,6 +235,23 @@ class PaymentController:
         """
         return Payment.get_user_payments(user_id)
     
+    @staticmethod
+    def get_user_payments_page(user_id, fields, status=None, after=None, limit=20):
+        """
+        Get one page of a user's payments for the API
+        
+        Args:
+            user_id: User ID
+            fields: Fields to select
+            status: Payment status filter (optional)
+            after: Cursor (payment ID) of the previous page
+            limit: Maximum number of rows
+        
+        Returns:
+            List of payments, or None on database error
+        """
+        return Payment.get_user_payments_page(user_id, fields, status, after, limit)
+    
     @staticmethod
     def get_payment_details(payment_id, user_id):
         """
@@ -0,0 +1,154 @@
+"""
+Seat Controller
+Handles reserved seating for events with a seat map
+"""
+
+from app.models.event import Event
+from app.models.seat_map import SeatMap
+from app.utils.seat_bitmap import row_label
+
+# Largest hall an admin may define
+MAX_SEAT_ROWS = 200
+MAX_SEATS_PER_ROW = 200
+
+class SeatController:
+    """Controller for seat map operations"""
+
+    @staticmethod
+    def create_seat_map(event_id, seat_rows, seats_per_row):
+        """
+        Create or resize an event's seat map
+
+        Args:
+            event_id: Event ID
+            seat_rows: Number of rows (form value)
+            seats_per_row: Seats in each row (form value)
+
+        Returns:
+            Tuple: (success: Boolean, message: str)
+        """
+        try:
+            seat_rows = int(seat_rows)
+            seats_per_row = int(seats_per_row)
+        except (TypeError, ValueError):
+            return False, "Rows and seats per row must be numbers"
+
+        if not (1 <= seat_rows <= MAX_SEAT_ROWS and 1 <= seats_per_row <= MAX_SEATS_PER_ROW):
+            return False, f"Use 1-{MAX_SEAT_ROWS} rows of 1-{MAX_SEATS_PER_ROW} seats"
+
+        success, reason = SeatMap.create_map(event_id, seat_rows, seats_per_row)
+
+        if not success:
+            if reason == 'not_found':
+                return False, "Event not found"
+            if reason == 'too_small':
+                return False, "The new layout has no room for seats already assigned"
+            return False, "Failed to save the seat map"
+
+        # max_participants now equals the number of seats
+        Event.invalidate_cache(event_id)
+        return True, f"Seat map saved: {seat_rows * seats_per_row} seats"
+
+    @staticmethod
+    def get_seat_layout(event_id):
+        """
+        Get an event's seats for display
+
+        Args:
+            event_id: Event ID
+
+        Returns:
+            Dictionary with rows (lists of seat dictionaries with label and
+            status 'free', 'held' or 'confirmed') and free/total counts,
+            or None if the event has no seat map
+        """
+        bitmap = SeatMap.get_map(event_id)
+        if bitmap is None:
+            return None
+
+        statuses = {row['seat_index']: row['status'] for row in SeatMap.get_assignments(event_id) or []}
+
+        rows = []
+        for row in range(bitmap.rows):
+            first = row * bitmap.seats_per_row
+            rows.append({
+                'label': row_label(row),
+                'seats': [{
+                    'label': bitmap.label(index),
+                    'status': 'free' if bitmap.is_free(index) else statuses.get(index, 'held')
+                } for index in range(first, first + bitmap.seats_per_row)]
+            })
+
+        return {'rows': rows, 'free': bitmap.free_count(), 'total': bitmap.capacity}
+
+    @staticmethod
+    def best_available(event_id, count):
+        """
+        Preview the seats a party of `count` would get
+
+        Args:
+            event_id: Event ID
+            count: Party size
+
+        Returns:
+            List of seat labels, or None if there is no map or no room
+        """
+        bitmap = SeatMap.get_map(event_id)
+        if bitmap is None:
+            return None
+
+        seats = bitmap.find_seats(count)
+        return [bitmap.label(seat) for seat in seats] if seats else None
+
+    @staticmethod
+    def assign_seats(event_id, registration_ids, together=True, confirmed=False):
+        """
+        Assign seats to new registrations if the event has a seat map
+
+        Args:
+            event_id: Event ID
+            registration_ids: Registrations that each need a seat
+            together: Seat them next to each other if possible
+            confirmed: Confirm right away (free events) instead of holding
+                the seats until payment
+
+        Returns:
+            Tuple: (success: Boolean, message: str, labels: list)
+            Events without a seat map succeed with no labels.
+        """
+        labels, reason = SeatMap.hold(event_id, registration_ids, together=together, confirmed=confirmed)
+
+        if labels is not None:
+            return True, f"Seat(s): {', '.join(labels)}", labels
+        if reason == 'no_map':
+            return True, "", []
+        if reason == 'unavailable':
+            return False, "Not enough seats are free", []
+        return False, "Could not assign seats. Please try again.", []
+
+    @staticmethod
+    def confirm_seats(registration_ids):
+        """
+        Confirm held seats, e.g. after payment
+
+        Args:
+            registration_ids: List of registration IDs
+
+        Returns:
+            Number of confirmed seats
+        """
+        return SeatMap.confirm(registration_ids) or 0
+
+    @staticmethod
+    def release_seats(event_id, registration_ids):
+        """
+        Free the seats of cancelled registrations
+
+        Args:
+            event_id: Event ID
+            registration_ids: List of registration IDs
+
+        Returns:
+            List of freed seat labels
+        """
+        return SeatMap.release(event_id, registration_ids) or []
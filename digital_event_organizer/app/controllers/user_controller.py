@@ -6,6 +6,11 @@ Handles user-related business logic
 from app.models.user import User
 from app.models.registration import Registration
 from app.utils.validators import validate_email, validate_password, validate_phone
+from app.controllers.event_controller import EventController
+from flask import current_app
+from itsdangerous import URLSafeSerializer, BadSignature
+
+CALENDAR_TOKEN_SALT = 'calendar-feed'
 
 class UserController:
     """Controller for user operations"""
@@ -122,6 +127,85 @@ class UserController:
         else:
             return False, "No changes made"
     
+    @staticmethod
+    def get_calendar_token(user_id):
+        """
+        Get the secret token of a user's calendar feed URL
+        
+        Calendar apps can't send the session cookie, so the feed URL
+        carries a signed user ID instead.
+        
+        Args:
+            user_id: User ID
+        
+        Returns:
+            Token string
+        """
+        serializer = URLSafeSerializer(current_app.config['SECRET_KEY'], salt=CALENDAR_TOKEN_SALT)
+        return serializer.dumps(user_id)
+    
+    @staticmethod
+    def get_user_id_from_calendar_token(token):
+        """
+        Verify a calendar feed token
+        
+        Args:
+            token: Token from the feed URL
+        
+        Returns:
+            User ID, or None if the token is invalid
+        """
+        serializer = URLSafeSerializer(current_app.config['SECRET_KEY'], salt=CALENDAR_TOKEN_SALT)
+        try:
+            return serializer.loads(token)
+        except BadSignature:
+            return None
+    
+    @staticmethod
+    def get_calendar_version(user_id):
+        """
+        Get the version of a user's calendar feed
+        
+        Args:
+            user_id: User ID
+        
+        Returns:
+            Dictionary with count, updated_at and checksum, or None
+        """
+        start, end = EventController.get_calendar_window()
+        return Registration.get_user_calendar_version(user_id, start, end)
+    
+    @staticmethod
+    def iter_calendar_events(user_id):
+        """
+        Stream the events of a user's calendar feed
+        
+        Args:
+            user_id: User ID
+        
+        Returns:
+            Iterator of event dictionaries with registration status
+        """
+        start, end = EventController.get_calendar_window()
+        return Registration.iter_user_calendar(user_id, start, end)
+    
+    @staticmethod
+    def get_user_registrations_page(user_id, fields, status=None, after=None, limit=20):
+        """
+        Get one page of a user's registrations for the API
+        
+        Args:
+            user_id: User ID
+            fields: Fields to select
+            status: Registration status filter (optional)
+            after: Cursor (registration ID) of the previous page
+            limit: Maximum number of rows
+        
+        Returns:
+            List of registrations, or None on database error
+        """
+        return Registration.get_user_registrations_page(user_id, fields, status, after, limit)
+    
     @staticmethod
     def get_user_registrations(user_id):
         """
@@ -131,6 +215,6 @@ class UserController:
             user_id: User ID
         
         Returns:
-            List of registrations with event details
+            List of registrations with event details (compact rows)
         """
-        return Registration.get_user_registrations(user_id)
+        return Registration.get_user_registrations(user_id, compact=True)
@@ -0,0 +1,197 @@
+"""
+Waitlist Controller
+Handles waitlists of full events and promotion when seats free up
+"""
+
+import os
+from app.models.event import Event
+from app.models.registration import Registration
+from app.models.waitlist import Waitlist
+from app.models.change import change_feed
+from app.controllers.seat_controller import SeatController
+from app.controllers.notification_controller import NotificationController
+from app.utils.email_service import send_bulk_emails, waitlist_promotion_email
+from app.utils.waitlist_index import WaitlistIndex
+
+# Queue positions per event, answered in O(log n) without a COUNT query
+waitlist_index = WaitlistIndex(Waitlist.get_waiting,
+                               max_age=int(os.getenv('WAITLIST_INDEX_MAX_AGE', 60)))
+change_feed.subscribe('waitlist', waitlist_index.invalidate)
+
+class WaitlistController:
+    """Controller for waitlist operations"""
+    
+    @staticmethod
+    def join_waitlist(user_id, event_id):
+        """
+        Put a user on the waitlist of a full event
+        
+        Args:
+            user_id: User ID
+            event_id: Event ID
+        
+        Returns:
+            Tuple: (success: Boolean, message: str, position: int or None)
+        """
+        event = Event.get_event_by_id(event_id)
+        
+        if not event:
+            return False, "Event not found", None
+        
+        if event['current_participants'] < event['max_participants']:
+            return False, "Seats are available. Please register instead.", None
+        
+        if Registration.is_user_registered(user_id, event_id):
+            return False, "You are already registered for this event", None
+        
+        waitlist_id = Waitlist.join(event_id, user_id)
+        
+        if not waitlist_id:
+            return False, "Could not join the waitlist. Please try again.", None
+        
+        waitlist_index.joined(event_id, waitlist_id, user_id)
+        position = waitlist_index.position(event_id, user_id)
+        
+        return True, f"You are number {position} on the waitlist", position
+    
+    @staticmethod
+    def leave_waitlist(user_id, event_id):
+        """
+        Take a user off an event's waitlist
+        
+        Args:
+            user_id: User ID
+            event_id: Event ID
+        
+        Returns:
+            Tuple: (success: Boolean, message: str)
+        """
+        affected = Waitlist.leave(event_id, user_id)
+        
+        if affected:
+            waitlist_index.removed(event_id, [user_id])
+            return True, "You have left the waitlist"
+        else:
+            return False, "You are not on the waitlist for this event"
+    
+    @staticmethod
+    def get_position(user_id, event_id):
+        """
+        Get a user's position in an event's waitlist
+        
+        Args:
+            user_id: User ID
+            event_id: Event ID
+        
+        Returns:
+            1-based position, or None if the user is not waiting
+        """
+        return waitlist_index.position(event_id, user_id)
+    
+    @staticmethod
+    def get_waitlist_length(event_id):
+        """
+        Get the number of users waiting for an event
+        
+        Args:
+            event_id: Event ID
+        
+        Returns:
+            Number of waiting users
+        """
+        return waitlist_index.length(event_id)
+    
+    @staticmethod
+    def promote(event_id, limit=None):
+        """
+        Fill an event's free seats from its waitlist
+        
+        The promoted users are registered in one transaction and then
+        notified in batches over shared SMTP connections. Users of paid
+        events get a pending registration holding their seat until they pay.
+        
+        Args:
+            event_id: Event ID
+            limit: Maximum number of users to promote (optional)
+        
+        Returns:
+            Tuple: (success: Boolean, message: str, promoted: list)
+        """
+        promoted = Waitlist.promote(event_id, limit)
+        
+        if promoted is None:
+            return False, "Waitlist promotion failed", []
+        
+        if not promoted:
+            return True, "No one to promote", []
+        
+        Event.invalidate_cache(event_id, counts_only=True)
+        
+        # Promoted users don't know each other: give each the best single seat
+        seated, seat_message, seats = SeatController.assign_seats(
+            event_id, [row['registration_id'] for row in promoted],
+            together=False, confirmed=not promoted[0]['payment_required']
+        )
+        if not seated:
+            # Nobody may hold a registration without a seat (e.g. seats
+            # taken by registrations from before the seat map existed)
+            if Waitlist.revert_promotion(event_id, promoted):
+                Event.invalidate_cache(event_id, counts_only=True)
+                print(f"Waitlist promotion of event {event_id} undone: {seat_message}")
+            else:
+                print(f"Waitlist promotion of event {event_id} left {len(promoted)} "
+                      f"registration(s) without seats: {seat_message}")
+            waitlist_index.invalidate(event_id)
+            return False, seat_message, []
+        
+        waitlist_index.removed(event_id, [row['user_id'] for row in promoted])
+        
+        event = Event.get_event_by_id(event_id)
+        if event:
+            messages = []
+            for row in promoted:
+                subject, body = waitlist_promotion_email(
+                    user_name=row['name'],
+                    event_title=event['title'],
+                    event_date=str(event['event_date']),
+                    event_time=str(event['event_time']),
+                    venue=event['venue'],
+                    payment_required=row['payment_required']
+                )
+                messages.append((row['email'], subject, body))
+            send_bulk_emails(messages)
+            
+            message = f"A seat opened up for {event['title']} and you have been moved off the waitlist"
+            if promoted[0]['payment_required']:
+                message += ". Complete payment to confirm it."
+            NotificationController.notify_users([row['user_id'] for row in promoted], event_id,
+                                                message, 'registration')
+        
+        return True, f"Promoted {len(promoted)} user(s) from the waitlist", promoted
+    
+    @staticmethod
+    def promote_all(limit=None):
+        """
+        Promote waiting users of every upcoming event with free seats
+        
+        Catches seats freed outside the app (e.g. by an admin in the
+        database) that no cancellation triggered a promotion for.
+        
+        Args:
+            limit: Maximum number of users to promote per event (optional)
+        
+        Returns:
+            Dictionary mapping event IDs to the number of promoted users,
+            or None on database error
+        """
+        event_ids = Waitlist.get_events_with_openings()
+        if event_ids is None:
+            return None
+        
+        results = {}
+        for event_id in event_ids:
+            success, message, promoted = WaitlistController.promote(event_id, limit)
+            if success:
+                results[event_id] = len(promoted)
+        
+        return results
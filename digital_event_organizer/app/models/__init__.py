@@ -7,5 +7,11 @@ from .user import User
 from .event import Event
 from .registration import Registration
 from .payment import Payment
+from .waitlist import Waitlist
+from .seat_map import SeatMap
+from .checkin import Checkin
+from .notification import Notification
+from .change import Change
 
-__all__ = ['User', 'Event', 'Registration', 'Payment']
+__all__ = ['User', 'Event', 'Registration', 'Payment', 'Waitlist', 'SeatMap', 'Checkin', 'Notification',
+           'Change']
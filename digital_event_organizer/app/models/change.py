@@ -0,0 +1,142 @@
+"""
+Change Model
+Handles the change outbox used for cross-worker cache invalidation
+"""
+
+import os
+import mysql.connector
+from app.utils.db_config import execute_query, execute_one, execute_many
+from app.utils.change_feed import ChangeFeed
+from app.utils.metrics import Counter, Gauge, register_collector
+
+class Change:
+    """Change outbox model for database operations"""
+    
+    @staticmethod
+    def append(changes, cursor=None):
+        """
+        Append changes to the outbox
+        
+        Args:
+            changes: List of (entity, entity_id, origin) tuples
+            cursor: Cursor of an open transaction to write with (the
+                changes then commit together with it)
+        
+        Returns:
+            Number of rows written, or None on error
+        """
+        query = """
+            INSERT INTO change_outbox (entity, entity_id, origin)
+            VALUES (%s, %s, %s)
+        """
+        if cursor is not None:
+            try:
+                cursor.executemany(query, changes)
+                return len(changes)
+            except mysql.connector.Error as err:
+                print(f"Database error: {err}")
+                return None
+        
+        results = execute_many(query, changes, batch_size=1000)
+        if results is None:
+            return None
+        return sum(batch['affected_rows'] for batch in results)
+    
+    @staticmethod
+    def get_since(after, gap_ids=(), limit=1000):
+        """
+        Get the changes past a high watermark
+        
+        Args:
+            after: Last change_id already applied
+            gap_ids: Lower change_ids that were missing when last read
+            limit: Maximum number of rows
+        
+        Returns:
+            List of dictionaries with change_id, entity, entity_id, origin
+            and lag_ms (age of the change by the database clock), or None
+            on error
+        """
+        condition = "change_id > %s"
+        params = [after]
+        
+        if gap_ids:
+            condition += f" OR change_id IN ({', '.join(['%s'] * len(gap_ids))})"
+            params.extend(gap_ids)
+        
+        query = f"""
+            SELECT change_id, entity, entity_id, origin,
+                   TIMESTAMPDIFF(MICROSECOND, created_at, NOW(3)) / 1000 AS lag_ms
+            FROM change_outbox
+            WHERE {condition}
+            ORDER BY change_id
+            LIMIT %s
+        """
+        params.append(limit)
+        return execute_query(query, tuple(params), fetch=True)
+    
+    @staticmethod
+    def get_latest_id():
+        """
+        Get the highest change_id
+        
+        Returns:
+            change_id (0 for an empty outbox), or None on error
+        """
+        row = execute_one("SELECT COALESCE(MAX(change_id), 0) AS latest FROM change_outbox")
+        return row['latest'] if row else None
+    
+    @staticmethod
+    def prune(older_than_hours=24, batch_size=10000):
+        """
+        Delete old changes in batches
+        
+        Workers only read changes newer than their watermark, and one
+        that can't read the outbox for long drops its caches anyway, so
+        old rows are never needed.
+        
+        Args:
+            older_than_hours: Keep changes younger than this
+            batch_size: Rows deleted per statement
+        
+        Returns:
+            Number of rows deleted, or None on error
+        """
+        query = """
+            DELETE FROM change_outbox
+            WHERE created_at < NOW(3) - INTERVAL %s HOUR
+            ORDER BY change_id
+            LIMIT %s
+        """
+        deleted = 0
+        while True:
+            affected = execute_query(query, (older_than_hours, batch_size))
+            if affected is None:
+                return None
+            deleted += affected
+            if affected < batch_size:
+                return deleted
+
+# Per-worker tail of the outbox. Models publish their writes here and
+# modules with in-process caches subscribe to the entities they hold.
+change_feed = ChangeFeed(
+    Change.append, Change.get_since, Change.get_latest_id,
+    interval=float(os.getenv('CHANGE_FEED_POLL', 0.5)),
+    max_lag=float(os.getenv('CHANGE_FEED_MAX_LAG', 10))
+)
+
+CHANGE_FEED_LAG = Gauge('change_feed_lag_seconds', 'Age of the last change applied from the outbox')
+CHANGE_FEED_SINCE_POLL = Gauge('change_feed_seconds_since_poll', 'Seconds since the outbox was last read')
+CHANGE_FEED_APPLIED = Counter('change_feed_applied_total', 'Changes of other workers applied')
+CHANGE_FEED_RESETS = Counter('change_feed_resets_total', 'Cache resets after the outbox was unreadable')
+
+def _feed_values():
+    stats = change_feed.stats()
+    if not stats['running']:
+        return
+    yield CHANGE_FEED_LAG, (), stats['last_lag_ms'] / 1000
+    yield CHANGE_FEED_SINCE_POLL, (), stats['seconds_since_poll']
+    yield CHANGE_FEED_APPLIED, (), stats['applied']
+    yield CHANGE_FEED_RESETS, (), stats['resets']
+
+register_collector(_feed_values)
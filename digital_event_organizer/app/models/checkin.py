@@ -0,0 +1,208 @@
+"""
+Check-in Model
+Handles gate check-ins of event tickets
+"""
+
+from app.utils.db_config import execute_query, execute_one, execute_many, execute_rows
+from app.models.change import change_feed
+
+class Checkin:
+    """Check-in model for database operations"""
+    
+    @staticmethod
+    def record_many(rows):
+        """
+        Store a batch of check-ins
+        
+        A registration is checked in once; rows for registrations that
+        are already checked in (e.g. scanned at two gates served by
+        different workers) are ignored and logged. New check-ins are
+        published to the change feed, so other workers reload the
+        event's check-in state and report those tickets as duplicates.
+        
+        Args:
+            rows: List of (registration_id, event_id, user_id,
+                checked_in_at, gate) tuples
+        
+        Returns:
+            Number of new check-ins, or None on error
+        """
+        query = """
+            INSERT IGNORE INTO checkins (registration_id, event_id, user_id, checked_in_at, gate)
+            VALUES (%s, %s, %s, %s, %s)
+        """
+        results = execute_many(query, rows)
+        if results is None:
+            return None
+        
+        written = sum(batch['affected_rows'] for batch in results)
+        if written < len(rows):
+            # The gate already answered 'ok' for these scans
+            print(f"Check-in batch: {len(rows) - written} of {len(rows)} scan(s) were "
+                  f"already checked in through another worker and were dropped")
+        if written:
+            change_feed.publish_many('tickets', [row[1] for row in rows])
+        return written
+    
+    @staticmethod
+    def merge_scans(event_id, scans, gate=None):
+        """
+        Merge check-ins uploaded by an offline scanner
+        
+        Only confirmed registrations of the event are accepted. Uploading
+        the same scans again changes nothing, and when a registration was
+        scanned more than once (by several devices, or online and
+        offline) the earliest scan is kept.
+        
+        Args:
+            event_id: Event ID
+            scans: List of (registration_id, checked_in_at) tuples
+            gate: Gate or device name stored with new check-ins
+        
+        Returns:
+            Tuple (list of accepted (registration_id, event_id, user_id,
+            checked_in_at, gate) rows, list of rejected registration IDs),
+            or None on error
+        """
+        confirmed = execute_rows("""
+            SELECT registration_id, user_id FROM registrations
+            WHERE event_id = %s AND status = 'confirmed'
+        """, (event_id,))
+        if confirmed is None:
+            return None
+        
+        users = {row.registration_id: row.user_id for row in confirmed}
+        rows = []
+        rejected = []
+        for registration_id, checked_in_at in scans:
+            user_id = users.get(registration_id)
+            if user_id is None:
+                rejected.append(registration_id)
+            else:
+                rows.append((registration_id, event_id, user_id, checked_in_at, gate))
+        
+        # gate is assigned first, while checked_in_at still holds the old value
+        query = """
+            INSERT INTO checkins (registration_id, event_id, user_id, checked_in_at, gate)
+            VALUES (%s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                gate = IF(VALUES(checked_in_at) < checked_in_at, VALUES(gate), gate),
+                checked_in_at = LEAST(checked_in_at, VALUES(checked_in_at))
+        """
+        if execute_many(query, rows, batch_size=1000) is None:
+            return None
+        if rows:
+            change_feed.publish('tickets', event_id)
+        return rows, rejected
+    
+    @staticmethod
+    def get_snapshot(event_id, since=None):
+        """
+        Get the registration lists an offline scanner needs
+        
+        Args:
+            event_id: Event ID
+            since: Unix time of a previous snapshot's version to get only
+                the changes after it, or None for everything
+        
+        Returns:
+            Dictionary with version (database Unix time when the snapshot
+            was taken), valid (confirmed registration IDs), revoked (other
+            registration IDs) and checked_in (registration IDs), or None
+            on error
+        """
+        # The database clock, so versions don't depend on the app server's
+        now = execute_one("SELECT UNIX_TIMESTAMP() AS version")
+        if now is None:
+            return None
+        
+        registrations = """
+            SELECT registration_id, status FROM registrations WHERE event_id = %s
+        """
+        checkins = """
+            SELECT registration_id FROM checkins WHERE event_id = %s
+        """
+        params = (event_id,)
+        if since is not None:
+            registrations += " AND updated_at >= FROM_UNIXTIME(%s)"
+            checkins += " AND synced_at >= FROM_UNIXTIME(%s)"
+            params = (event_id, since)
+        
+        registration_rows = execute_rows(registrations, params)
+        checkin_rows = execute_rows(checkins, params)
+        if registration_rows is None or checkin_rows is None:
+            return None
+        
+        return {
+            'version': int(now['version']),
+            'valid': [row.registration_id for row in registration_rows if row.status == 'confirmed'],
+            'revoked': [row.registration_id for row in registration_rows if row.status != 'confirmed'],
+            'checked_in': [row.registration_id for row in checkin_rows]
+        }
+    
+    @staticmethod
+    def get_event_state(event_id):
+        """
+        Load what a gate needs to know about an event
+        
+        Args:
+            event_id: Event ID
+        
+        Returns:
+            Tuple (dict of registration_id -> checked_in_at, set of
+            registration IDs that are not confirmed), or None on error
+        """
+        checked_in = execute_rows("""
+            SELECT registration_id, checked_in_at FROM checkins WHERE event_id = %s
+        """, (event_id,))
+        revoked = execute_rows("""
+            SELECT registration_id FROM registrations
+            WHERE event_id = %s AND status != 'confirmed'
+        """, (event_id,))
+        
+        if checked_in is None or revoked is None:
+            return None
+        return ({row.registration_id: row.checked_in_at for row in checked_in},
+                {row.registration_id for row in revoked})
+    
+    @staticmethod
+    def count_checked_in(event_id):
+        """
+        Count check-ins and confirmed registrations of an event
+        
+        Args:
+            event_id: Event ID
+        
+        Returns:
+            Dictionary with checked_in and expected, or None on error
+        """
+        query = """
+            SELECT
+                (SELECT COUNT(*) FROM checkins WHERE event_id = %s) AS checked_in,
+                (SELECT COUNT(*) FROM registrations
+                 WHERE event_id = %s AND status = 'confirmed') AS expected
+        """
+        return execute_one(query, (event_id, event_id))
+    
+    @staticmethod
+    def get_recent(event_id, limit=20):
+        """
+        Get the latest check-ins of an event
+        
+        Args:
+            event_id: Event ID
+            limit: Maximum number of rows
+        
+        Returns:
+            List of dictionaries with registration_id, name, gate and
+            checked_in_at
+        """
+        query = """
+            SELECT c.registration_id, u.name, c.gate, c.checked_in_at
+            FROM checkins c
+            JOIN users u ON c.user_id = u.user_id
+            WHERE c.event_id = %s
+            ORDER BY c.checked_in_at DESC
+            LIMIT %s
+        """
+        return execute_query(query, (event_id, limit), fetch=True)
@@ -3,7 +3,54 @@ Event Model
 Handles all event-related database operations
 """
 
-from app.utils.db_config import execute_query, execute_one
+import os
+from app.utils.db_config import execute_query, execute_one, execute_rows, execute_stream
+from app.utils.cache import get_cache
+from app.utils.broadcaster import Broadcaster
+from app.utils.metrics import Gauge, register_collector
+from app.utils.identity_map import identity_get, identity_evict
+from app.utils.page_cache import invalidate_pages, clear_pages
+from app.models.change import change_feed
+
+# Read-through cache for event lookups and public listings. Expired
+# entries are served for EVENT_CACHE_STALE more seconds while one
+# background load refreshes them.
+event_cache = get_cache(
+    'events',
+    maxsize=int(os.getenv('EVENT_CACHE_SIZE', 1024)),
+    ttl=int(os.getenv('EVENT_CACHE_TTL', 30)),
+    stale_ttl=int(os.getenv('EVENT_CACHE_STALE', 60))
+)
+
+def _load_seats_left(event_ids):
+    """Seats left per event, for the seat stream poller"""
+    rows = Event.get_seats(event_ids)
+    if rows is None:
+        return None
+    return {row['event_id']: max(row['max_participants'] - row['current_participants'], 0)
+            for row in rows}
+
+# Live seat counts for /events/<id>/seats/stream. All streams of a worker
+# share one poll; changes made by this worker trigger it right away, other
+# workers' changes are seen within SEAT_STREAM_POLL seconds.
+seat_feed = Broadcaster(_load_seats_left, interval=float(os.getenv('SEAT_STREAM_POLL', 2.0)))
+
+SEAT_STREAM_CLIENTS = Gauge('seat_stream_clients', 'Open live seat count streams')
+register_collector(lambda: [(SEAT_STREAM_CLIENTS, (), seat_feed.watcher_count())])
+
+# Columns the JSON API may select
+API_FIELDS = (
+    'event_id', 'title', 'description', 'event_date', 'event_time', 'duration_minutes', 'venue',
+    'category', 'price', 'is_paid', 'max_participants', 'current_participants',
+    'registration_deadline', 'image_url', 'updated_at'
+)
+
+# Columns written to calendar feeds
+CALENDAR_COLUMNS = ("event_id, title, description, venue, category, starts_at, "
+                    "duration_minutes, updated_at")
+
+# Sort key of paged listings; also the keyset cursor columns
+PAGE_ORDER = ('event_date', 'event_time', 'event_id')
 
 class Event:
     """Event model for database operations"""
@@ -11,7 +58,7 @@ class Event:
     @staticmethod
     def create_event(title, description, event_date, event_time, venue, category, 
                      price=0.0, is_paid=False, max_participants=100, 
-                     registration_deadline=None, created_by=None):
+                     registration_deadline=None, created_by=None, duration_minutes=120):
         """
         Create a new event
         
@@ -27,26 +74,34 @@ class Event:
             max_participants: Maximum participants (default 100)
             registration_deadline: Registration deadline date
             created_by: Admin user ID who created the event
+            duration_minutes: Event length in minutes (default 120)
         
         Returns:
             event_id if successful, None otherwise
         """
         query = """
             INSERT INTO events 
-            (title, description, event_date, event_time, venue, category, 
+            (title, description, event_date, event_time, duration_minutes, venue, category, 
              price, is_paid, max_participants, registration_deadline, created_by)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         """
-        params = (title, description, event_date, event_time, venue, category,
+        params = (title, description, event_date, event_time, duration_minutes, venue, category,
                  price, is_paid, max_participants, registration_deadline, created_by)
         
-        return execute_query(query, params)
+        event_id = execute_query(query, params)
+        Event.invalidate_cache()
+        if event_id:
+            change_feed.publish('event', event_id)
+        return event_id
     
     @staticmethod
-    def get_all_events():
+    def get_all_events(compact=False):
         """
         Get all events
         
+        Args:
+            compact: Return compact row objects instead of dictionaries
+        
         Returns:
             List of event dictionaries
         """
@@ -54,13 +109,207 @@ class Event:
             SELECT * FROM events 
             ORDER BY event_date ASC, event_time ASC
         """
+        if compact:
+            return execute_rows(query)
+        
+        return execute_query(query, fetch=True)
+    
+    @staticmethod
+    def get_events_page(fields, start_date=None, end_date=None, category=None,
+                        is_paid=None, after=None, limit=20):
+        """
+        Get one page of events in date order using keyset pagination
+        
+        Seeks past the previous page's last row instead of using OFFSET,
+        so deep pages cost the same as the first one.
+        
+        Args:
+            fields: Columns to select (names from API_FIELDS)
+            start_date: Earliest event date (optional)
+            end_date: Latest event date (optional)
+            category: Category filter (optional)
+            is_paid: True/False to filter paid or free events (optional)
+            after: PAGE_ORDER values of the previous page's last row (optional)
+            limit: Maximum number of rows
+        
+        Returns:
+            List of event dictionaries
+        """
+        columns = [name for name in fields if name in API_FIELDS]
+        columns += [name for name in PAGE_ORDER if name not in columns]
+        
+        conditions = []
+        params = []
+        
+        if start_date:
+            conditions.append("event_date >= %s")
+            params.append(start_date)
+        if end_date:
+            conditions.append("event_date <= %s")
+            params.append(end_date)
+        if category:
+            conditions.append("category = %s")
+            params.append(category)
+        if is_paid is not None:
+            conditions.append("is_paid = %s")
+            params.append(bool(is_paid))
+        if after:
+            conditions.append("(event_date, event_time, event_id) > (%s, %s, %s)")
+            params.extend(after)
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"""
+            SELECT {', '.join(columns)} FROM events
+            {where}
+            ORDER BY event_date ASC, event_time ASC, event_id ASC
+            LIMIT %s
+        """
+        params.append(limit)
+        
+        return execute_query(query, tuple(params), fetch=True)
+    
+    @staticmethod
+    def get_events_between(start, end, category=None, compact=False):
+        """
+        Get events starting in [start, end), in start order
+        
+        Uses the index on the generated starts_at column, so "this week"
+        style queries read only the matching rows.
+        
+        Args:
+            start: Range start (datetime)
+            end: Range end, exclusive (datetime)
+            category: Restrict to one category (optional)
+            compact: Return compact row objects instead of dictionaries
+        
+        Returns:
+            List of event dictionaries
+        """
+        query = "SELECT * FROM events WHERE starts_at >= %s AND starts_at < %s"
+        params = [start, end]
+        
+        if category:
+            query += " AND category = %s"
+            params.append(category)
+        
+        query += " ORDER BY starts_at ASC, event_id ASC"
+        
+        if compact:
+            return execute_rows(query, tuple(params))
+        
+        return execute_query(query, tuple(params), fetch=True)
+    
+    @staticmethod
+    def iter_events_between(start, end, category=None):
+        """
+        Stream the calendar columns of events starting in [start, end)
+        
+        Args:
+            start: Range start (datetime)
+            end: Range end, exclusive (datetime)
+            category: Restrict to one category (optional)
+        
+        Yields:
+            Event dictionaries (CALENDAR_COLUMNS only)
+        """
+        query = f"SELECT {CALENDAR_COLUMNS} FROM events WHERE starts_at >= %s AND starts_at < %s"
+        params = [start, end]
+        
+        if category:
+            query += " AND category = %s"
+            params.append(category)
+        
+        query += " ORDER BY starts_at ASC, event_id ASC"
+        return execute_stream(query, tuple(params))
+    
+    @staticmethod
+    def get_range_version(start, end, category=None):
+        """
+        Get the version of the events starting in [start, end)
+        
+        The checksum covers every event ID and update time in the range,
+        so edits, additions and deletions all change the result.
+        
+        Args:
+            start: Range start (datetime)
+            end: Range end, exclusive (datetime)
+            category: Restrict to one category (optional)
+        
+        Returns:
+            Dictionary with count, updated_at and checksum, or None
+        """
+        query = """
+            SELECT COUNT(*) AS count, MAX(updated_at) AS updated_at,
+                   BIT_XOR(CRC32(CONCAT(event_id, '@', updated_at))) AS checksum
+            FROM events
+            WHERE starts_at >= %s AND starts_at < %s
+        """
+        params = [start, end]
+        
+        if category:
+            query += " AND category = %s"
+            params.append(category)
+        
+        return execute_one(query, tuple(params))
+    
+    @staticmethod
+    def get_schedule_rows():
+        """
+        Get the venue booking of every event
+        
+        Returns:
+            List of dictionaries with event_id, title, venue, starts_at
+            and duration_minutes
+        """
+        query = """
+            SELECT event_id, title, venue, starts_at, duration_minutes
+            FROM events
+        """
+        return execute_query(query, fetch=True)
+    
+    @staticmethod
+    def get_schedule_rows_between(start, end, longest_minutes):
+        """
+        Get the venue bookings that may overlap [start, end)
+        
+        A range scan of idx_starts_at: an overlapping event starts before
+        end and at most longest_minutes before start.
+        
+        Args:
+            start: Range start (datetime)
+            end: Range end, exclusive (datetime)
+            longest_minutes: Longest duration an event can have
+        
+        Returns:
+            List of dictionaries with event_id, title, venue, starts_at
+            and duration_minutes, or None on error
+        """
+        query = """
+            SELECT event_id, title, venue, starts_at, duration_minutes
+            FROM events
+            WHERE starts_at < %s AND starts_at > %s - INTERVAL %s MINUTE
+        """
+        return execute_query(query, (end, start, longest_minutes), fetch=True)
+    
+    @staticmethod
+    def get_event_versions():
+        """
+        Get the ID, category and last update time of every event
+        
+        Returns:
+            List of dictionaries with event_id, category and updated_at
+        """
+        query = "SELECT event_id, category, updated_at FROM events ORDER BY event_id"
         return execute_query(query, fetch=True)
     
     @staticmethod
-    def get_upcoming_events():
+    def get_upcoming_events(compact=False):
         """
         Get upcoming events (future events only)
         
+        Args:
+            compact: Return compact row objects instead of dictionaries
+        
         Returns:
             List of upcoming event dictionaries
         """
@@ -69,7 +318,15 @@ class Event:
             WHERE event_date >= CURDATE()
             ORDER BY event_date ASC, event_time ASC
         """
-        return execute_query(query, fetch=True)
+        if compact:
+            return execute_rows(query)
+        
+        events = event_cache.get_or_load(
+            'upcoming',
+            lambda: execute_query(query, fetch=True),
+            tags=('events',)
+        )
+        return list(events) if events is not None else None
     
     @staticmethod
     def get_event_by_id(event_id):
@@ -83,15 +340,21 @@ class Event:
             Event dictionary or None
         """
         query = "SELECT * FROM events WHERE event_id = %s"
-        return execute_one(query, (event_id,))
+        # The identity map returns a copy, so callers can't modify the cached row
+        return identity_get('event', event_id, lambda: event_cache.get_or_load(
+            f'event:{event_id}',
+            lambda: execute_one(query, (event_id,)),
+            tags=(f'event:{event_id}',)
+        ))
     
     @staticmethod
-    def get_events_by_category(category):
+    def get_events_by_category(category, compact=False):
         """
         Get events by category
         
         Args:
             category: Event category
+            compact: Return compact row objects instead of dictionaries
         
         Returns:
             List of event dictionaries
@@ -101,7 +364,83 @@ class Event:
             WHERE category = %s AND event_date >= CURDATE()
             ORDER BY event_date ASC
         """
-        return execute_query(query, (category,), fetch=True)
+        if compact:
+            return execute_rows(query, (category,))
+        
+        events = event_cache.get_or_load(
+            f'category:{category}',
+            lambda: execute_query(query, (category,), fetch=True),
+            tags=('events',)
+        )
+        return list(events) if events is not None else None
+    
+    @staticmethod
+    def get_event_version(event_id):
+        """
+        Get the fields that identify the current version of an event
+        
+        Cheap primary-key lookup used for HTTP conditional requests; it is
+        deliberately not cached so the answer is always current.
+        
+        Args:
+            event_id: Event ID
+        
+        Returns:
+            Dictionary with updated_at and current_participants, or None
+        """
+        query = """
+            SELECT event_id, updated_at, current_participants
+            FROM events WHERE event_id = %s
+        """
+        return execute_one(query, (event_id,))
+    
+    @staticmethod
+    def get_seats(event_ids):
+        """
+        Get current seat counts for several events
+        
+        Args:
+            event_ids: List of event IDs
+        
+        Returns:
+            List of dictionaries with event_id, max_participants and
+            current_participants
+        """
+        if not event_ids:
+            return []
+        
+        placeholders = ', '.join(['%s'] * len(event_ids))
+        query = f"""
+            SELECT event_id, max_participants, current_participants
+            FROM events WHERE event_id IN ({placeholders})
+        """
+        return execute_query(query, tuple(event_ids), fetch=True)
+    
+    @staticmethod
+    def get_listing_version(category=None):
+        """
+        Get the version of the upcoming-events listing
+        
+        Any insert, update, delete or participant count change in the
+        listing changes at least one of the returned values.
+        
+        Args:
+            category: Restrict to one category (optional)
+        
+        Returns:
+            Dictionary with count, updated_at and participants, or None
+        """
+        query = """
+            SELECT COUNT(*) AS count, MAX(updated_at) AS updated_at,
+                   COALESCE(SUM(current_participants), 0) AS participants
+            FROM events
+            WHERE event_date >= CURDATE()
+        """
+        if category:
+            query += " AND category = %s"
+            return execute_one(query, (category,))
+        
+        return execute_one(query)
     
     @staticmethod
     def update_event(event_id, **kwargs):
@@ -116,7 +455,7 @@ class Event:
             Number of affected rows
         """
         allowed_fields = ['title', 'description', 'event_date', 'event_time', 
-                         'venue', 'category', 'price', 'is_paid', 
+                         'duration_minutes', 'venue', 'category', 'price', 'is_paid', 
                          'max_participants', 'registration_deadline']
         
         updates = []
@@ -133,7 +472,9 @@ class Event:
         params.append(event_id)
         query = f"UPDATE events SET {', '.join(updates)} WHERE event_id = %s"
         
-        return execute_query(query, tuple(params))
+        affected = execute_query(query, tuple(params))
+        Event.invalidate_cache(event_id)
+        return affected
     
     @staticmethod
     def delete_event(event_id):
@@ -147,35 +488,50 @@ class Event:
             Number of affected rows
         """
         query = "DELETE FROM events WHERE event_id = %s"
-        return execute_query(query, (event_id,))
+        affected = execute_query(query, (event_id,))
+        Event.invalidate_cache(event_id)
+        return affected
     
     @staticmethod
     def increment_participants(event_id):
         """
-        Increment current participants count
+        Take one place of an event if it isn't full
+        
+        The capacity check and the increment are one conditional update,
+        so concurrent registrations (in any worker) can't overbook.
         
         Args:
             event_id: Event ID
         
         Returns:
-            Number of affected rows
+            Number of affected rows (0 if the event is full or missing),
+            or None on error
         """
-        query = "UPDATE events SET current_participants = current_participants + 1 WHERE event_id = %s"
-        return execute_query(query, (event_id,))
+        query = """
+            UPDATE events SET current_participants = current_participants + 1
+            WHERE event_id = %s AND current_participants < max_participants
+        """
+        affected = execute_query(query, (event_id,))
+        # Also when full: the cached count that let the caller try is stale
+        Event.invalidate_cache(event_id, counts_only=True)
+        return affected
     
     @staticmethod
-    def decrement_participants(event_id):
+    def decrement_participants(event_id, count=1):
         """
         Decrement current participants count
         
         Args:
             event_id: Event ID
+            count: Number of participants to remove
         
         Returns:
             Number of affected rows
         """
-        query = "UPDATE events SET current_participants = current_participants - 1 WHERE event_id = %s AND current_participants > 0"
-        return execute_query(query, (event_id,))
+        query = "UPDATE events SET current_participants = current_participants - %s WHERE event_id = %s AND current_participants >= %s"
+        affected = execute_query(query, (count, event_id, count))
+        Event.invalidate_cache(event_id, counts_only=True)
+        return affected
     
     @staticmethod
     def is_event_full(event_id):
@@ -210,3 +566,56 @@ class Event:
             return 0
         
         return event['max_participants'] - event['current_participants']
+    
+    @staticmethod
+    def invalidate_cache(event_id=None, counts_only=False):
+        """
+        Drop cached event data after a write
+        
+        The event's own row is always dropped, since registration checks
+        need exact seat counts. Listings are dropped too, except after a
+        participant count change, where they are only marked stale and
+        refreshed in the background.
+        
+        Args:
+            event_id: Event whose cached row changed (None for new events)
+            counts_only: True if only current_participants changed
+        """
+        Event.evict_cached(event_id, counts_only)
+        
+        # Other workers evict their copies when they read the change feed
+        if event_id is not None:
+            change_feed.publish('event_seats' if counts_only else 'event', event_id)
+    
+    @staticmethod
+    def evict_cached(event_id=None, counts_only=False):
+        """
+        Drop this worker's cached copies of an event
+        
+        Args:
+            event_id: Event whose cached row changed (None for new events)
+            counts_only: True if only current_participants changed
+        """
+        if event_id is not None:
+            event_cache.invalidate_tag(f'event:{event_id}')
+            identity_evict('event', event_id)
+            seat_feed.changed(event_id)
+        
+        if counts_only:
+            # Rendered pages stay valid: they load seat counts separately
+            event_cache.mark_stale('events')
+        else:
+            event_cache.invalidate_tag('events')
+            invalidate_pages(event_id)
+
+def _evict_remote(event_id, counts_only=False):
+    """Drop cached copies of an event changed by another worker"""
+    if event_id is None:
+        # Change feed reset: anything may have changed
+        event_cache.clear()
+        clear_pages()
+    else:
+        Event.evict_cached(event_id, counts_only)
+
+change_feed.subscribe('event', _evict_remote)
+change_feed.subscribe('event_seats', lambda event_id: _evict_remote(event_id, counts_only=True))
@@ -0,0 +1,196 @@
+"""
+Notification Model
+Handles the in-app notifications feed
+"""
+
+from app.utils.db_config import execute_query, execute_one, execute_many
+from app.models.change import change_feed
+
+# Columns the JSON API may select
+API_FIELDS = ('notification_id', 'event_id', 'message', 'is_read', 'notification_type', 'created_at')
+
+class Notification:
+    """Notification model for database operations"""
+    
+    @staticmethod
+    def create(user_id, event_id, message, notification_type):
+        """
+        Create one notification
+        
+        Args:
+            user_id: Recipient user ID
+            event_id: Related event ID (or None)
+            message: Notification text
+            notification_type: 'registration', 'reminder', 'cancellation'
+                or 'payment'
+        
+        Returns:
+            notification_id if successful, None otherwise
+        """
+        query = """
+            INSERT INTO notifications (user_id, event_id, message, notification_type)
+            VALUES (%s, %s, %s, %s)
+        """
+        notification_id = execute_query(query, (user_id, event_id, message, notification_type))
+        if notification_id:
+            change_feed.publish('notifications', user_id)
+        return notification_id
+    
+    @staticmethod
+    def create_many(user_ids, event_id, message, notification_type, batch_size=1000):
+        """
+        Send the same notification to many users
+        
+        Rows are written as multi-row INSERTs of batch_size rows, so a
+        notice to every attendee of a large event takes a few round
+        trips instead of one per attendee.
+        
+        Args:
+            user_ids: Recipient user IDs
+            event_id: Related event ID (or None)
+            message: Notification text
+            notification_type: Notification type
+            batch_size: Rows per INSERT
+        
+        Returns:
+            Number of notifications written, or None on error (batches
+            before the failing one stay written)
+        """
+        query = """
+            INSERT INTO notifications (user_id, event_id, message, notification_type)
+            VALUES (%s, %s, %s, %s)
+        """
+        results = execute_many(query, [(user_id, event_id, message, notification_type)
+                                       for user_id in user_ids], batch_size)
+        if results is None:
+            return None
+        change_feed.publish_many('notifications', user_ids)
+        return sum(batch['affected_rows'] for batch in results)
+    
+    @staticmethod
+    def get_feed(user_id, before=None, limit=20, fields=None, unread_only=False):
+        """
+        Get a page of a user's notifications, newest first
+        
+        Uses keyset pagination on notification_id, so later pages cost
+        the same as the first.
+        
+        Args:
+            user_id: User ID
+            before: notification_id of the last row of the previous page
+            limit: Maximum number of rows
+            fields: Columns to select (default: all API_FIELDS)
+            unread_only: Only unread notifications
+        
+        Returns:
+            List of notification dictionaries (with event_title), or None
+            on error
+        """
+        columns = ', '.join(f'n.{name}' for name in (fields or API_FIELDS))
+        conditions = ["n.user_id = %s"]
+        params = [user_id]
+        
+        if before is not None:
+            conditions.append("n.notification_id < %s")
+            params.append(before)
+        if unread_only:
+            conditions.append("n.is_read = FALSE")
+        
+        query = f"""
+            SELECT {columns}, e.title AS event_title
+            FROM notifications n
+            LEFT JOIN events e ON n.event_id = e.event_id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY n.notification_id DESC
+            LIMIT %s
+        """
+        params.append(limit)
+        return execute_query(query, tuple(params), fetch=True)
+    
+    @staticmethod
+    def count_unread(user_id):
+        """
+        Count a user's unread notifications
+        
+        Args:
+            user_id: User ID
+        
+        Returns:
+            Number of unread notifications, or None on error
+        """
+        query = """
+            SELECT COUNT(*) AS unread FROM notifications
+            WHERE user_id = %s AND is_read = FALSE
+        """
+        row = execute_one(query, (user_id,))
+        return row['unread'] if row else None
+    
+    @staticmethod
+    def mark_read(user_id, notification_ids=None):
+        """
+        Mark notifications as read in one statement
+        
+        Args:
+            user_id: Owner of the notifications
+            notification_ids: IDs to mark, or None for all unread
+        
+        Returns:
+            Number of notifications that were unread
+        """
+        query = """
+            UPDATE notifications SET is_read = TRUE
+            WHERE user_id = %s AND is_read = FALSE
+        """
+        params = [user_id]
+        
+        if notification_ids is not None:
+            if not notification_ids:
+                return 0
+            query += f" AND notification_id IN ({', '.join(['%s'] * len(notification_ids))})"
+            params.extend(notification_ids)
+        
+        affected = execute_query(query, tuple(params))
+        if affected:
+            change_feed.publish('notifications', user_id)
+        return affected
+    
+    @staticmethod
+    def get_event_recipients(event_id):
+        """
+        Get the users with an active registration for an event
+        
+        Args:
+            event_id: Event ID
+        
+        Returns:
+            List of user IDs, or None on error
+        """
+        query = """
+            SELECT user_id FROM registrations
+            WHERE event_id = %s AND status != 'cancelled'
+        """
+        rows = execute_query(query, (event_id,), fetch=True)
+        return None if rows is None else [row['user_id'] for row in rows]
+    
+    @staticmethod
+    def get_reminder_recipients(event_id):
+        """
+        Get the confirmed attendees of an event who have no reminder yet
+        
+        Args:
+            event_id: Event ID
+        
+        Returns:
+            List of user IDs, or None on error
+        """
+        query = """
+            SELECT r.user_id FROM registrations r
+            WHERE r.event_id = %s AND r.status = 'confirmed'
+              AND NOT EXISTS (
+                  SELECT 1 FROM notifications n
+                  WHERE n.user_id = r.user_id AND n.event_id = r.event_id
+                    AND n.notification_type = 'reminder'
+              )
+        """
+        rows = execute_query(query, (event_id,), fetch=True)
+        return None if rows is None else [row['user_id'] for row in rows]
@@ -3,7 +3,22 @@ Payment Model
 Handles all payment-related database operations
 """
 
-from app.utils.db_config import execute_query, execute_one
+from app.utils.db_config import execute_query, execute_one, execute_stream, execute_rows
+from app.utils.identity_map import identity_get, identity_evict
+
+# Fields the JSON API may select, mapped to their SQL expressions
+API_FIELDS = {
+    'payment_id': 'p.payment_id',
+    'registration_id': 'p.registration_id',
+    'event_id': 'p.event_id',
+    'amount': 'p.amount',
+    'payment_status': 'p.payment_status',
+    'transaction_id': 'p.transaction_id',
+    'payment_method': 'p.payment_method',
+    'payment_date': 'p.payment_date',
+    'title': 'e.title',
+    'event_date': 'e.event_date'
+}
 
 class Payment:
     """Payment model for database operations"""
@@ -33,7 +48,9 @@ class Payment:
         params = (registration_id, user_id, event_id, amount, transaction_id, 
                  payment_method, 'pending')
         
-        return execute_query(query, params)
+        payment_id = execute_query(query, params)
+        identity_evict('payment_by_registration', registration_id)
+        return payment_id
     
     @staticmethod
     def get_payment_by_id(payment_id):
@@ -47,7 +64,7 @@ class Payment:
             Payment dictionary or None
         """
         query = "SELECT * FROM payments WHERE payment_id = %s"
-        return execute_one(query, (payment_id,))
+        return identity_get('payment', payment_id, lambda: execute_one(query, (payment_id,)))
     
     @staticmethod
     def get_payment_by_transaction_id(transaction_id):
@@ -75,15 +92,17 @@ class Payment:
             Payment dictionary or None
         """
         query = "SELECT * FROM payments WHERE registration_id = %s"
-        return execute_one(query, (registration_id,))
+        return identity_get('payment_by_registration', registration_id,
+                            lambda: execute_one(query, (registration_id,)))
     
     @staticmethod
-    def get_user_payments(user_id):
+    def get_user_payments(user_id, compact=False):
         """
         Get all payments for a user with event details
         
         Args:
             user_id: User ID
+            compact: Return compact row objects instead of dictionaries
         
         Returns:
             List of payment dictionaries with event details
@@ -95,15 +114,61 @@ class Payment:
             WHERE p.user_id = %s
             ORDER BY p.payment_date DESC
         """
+        if compact:
+            return execute_rows(query, (user_id,))
+        
         return execute_query(query, (user_id,), fetch=True)
     
     @staticmethod
-    def get_event_payments(event_id):
+    def get_user_payments_page(user_id, fields, status=None, after=None, limit=20):
+        """
+        Get one page of a user's payments, newest first (keyset pagination)
+        
+        Args:
+            user_id: User ID
+            fields: Fields to select (names from API_FIELDS)
+            status: Payment status filter (optional)
+            after: payment_id of the previous page's last row (optional)
+            limit: Maximum number of rows
+        
+        Returns:
+            List of payment dictionaries
+        """
+        names = [name for name in fields if name in API_FIELDS]
+        if 'payment_id' not in names:
+            names.append('payment_id')
+        columns = ', '.join(f"{API_FIELDS[name]} AS {name}" for name in names)
+        
+        conditions = ["p.user_id = %s"]
+        params = [user_id]
+        
+        if status:
+            conditions.append("p.payment_status = %s")
+            params.append(status)
+        if after:
+            conditions.append("p.payment_id < %s")
+            params.append(after)
+        
+        query = f"""
+            SELECT {columns}
+            FROM payments p
+            JOIN events e ON p.event_id = e.event_id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY p.payment_id DESC
+            LIMIT %s
+        """
+        params.append(limit)
+        
+        return execute_query(query, tuple(params), fetch=True)
+    
+    @staticmethod
+    def get_event_payments(event_id, compact=False):
         """
         Get all payments for an event
         
         Args:
             event_id: Event ID
+            compact: Return compact row objects instead of dictionaries
         
         Returns:
             List of payment dictionaries with user details
@@ -115,8 +180,74 @@ class Payment:
             WHERE p.event_id = %s
             ORDER BY p.payment_date DESC
         """
+        if compact:
+            return execute_rows(query, (event_id,))
+        
         return execute_query(query, (event_id,), fetch=True)
     
+    @staticmethod
+    def get_event_payments_page(event_id, limit=50, offset=0, compact=False):
+        """
+        Get one page of payments for an event
+        
+        Args:
+            event_id: Event ID
+            limit: Maximum number of rows to return
+            offset: Number of rows to skip
+            compact: Return compact row objects instead of dictionaries
+        
+        Returns:
+            List of payment dictionaries with user details
+        """
+        query = """
+            SELECT p.*, u.name, u.email
+            FROM payments p
+            JOIN users u ON p.user_id = u.user_id
+            WHERE p.event_id = %s
+            ORDER BY p.payment_date DESC, p.payment_id DESC
+            LIMIT %s OFFSET %s
+        """
+        if compact:
+            return execute_rows(query, (event_id, limit, offset))
+        
+        return execute_query(query, (event_id, limit, offset), fetch=True)
+    
+    @staticmethod
+    def count_event_payments(event_id):
+        """
+        Get total number of payments for an event
+        
+        Args:
+            event_id: Event ID
+        
+        Returns:
+            Count of payments (any status)
+        """
+        query = "SELECT COUNT(*) as count FROM payments WHERE event_id = %s"
+        result = execute_one(query, (event_id,))
+        return result['count'] if result else 0
+    
+    @staticmethod
+    def iter_event_payments(event_id):
+        """
+        Stream all payments for an event with user details
+        
+        Args:
+            event_id: Event ID
+        
+        Yields:
+            Payment dictionaries with user details
+        """
+        query = """
+            SELECT p.payment_id, p.registration_id, u.name, u.email, p.amount,
+                   p.payment_status, p.transaction_id, p.payment_method, p.payment_date
+            FROM payments p
+            JOIN users u ON p.user_id = u.user_id
+            WHERE p.event_id = %s
+            ORDER BY p.payment_id
+        """
+        return execute_stream(query, (event_id,))
+    
     @staticmethod
     def update_payment_status(payment_id, status, transaction_id=None):
         """
@@ -141,7 +272,10 @@ class Payment:
             query = "UPDATE payments SET payment_status = %s WHERE payment_id = %s"
             params = (status, payment_id)
         
-        return execute_query(query, params)
+        affected = execute_query(query, params)
+        identity_evict('payment', payment_id)
+        identity_evict('payment_by_registration')
+        return affected
     
     @staticmethod
     def mark_payment_success(payment_id, transaction_id):
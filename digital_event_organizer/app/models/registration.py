@@ -3,7 +3,29 @@ Registration Model
 Handles all registration-related database operations
 """
 
-from app.utils.db_config import execute_query, execute_one
+import mysql.connector
+from app.utils.db_config import (execute_query, execute_one, execute_stream,
+                                 execute_rows, transaction)
+from app.utils.identity_map import identity_get, identity_evict
+
+# Fields the JSON API may select, mapped to their SQL expressions
+API_FIELDS = {
+    'registration_id': 'r.registration_id',
+    'event_id': 'r.event_id',
+    'registration_date': 'r.registration_date',
+    'status': 'r.status',
+    'payment_required': 'r.payment_required',
+    'group_id': 'r.group_id',
+    'title': 'e.title',
+    'event_date': 'e.event_date',
+    'event_time': 'e.event_time',
+    'venue': 'e.venue',
+    'category': 'e.category',
+    'price': 'e.price'
+}
+
+class GroupRejected(Exception):
+    """Raised inside a group registration transaction to roll it back"""
 
 class Registration:
     """Registration model for database operations"""
@@ -25,14 +47,146 @@ class Registration:
         if Registration.is_user_registered(user_id, event_id):
             return None
         
+        # A cancelled registration is reactivated, keeping its ID
         query = """
             INSERT INTO registrations (user_id, event_id, status, payment_required)
             VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE registration_id = LAST_INSERT_ID(registration_id),
+                status = VALUES(status), payment_required = VALUES(payment_required),
+                registration_date = CURRENT_TIMESTAMP
         """
         status = 'pending' if payment_required else 'confirmed'
         params = (user_id, event_id, status, payment_required)
         
-        return execute_query(query, params)
+        registration_id = execute_query(query, params)
+        identity_evict('registration_by_user_event', (user_id, event_id))
+        return registration_id
+    
+    @staticmethod
+    def create_group(event_id, leader_id, user_ids, payment_required=False):
+        """
+        Register a team for an event, all or nothing
+        
+        One transaction reserves every seat with a single conditional
+        update, records the group and inserts all registrations with one
+        multi-row insert (reusing cancelled registrations of the same
+        users). If the seats aren't available or a member is already
+        registered, nothing is written.
+        
+        Args:
+            event_id: Event ID
+            leader_id: User ID of the member who registers the team
+            user_ids: User IDs of all members, leader included
+            payment_required: Whether payment is required
+        
+        Returns:
+            Tuple (group dictionary with group_id and registrations, None)
+            on success, or (None, reason) where reason is ('full',),
+            ('registered', conflicting user IDs) or ('error',)
+        """
+        status = 'pending' if payment_required else 'confirmed'
+        placeholders = ', '.join(['%s'] * len(user_ids))
+        
+        try:
+            with transaction() as cursor:
+                cursor.execute("""
+                    UPDATE events
+                    SET current_participants = current_participants + %s
+                    WHERE event_id = %s AND current_participants + %s <= max_participants
+                """, (len(user_ids), event_id, len(user_ids)))
+                if cursor.rowcount == 0:
+                    raise GroupRejected('full')
+                
+                cursor.execute(f"""
+                    SELECT user_id FROM registrations
+                    WHERE event_id = %s AND user_id IN ({placeholders}) AND status != 'cancelled'
+                    FOR UPDATE
+                """, (event_id, *user_ids))
+                registered = [row['user_id'] for row in cursor.fetchall()]
+                if registered:
+                    raise GroupRejected('registered', registered)
+                
+                cursor.execute("""
+                    INSERT INTO registration_groups (event_id, leader_id, size)
+                    VALUES (%s, %s, %s)
+                """, (event_id, leader_id, len(user_ids)))
+                group_id = cursor.lastrowid
+                
+                cursor.executemany("""
+                    INSERT INTO registrations (user_id, event_id, group_id, status, payment_required)
+                    VALUES (%s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE group_id = VALUES(group_id), status = VALUES(status),
+                        payment_required = VALUES(payment_required),
+                        registration_date = CURRENT_TIMESTAMP
+                """, [(user_id, event_id, group_id, status, payment_required) for user_id in user_ids])
+                
+                cursor.execute("""
+                    SELECT registration_id, user_id FROM registrations
+                    WHERE group_id = %s ORDER BY registration_id
+                """, (group_id,))
+                registrations = cursor.fetchall()
+            
+            identity_evict('registration_by_user_event')
+            return {'group_id': group_id, 'registrations': registrations}, None
+        
+        except GroupRejected as rejected:
+            return None, rejected.args
+        except mysql.connector.Error as err:
+            print(f"Database error: {err}")
+            return None, ('error',)
+    
+    @staticmethod
+    def get_group(group_id):
+        """
+        Get a registration group
+        
+        Args:
+            group_id: Group ID
+        
+        Returns:
+            Group dictionary or None
+        """
+        query = "SELECT * FROM registration_groups WHERE group_id = %s"
+        return execute_one(query, (group_id,))
+    
+    @staticmethod
+    def get_group_members(group_id):
+        """
+        Get the members of a registration group with user details
+        
+        Args:
+            group_id: Group ID
+        
+        Returns:
+            List of registration dictionaries with name and email
+        """
+        query = """
+            SELECT r.registration_id, r.user_id, r.status, u.name, u.email
+            FROM registrations r
+            JOIN users u ON r.user_id = u.user_id
+            WHERE r.group_id = %s
+            ORDER BY r.registration_id
+        """
+        return execute_query(query, (group_id,), fetch=True)
+    
+    @staticmethod
+    def confirm_group(group_id):
+        """
+        Confirm every pending registration of a group
+        
+        Args:
+            group_id: Group ID
+        
+        Returns:
+            Number of affected rows
+        """
+        query = """
+            UPDATE registrations SET status = 'confirmed'
+            WHERE group_id = %s AND status = 'pending'
+        """
+        affected = execute_query(query, (group_id,))
+        Registration._evict_identity()
+        return affected
     
     @staticmethod
     def get_registration_by_id(registration_id):
@@ -46,36 +200,87 @@ class Registration:
             Registration dictionary or None
         """
         query = "SELECT * FROM registrations WHERE registration_id = %s"
-        return execute_one(query, (registration_id,))
+        return identity_get('registration', registration_id,
+                            lambda: execute_one(query, (registration_id,)))
     
     @staticmethod
-    def get_user_registrations(user_id):
+    def get_user_registrations(user_id, compact=False):
         """
         Get all registrations for a user with event details
         
         Args:
             user_id: User ID
+            compact: Return compact row objects instead of dictionaries
         
         Returns:
             List of registration dictionaries with event details
         """
         query = """
             SELECT r.*, e.title, e.description, e.event_date, e.event_time, 
-                   e.venue, e.category, e.price
+                   e.venue, e.category, e.price,
+                   (SELECT GROUP_CONCAT(sa.seat_label ORDER BY sa.seat_index SEPARATOR ', ')
+                    FROM seat_assignments sa
+                    WHERE sa.registration_id = r.registration_id) AS seats
             FROM registrations r
             JOIN events e ON r.event_id = e.event_id
             WHERE r.user_id = %s
             ORDER BY r.registration_date DESC
         """
+        if compact:
+            return execute_rows(query, (user_id,))
+        
         return execute_query(query, (user_id,), fetch=True)
     
     @staticmethod
-    def get_event_registrations(event_id):
+    def get_user_registrations_page(user_id, fields, status=None, after=None, limit=20):
+        """
+        Get one page of a user's registrations, newest first (keyset pagination)
+        
+        Args:
+            user_id: User ID
+            fields: Fields to select (names from API_FIELDS)
+            status: Registration status filter (optional)
+            after: registration_id of the previous page's last row (optional)
+            limit: Maximum number of rows
+        
+        Returns:
+            List of registration dictionaries
+        """
+        names = [name for name in fields if name in API_FIELDS]
+        if 'registration_id' not in names:
+            names.append('registration_id')
+        columns = ', '.join(f"{API_FIELDS[name]} AS {name}" for name in names)
+        
+        conditions = ["r.user_id = %s"]
+        params = [user_id]
+        
+        if status:
+            conditions.append("r.status = %s")
+            params.append(status)
+        if after:
+            conditions.append("r.registration_id < %s")
+            params.append(after)
+        
+        query = f"""
+            SELECT {columns}
+            FROM registrations r
+            JOIN events e ON r.event_id = e.event_id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY r.registration_id DESC
+            LIMIT %s
+        """
+        params.append(limit)
+        
+        return execute_query(query, tuple(params), fetch=True)
+    
+    @staticmethod
+    def get_event_registrations(event_id, compact=False):
         """
         Get all registrations for an event with user details
         
         Args:
             event_id: Event ID
+            compact: Return compact row objects instead of dictionaries
         
         Returns:
             List of registration dictionaries with user details
@@ -87,8 +292,121 @@ class Registration:
             WHERE r.event_id = %s
             ORDER BY r.registration_date DESC
         """
+        if compact:
+            return execute_rows(query, (event_id,))
+        
         return execute_query(query, (event_id,), fetch=True)
     
+    @staticmethod
+    def get_event_registrations_page(event_id, limit=50, offset=0, compact=False):
+        """
+        Get one page of registrations for an event with user details
+        
+        Args:
+            event_id: Event ID
+            limit: Maximum number of rows to return
+            offset: Number of rows to skip
+            compact: Return compact row objects instead of dictionaries
+        
+        Returns:
+            List of registration dictionaries with user details
+        """
+        query = """
+            SELECT r.*, u.name, u.email, u.phone
+            FROM registrations r
+            JOIN users u ON r.user_id = u.user_id
+            WHERE r.event_id = %s
+            ORDER BY r.registration_date DESC, r.registration_id DESC
+            LIMIT %s OFFSET %s
+        """
+        if compact:
+            return execute_rows(query, (event_id, limit, offset))
+        
+        return execute_query(query, (event_id, limit, offset), fetch=True)
+    
+    @staticmethod
+    def count_event_registrations(event_id):
+        """
+        Get total number of registrations for an event
+        
+        Args:
+            event_id: Event ID
+        
+        Returns:
+            Count of registrations (any status)
+        """
+        query = "SELECT COUNT(*) as count FROM registrations WHERE event_id = %s"
+        result = execute_one(query, (event_id,))
+        return result['count'] if result else 0
+    
+    @staticmethod
+    def iter_event_registrations(event_id):
+        """
+        Stream all registrations for an event with user details
+        
+        Args:
+            event_id: Event ID
+        
+        Yields:
+            Registration dictionaries with user details
+        """
+        query = """
+            SELECT r.registration_id, u.name, u.email, u.phone,
+                   r.registration_date, r.status, r.payment_required
+            FROM registrations r
+            JOIN users u ON r.user_id = u.user_id
+            WHERE r.event_id = %s
+            ORDER BY r.registration_id
+        """
+        return execute_stream(query, (event_id,))
+    
+    @staticmethod
+    def iter_user_calendar(user_id, start, end):
+        """
+        Stream the events a user is registered for, in start order
+        
+        Args:
+            user_id: User ID
+            start: Range start (datetime)
+            end: Range end, exclusive (datetime)
+        
+        Yields:
+            Event dictionaries with the registration status
+        """
+        query = """
+            SELECT e.event_id, e.title, e.description, e.venue, e.category,
+                   e.starts_at, e.duration_minutes, e.updated_at, r.status
+            FROM registrations r
+            JOIN events e ON r.event_id = e.event_id
+            WHERE r.user_id = %s AND r.status != 'cancelled'
+              AND e.starts_at >= %s AND e.starts_at < %s
+            ORDER BY e.starts_at ASC, e.event_id ASC
+        """
+        return execute_stream(query, (user_id, start, end))
+    
+    @staticmethod
+    def get_user_calendar_version(user_id, start, end):
+        """
+        Get the version of a user's calendar feed
+        
+        Args:
+            user_id: User ID
+            start: Range start (datetime)
+            end: Range end, exclusive (datetime)
+        
+        Returns:
+            Dictionary with count, updated_at and checksum, or None
+        """
+        query = """
+            SELECT COUNT(*) AS count, MAX(e.updated_at) AS updated_at,
+                   BIT_XOR(CRC32(CONCAT(e.event_id, '@', e.updated_at, '@', r.status))) AS checksum
+            FROM registrations r
+            JOIN events e ON r.event_id = e.event_id
+            WHERE r.user_id = %s AND r.status != 'cancelled'
+              AND e.starts_at >= %s AND e.starts_at < %s
+        """
+        return execute_one(query, (user_id, start, end))
+    
     @staticmethod
     def is_user_registered(user_id, event_id):
         """
@@ -99,15 +417,35 @@ class Registration:
             event_id: Event ID
         
         Returns:
-            Boolean: True if user is registered
+            Boolean: True if user has a registration that isn't cancelled
         """
-        query = """
-            SELECT COUNT(*) as count 
-            FROM registrations 
-            WHERE user_id = %s AND event_id = %s
+        # Shares the identity-mapped row lookup, so checking twice in one
+        # request costs a single query
+        registration = Registration.get_registration_by_user_event(user_id, event_id)
+        return registration is not None and registration['status'] != 'cancelled'
+    
+    @staticmethod
+    def get_registered_event_ids(user_id, event_ids):
+        """
+        Get which of the given events a user is registered for
+        
+        Args:
+            user_id: User ID
+            event_ids: List of event IDs
+        
+        Returns:
+            List of event IDs
         """
-        result = execute_one(query, (user_id, event_id))
-        return result and result['count'] > 0
+        if not event_ids:
+            return []
+        
+        placeholders = ', '.join(['%s'] * len(event_ids))
+        query = f"""
+            SELECT event_id FROM registrations
+            WHERE user_id = %s AND event_id IN ({placeholders}) AND status != 'cancelled'
+        """
+        rows = execute_query(query, (user_id, *event_ids), fetch=True) or []
+        return [row['event_id'] for row in rows]
     
     @staticmethod
     def update_registration_status(registration_id, status):
@@ -122,7 +460,69 @@ class Registration:
             Number of affected rows
         """
         query = "UPDATE registrations SET status = %s WHERE registration_id = %s"
-        return execute_query(query, (status, registration_id))
+        affected = execute_query(query, (status, registration_id))
+        Registration._evict_identity(registration_id)
+        return affected
+    
+    @staticmethod
+    def update_registrations_status(registration_ids, status, event_id=None, from_status=None,
+                                    batch_size=500):
+        """
+        Update the status of many registrations in batches
+        
+        Each batch is one transaction of two statements: the matching
+        rows are locked with SELECT ... FOR UPDATE and changed with a
+        single UPDATE ... WHERE registration_id IN (...), so the round
+        trips don't grow with the number of registrations.
+        
+        Args:
+            registration_ids: List of registration IDs
+            status: New status ('pending', 'confirmed', 'cancelled')
+            event_id: Only touch registrations of this event (optional)
+            from_status: Only touch registrations currently in this
+                status (optional), e.g. 'pending' when confirming
+            batch_size: Rows per transaction
+        
+        Returns:
+            List of the registration IDs that were updated, or None on
+            error (batches before the failing one stay committed)
+        """
+        registration_ids = list(dict.fromkeys(registration_ids))
+        
+        conditions = ""
+        extra = []
+        if event_id is not None:
+            conditions += " AND event_id = %s"
+            extra.append(event_id)
+        if from_status is not None:
+            conditions += " AND status = %s"
+            extra.append(from_status)
+        
+        updated = []
+        try:
+            for start in range(0, len(registration_ids), batch_size):
+                batch = registration_ids[start:start + batch_size]
+                placeholders = ', '.join(['%s'] * len(batch))
+                with transaction() as cursor:
+                    cursor.execute(f"""
+                        SELECT registration_id FROM registrations
+                        WHERE registration_id IN ({placeholders}){conditions}
+                        FOR UPDATE
+                    """, (*batch, *extra))
+                    matched = [row['registration_id'] for row in cursor.fetchall()]
+                    if matched:
+                        cursor.execute(f"""
+                            UPDATE registrations SET status = %s
+                            WHERE registration_id IN ({', '.join(['%s'] * len(matched))})
+                        """, (status, *matched))
+                updated.extend(matched)
+        except mysql.connector.Error as err:
+            print(f"Database error: {err}")
+            return None
+        finally:
+            Registration._evict_identity()
+        
+        return updated
     
     @staticmethod
     def cancel_registration(registration_id):
@@ -166,7 +566,8 @@ class Registration:
             SELECT * FROM registrations 
             WHERE user_id = %s AND event_id = %s
         """
-        return execute_one(query, (user_id, event_id))
+        return identity_get('registration_by_user_event', (user_id, event_id),
+                            lambda: execute_one(query, (user_id, event_id)))
     
     @staticmethod
     def get_confirmed_registrations_count(event_id):
@@ -199,4 +600,13 @@ class Registration:
             Number of affected rows
         """
         query = "DELETE FROM registrations WHERE registration_id = %s"
-        return execute_query(query, (registration_id,))
+        affected = execute_query(query, (registration_id,))
+        Registration._evict_identity(registration_id)
+        return affected
+    
+    @staticmethod
+    def _evict_identity(registration_id=None):
+        """Drop registration rows from the request identity map after a write"""
+        identity_evict('registration', registration_id)
+        # The user/event lookup key isn't known from a registration ID
+        identity_evict('registration_by_user_event')
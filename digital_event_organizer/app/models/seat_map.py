@@ -0,0 +1,323 @@
+"""
+Seat Map Model
+Handles reserved seating: per-event availability bitmaps and seat assignments
+"""
+
+import mysql.connector
+from app.utils.db_config import execute_query, execute_one, transaction
+from app.utils.seat_bitmap import SeatBitmap
+
+class SeatsUnavailable(Exception):
+    """Raised inside a seat transaction to roll it back"""
+
+class SeatMap:
+    """Seat map model for database operations"""
+    
+    @staticmethod
+    def create_map(event_id, seat_rows, seats_per_row):
+        """
+        Create or resize an event's seat map
+        
+        The event's max_participants becomes the number of seats. Seats
+        already assigned keep their place, so a resize that would drop an
+        assigned seat (or leave fewer seats than participants) is refused.
+        
+        Args:
+            event_id: Event ID
+            seat_rows: Number of rows
+            seats_per_row: Seats in each row
+        
+        Returns:
+            Tuple (True, None) on success, or (False, reason) where reason
+            is 'not_found', 'too_small' or 'error'
+        """
+        bitmap = SeatBitmap(seat_rows, seats_per_row)
+        
+        try:
+            with transaction() as cursor:
+                cursor.execute("""
+                    SELECT current_participants FROM events WHERE event_id = %s FOR UPDATE
+                """, (event_id,))
+                event = cursor.fetchone()
+                if not event:
+                    raise SeatsUnavailable('not_found')
+                if event['current_participants'] > bitmap.capacity:
+                    raise SeatsUnavailable('too_small')
+                
+                cursor.execute("""
+                    SELECT seat_rows, seats_per_row FROM seat_maps WHERE event_id = %s FOR UPDATE
+                """, (event_id,))
+                old = cursor.fetchone()
+                
+                assigned = []
+                if old:
+                    cursor.execute("""
+                        SELECT seat_index FROM seat_assignments WHERE event_id = %s FOR UPDATE
+                    """, (event_id,))
+                    assigned = [row['seat_index'] for row in cursor.fetchall()]
+                
+                # Assigned seats keep their row and seat number
+                moved = {}
+                for index in assigned:
+                    row, seat = divmod(index, old['seats_per_row'])
+                    if row >= seat_rows or seat >= seats_per_row:
+                        raise SeatsUnavailable('too_small')
+                    moved[index] = row * seats_per_row + seat
+                bitmap.take(moved.values())
+                
+                if moved and seats_per_row != old['seats_per_row']:
+                    # Renumber in two passes so no primary key collides
+                    cursor.executemany("""
+                        UPDATE seat_assignments SET seat_index = -1 - seat_index
+                        WHERE event_id = %s AND seat_index = %s
+                    """, [(event_id, index) for index in moved])
+                    cursor.executemany("""
+                        UPDATE seat_assignments SET seat_index = %s
+                        WHERE event_id = %s AND seat_index = -1 - %s
+                    """, [(new, event_id, index) for index, new in moved.items()])
+                
+                cursor.execute("""
+                    INSERT INTO seat_maps (event_id, seat_rows, seats_per_row, availability)
+                    VALUES (%s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE seat_rows = VALUES(seat_rows),
+                        seats_per_row = VALUES(seats_per_row), availability = VALUES(availability)
+                """, (event_id, seat_rows, seats_per_row, bitmap.to_bytes()))
+                
+                cursor.execute("""
+                    UPDATE events SET max_participants = %s WHERE event_id = %s
+                """, (bitmap.capacity, event_id))
+            
+            return True, None
+        
+        except SeatsUnavailable as rejected:
+            return False, rejected.args[0]
+        except mysql.connector.Error as err:
+            print(f"Database error: {err}")
+            return False, 'error'
+    
+    @staticmethod
+    def get_map(event_id):
+        """
+        Get an event's seat availability
+        
+        Args:
+            event_id: Event ID
+        
+        Returns:
+            SeatBitmap, or None if the event has no seat map
+        """
+        query = """
+            SELECT seat_rows, seats_per_row, availability
+            FROM seat_maps WHERE event_id = %s
+        """
+        row = execute_one(query, (event_id,))
+        if not row:
+            return None
+        return SeatBitmap.from_bytes(row['seat_rows'], row['seats_per_row'], row['availability'])
+    
+    @staticmethod
+    def get_assignments(event_id):
+        """
+        Get all seat assignments of an event
+        
+        Args:
+            event_id: Event ID
+        
+        Returns:
+            List of dictionaries with seat_index, seat_label,
+            registration_id and status
+        """
+        query = """
+            SELECT seat_index, seat_label, registration_id, status
+            FROM seat_assignments WHERE event_id = %s
+            ORDER BY seat_index
+        """
+        return execute_query(query, (event_id,), fetch=True)
+    
+    @staticmethod
+    def hold(event_id, registration_ids, labels=None, together=True, confirmed=False):
+        """
+        Assign seats to registrations, one seat each
+        
+        Locks the event's seat map row, picks seats with the bitmap
+        search (or takes the requested labels), and writes the bitmap and
+        all assignments in one transaction.
+        
+        Args:
+            event_id: Event ID
+            registration_ids: Registrations that each need a seat
+            labels: Specific seats wanted, e.g. ['C7', 'C8'] (optional)
+            together: Seat the registrations next to each other if possible
+                (False picks the best single seat for each in turn)
+            confirmed: Confirm the seats right away instead of holding them
+        
+        Returns:
+            Tuple (list of seat labels in registration order, None), or
+            (None, reason) where reason is 'no_map', 'unavailable' or 'error'
+        """
+        status = 'confirmed' if confirmed else 'held'
+        
+        try:
+            with transaction() as cursor:
+                cursor.execute("""
+                    SELECT seat_rows, seats_per_row, availability
+                    FROM seat_maps WHERE event_id = %s FOR UPDATE
+                """, (event_id,))
+                row = cursor.fetchone()
+                if not row:
+                    raise SeatsUnavailable('no_map')
+                
+                bitmap = SeatBitmap.from_bytes(row['seat_rows'], row['seats_per_row'], row['availability'])
+                count = len(registration_ids)
+                
+                if labels:
+                    seats = [bitmap.parse_label(label) for label in labels]
+                    if len(seats) != count or None in seats or len(set(seats)) != count:
+                        raise SeatsUnavailable('unavailable')
+                elif together:
+                    seats = bitmap.find_seats(count)
+                else:
+                    seats = []
+                    for _ in range(count):
+                        block = bitmap.find_block(1)
+                        if block is None:
+                            break
+                        bitmap.take(block)
+                        seats.extend(block)
+                    bitmap.free(seats)
+                    if len(seats) != count:
+                        seats = None
+                
+                if seats is None or not bitmap.take(seats):
+                    raise SeatsUnavailable('unavailable')
+                
+                cursor.execute("""
+                    UPDATE seat_maps SET availability = %s WHERE event_id = %s
+                """, (bitmap.to_bytes(), event_id))
+                
+                cursor.executemany("""
+                    INSERT INTO seat_assignments (event_id, seat_index, seat_label, registration_id, status)
+                    VALUES (%s, %s, %s, %s, %s)
+                """, [(event_id, seat, bitmap.label(seat), registration_id, status)
+                      for seat, registration_id in zip(seats, registration_ids)])
+            
+            return [bitmap.label(seat) for seat in seats], None
+        
+        except SeatsUnavailable as rejected:
+            return None, rejected.args[0]
+        except mysql.connector.Error as err:
+            print(f"Database error: {err}")
+            return None, 'error'
+    
+    @staticmethod
+    def confirm(registration_ids):
+        """
+        Turn held seats into confirmed ones (e.g. after payment)
+        
+        Args:
+            registration_ids: List of registration IDs
+        
+        Returns:
+            Number of affected rows
+        """
+        if not registration_ids:
+            return 0
+        
+        placeholders = ', '.join(['%s'] * len(registration_ids))
+        query = f"""
+            UPDATE seat_assignments SET status = 'confirmed'
+            WHERE registration_id IN ({placeholders}) AND status = 'held'
+        """
+        return execute_query(query, tuple(registration_ids))
+    
+    @staticmethod
+    def release(event_id, registration_ids):
+        """
+        Free the seats of registrations (e.g. after a cancellation)
+        
+        Args:
+            event_id: Event ID
+            registration_ids: List of registration IDs
+        
+        Returns:
+            List of freed seat labels, or None on error
+        """
+        if not registration_ids:
+            return []
+        
+        placeholders = ', '.join(['%s'] * len(registration_ids))
+        
+        try:
+            with transaction() as cursor:
+                cursor.execute("""
+                    SELECT seat_rows, seats_per_row, availability
+                    FROM seat_maps WHERE event_id = %s FOR UPDATE
+                """, (event_id,))
+                row = cursor.fetchone()
+                if not row:
+                    return []
+                
+                cursor.execute(f"""
+                    SELECT seat_index, seat_label FROM seat_assignments
+                    WHERE event_id = %s AND registration_id IN ({placeholders})
+                """, (event_id, *registration_ids))
+                seats = cursor.fetchall()
+                if not seats:
+                    return []
+                
+                bitmap = SeatBitmap.from_bytes(row['seat_rows'], row['seats_per_row'], row['availability'])
+                bitmap.free(seat['seat_index'] for seat in seats)
+                
+                cursor.execute(f"""
+                    DELETE FROM seat_assignments
+                    WHERE event_id = %s AND registration_id IN ({placeholders})
+                """, (event_id, *registration_ids))
+                cursor.execute("""
+                    UPDATE seat_maps SET availability = %s WHERE event_id = %s
+                """, (bitmap.to_bytes(), event_id))
+            
+            return [seat['seat_label'] for seat in seats]
+        
+        except mysql.connector.Error as err:
+            print(f"Database error: {err}")
+            return None
+    
+    @staticmethod
+    def rebuild(event_id):
+        """
+        Recompute an event's bitmap from its seat assignments
+        
+        Repairs the bitmap after registrations were deleted directly
+        (their assignments go with them through ON DELETE CASCADE).
+        
+        Args:
+            event_id: Event ID
+        
+        Returns:
+            Number of free seats, or None if there is no map or on error
+        """
+        try:
+            with transaction() as cursor:
+                cursor.execute("""
+                    SELECT seat_rows, seats_per_row FROM seat_maps
+                    WHERE event_id = %s FOR UPDATE
+                """, (event_id,))
+                row = cursor.fetchone()
+                if not row:
+                    return None
+                
+                cursor.execute("""
+                    SELECT seat_index FROM seat_assignments WHERE event_id = %s
+                """, (event_id,))
+                bitmap = SeatBitmap(row['seat_rows'], row['seats_per_row'])
+                bitmap.take(seat['seat_index'] for seat in cursor.fetchall())
+                
+                cursor.execute("""
+                    UPDATE seat_maps SET availability = %s WHERE event_id = %s
+                """, (bitmap.to_bytes(), event_id))
+            
+            return bitmap.free_count()
+        
+        except mysql.connector.Error as err:
+            print(f"Database error: {err}")
+            return None
@@ -3,7 +3,8 @@ User Model
 Handles all user-related database operations
 """
 
-from app.utils.db_config import execute_query, execute_one
+from app.utils.db_config import execute_query, execute_one, execute_rows
+from app.utils.identity_map import identity_get, identity_evict
 from werkzeug.security import generate_password_hash, check_password_hash
 
 class User:
@@ -47,7 +48,7 @@ class User:
             User dictionary or None
         """
         query = "SELECT * FROM users WHERE email = %s"
-        return execute_one(query, (email,))
+        return identity_get('user_by_email', email, lambda: execute_one(query, (email,)))
     
     @staticmethod
     def get_user_by_id(user_id):
@@ -61,7 +62,28 @@ class User:
             User dictionary or None
         """
         query = "SELECT * FROM users WHERE user_id = %s"
-        return execute_one(query, (user_id,))
+        return identity_get('user', user_id, lambda: execute_one(query, (user_id,)))
+    
+    @staticmethod
+    def get_users_by_emails(emails):
+        """
+        Get several users by email in one query
+        
+        Args:
+            emails: List of emails
+        
+        Returns:
+            List of user dictionaries (without passwords)
+        """
+        if not emails:
+            return []
+        
+        placeholders = ', '.join(['%s'] * len(emails))
+        query = f"""
+            SELECT user_id, name, email, role FROM users
+            WHERE email IN ({placeholders})
+        """
+        return execute_query(query, tuple(emails), fetch=True)
     
     @staticmethod
     def verify_password(stored_password, provided_password):
@@ -107,17 +129,26 @@ class User:
         params.append(user_id)
         query = f"UPDATE users SET {', '.join(updates)} WHERE user_id = %s"
         
-        return execute_query(query, tuple(params))
+        affected = execute_query(query, tuple(params))
+        identity_evict('user', user_id)
+        identity_evict('user_by_email')
+        return affected
     
     @staticmethod
-    def get_all_users():
+    def get_all_users(compact=False):
         """
         Get all users
         
+        Args:
+            compact: Return compact row objects instead of dictionaries
+        
         Returns:
             List of user dictionaries
         """
         query = "SELECT user_id, name, email, phone, role, created_at FROM users ORDER BY created_at DESC"
+        if compact:
+            return execute_rows(query)
+        
         return execute_query(query, fetch=True)
     
     @staticmethod
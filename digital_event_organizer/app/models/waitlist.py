@@ -0,0 +1,273 @@
+"""
+Waitlist Model
+Handles the FIFO waitlist of full events
+"""
+
+import mysql.connector
+from app.utils.db_config import execute_query, execute_one, transaction
+from app.utils.identity_map import identity_evict
+from app.models.change import change_feed
+
+class Waitlist:
+    """Waitlist model for database operations"""
+    
+    @staticmethod
+    def join(event_id, user_id):
+        """
+        Add a user to the end of an event's waitlist
+        
+        A user who left (or was promoted and later cancelled) joins again
+        at the end of the queue.
+        
+        Args:
+            event_id: Event ID
+            user_id: User ID
+        
+        Returns:
+            waitlist_id of the user's entry, or None on error
+        """
+        try:
+            with transaction() as cursor:
+                cursor.execute("""
+                    DELETE FROM waitlist
+                    WHERE event_id = %s AND user_id = %s AND status != 'waiting'
+                """, (event_id, user_id))
+                cursor.execute("""
+                    INSERT IGNORE INTO waitlist (event_id, user_id)
+                    VALUES (%s, %s)
+                """, (event_id, user_id))
+                
+                if cursor.rowcount:
+                    waitlist_id = cursor.lastrowid
+                    change_feed.publish('waitlist', event_id, cursor)
+                    return waitlist_id
+                
+                # Already waiting
+                cursor.execute("""
+                    SELECT waitlist_id FROM waitlist
+                    WHERE event_id = %s AND user_id = %s
+                """, (event_id, user_id))
+                return cursor.fetchone()['waitlist_id']
+        
+        except mysql.connector.Error as err:
+            print(f"Database error: {err}")
+            return None
+    
+    @staticmethod
+    def leave(event_id, user_id):
+        """
+        Remove a user from an event's waitlist
+        
+        Args:
+            event_id: Event ID
+            user_id: User ID
+        
+        Returns:
+            Number of affected rows
+        """
+        query = """
+            UPDATE waitlist SET status = 'left'
+            WHERE event_id = %s AND user_id = %s AND status = 'waiting'
+        """
+        affected = execute_query(query, (event_id, user_id))
+        if affected:
+            change_feed.publish('waitlist', event_id)
+        return affected
+    
+    @staticmethod
+    def get_entry(event_id, user_id):
+        """
+        Get a user's waitlist entry for an event
+        
+        Args:
+            event_id: Event ID
+            user_id: User ID
+        
+        Returns:
+            Waitlist dictionary or None
+        """
+        query = "SELECT * FROM waitlist WHERE event_id = %s AND user_id = %s"
+        return execute_one(query, (event_id, user_id))
+    
+    @staticmethod
+    def get_waiting(event_id):
+        """
+        Get the users waiting for an event in queue order
+        
+        Args:
+            event_id: Event ID
+        
+        Returns:
+            List of dictionaries with waitlist_id and user_id
+        """
+        query = """
+            SELECT waitlist_id, user_id FROM waitlist
+            WHERE event_id = %s AND status = 'waiting'
+            ORDER BY waitlist_id
+        """
+        return execute_query(query, (event_id,), fetch=True)
+    
+    @staticmethod
+    def get_events_with_openings():
+        """
+        Get upcoming events that have both free seats and waiting users
+        
+        Returns:
+            List of event IDs, or None on error
+        """
+        query = """
+            SELECT e.event_id
+            FROM events e
+            WHERE e.current_participants < e.max_participants
+              AND e.event_date >= CURDATE()
+              AND EXISTS (SELECT 1 FROM waitlist w
+                          WHERE w.event_id = e.event_id AND w.status = 'waiting')
+        """
+        rows = execute_query(query, fetch=True)
+        if rows is None:
+            return None
+        return [row['event_id'] for row in rows]
+    
+    @staticmethod
+    def promote(event_id, limit=None):
+        """
+        Move the next waiting users into registrations
+        
+        Runs as one transaction: the event row is locked, the first
+        waiting users (up to the free seats) are registered with one
+        multi-row insert, their entries are marked promoted and the
+        participant count is raised once. Promoted users of paid events
+        get a pending registration that holds the seat until they pay.
+        
+        Args:
+            event_id: Event ID
+            limit: Maximum number of users to promote (optional)
+        
+        Returns:
+            List of dictionaries with waitlist_id, user_id, name, email,
+            registration_id and payment_required, or None on error
+        """
+        try:
+            with transaction() as cursor:
+                cursor.execute("""
+                    SELECT is_paid, max_participants, current_participants
+                    FROM events WHERE event_id = %s FOR UPDATE
+                """, (event_id,))
+                event = cursor.fetchone()
+                if not event:
+                    return []
+                
+                seats = event['max_participants'] - event['current_participants']
+                if limit is not None:
+                    seats = min(seats, limit)
+                if seats <= 0:
+                    return []
+                
+                # Users who got a seat some other way since joining are skipped
+                cursor.execute("""
+                    SELECT w.waitlist_id, w.user_id, u.name, u.email
+                    FROM waitlist w
+                    JOIN users u ON w.user_id = u.user_id
+                    WHERE w.event_id = %s AND w.status = 'waiting'
+                      AND NOT EXISTS (SELECT 1 FROM registrations r
+                                      WHERE r.user_id = w.user_id AND r.event_id = w.event_id
+                                        AND r.status != 'cancelled')
+                    ORDER BY w.waitlist_id
+                    LIMIT %s
+                    FOR UPDATE
+                """, (event_id, seats))
+                promoted = cursor.fetchall()
+                if not promoted:
+                    return []
+                
+                payment_required = bool(event['is_paid'])
+                status = 'pending' if payment_required else 'confirmed'
+                
+                # Cancelled registrations of the same users are reused
+                cursor.executemany("""
+                    INSERT INTO registrations (user_id, event_id, status, payment_required)
+                    VALUES (%s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE status = VALUES(status),
+                        payment_required = VALUES(payment_required),
+                        registration_date = CURRENT_TIMESTAMP
+                """, [(row['user_id'], event_id, status, payment_required) for row in promoted])
+                
+                user_ids = [row['user_id'] for row in promoted]
+                placeholders = ', '.join(['%s'] * len(user_ids))
+                cursor.execute(f"""
+                    SELECT user_id, registration_id FROM registrations
+                    WHERE event_id = %s AND user_id IN ({placeholders})
+                """, (event_id, *user_ids))
+                registration_ids = {row['user_id']: row['registration_id'] for row in cursor.fetchall()}
+                
+                waitlist_ids = [row['waitlist_id'] for row in promoted]
+                cursor.execute(f"""
+                    UPDATE waitlist SET status = 'promoted', promoted_at = CURRENT_TIMESTAMP
+                    WHERE waitlist_id IN ({', '.join(['%s'] * len(waitlist_ids))})
+                """, tuple(waitlist_ids))
+                
+                cursor.execute("""
+                    UPDATE events SET current_participants = current_participants + %s
+                    WHERE event_id = %s
+                """, (len(promoted), event_id))
+                change_feed.publish('waitlist', event_id, cursor)
+            
+            identity_evict('registration_by_user_event')
+            
+            return [{
+                'waitlist_id': row['waitlist_id'],
+                'user_id': row['user_id'],
+                'name': row['name'],
+                'email': row['email'],
+                'registration_id': registration_ids[row['user_id']],
+                'payment_required': payment_required
+            } for row in promoted]
+        
+        except mysql.connector.Error as err:
+            print(f"Database error: {err}")
+            return None
+    
+    @staticmethod
+    def revert_promotion(event_id, promoted):
+        """
+        Undo a promotion, e.g. when no seats could be assigned
+        
+        In one transaction the registrations are cancelled, the entries
+        go back to waiting (keeping their place in the queue) and the
+        participant count is lowered again.
+        
+        Args:
+            event_id: Event ID
+            promoted: Rows returned by promote()
+        
+        Returns:
+            Boolean: True if the promotion was undone
+        """
+        registration_ids = [row['registration_id'] for row in promoted]
+        waitlist_ids = [row['waitlist_id'] for row in promoted]
+        
+        try:
+            with transaction() as cursor:
+                cursor.execute(f"""
+                    UPDATE registrations SET status = 'cancelled'
+                    WHERE registration_id IN ({', '.join(['%s'] * len(registration_ids))})
+                """, tuple(registration_ids))
+                
+                cursor.execute(f"""
+                    UPDATE waitlist SET status = 'waiting', promoted_at = NULL
+                    WHERE waitlist_id IN ({', '.join(['%s'] * len(waitlist_ids))})
+                """, tuple(waitlist_ids))
+                
+                cursor.execute("""
+                    UPDATE events SET current_participants = current_participants - %s
+                    WHERE event_id = %s AND current_participants >= %s
+                """, (len(promoted), event_id, len(promoted)))
+                change_feed.publish('waitlist', event_id, cursor)
+            
+            identity_evict('registration')
+            identity_evict('registration_by_user_event')
+            return True
+        
+        except mysql.connector.Error as err:
+            print(f"Database error: {err}")
+            return False
@@ -3,10 +3,14 @@ Admin Routes
 Handles all admin-related HTTP routes
 """
 
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, Response, stream_with_context
 from app.controllers.admin_controller import AdminController
 from app.controllers.event_controller import EventController
+from app.controllers.seat_controller import SeatController
+from app.controllers.checkin_controller import CheckinController
+from app.utils.validators import validate_date
 from functools import wraps
+from datetime import datetime, date, timedelta
 
 # Create Blueprint
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
@@ -88,7 +92,8 @@ def create_event():
             'price': request.form.get('price', 0),
             'is_paid': request.form.get('is_paid', 'false'),
             'max_participants': request.form.get('max_participants', 100),
-            'registration_deadline': request.form.get('registration_deadline')
+            'registration_deadline': request.form.get('registration_deadline'),
+            'duration_minutes': request.form.get('duration_minutes')
         }
         
         # Create event
@@ -134,6 +139,8 @@ def edit_event(event_id):
             data['max_participants'] = request.form.get('max_participants')
         if request.form.get('registration_deadline'):
             data['registration_deadline'] = request.form.get('registration_deadline')
+        if request.form.get('duration_minutes'):
+            data['duration_minutes'] = request.form.get('duration_minutes')
         
         # Update event
         success, message = EventController.update_event(event_id, data)
@@ -169,14 +176,112 @@ def view_participants(event_id):
         flash('Event not found', 'danger')
         return redirect(url_for('admin.manage_events'))
     
-    participants = AdminController.get_event_participants(event_id)
-    payments = AdminController.get_event_payments(event_id)
+    page = request.args.get('page', 1, type=int)
+    payments_page = request.args.get('payments_page', 1, type=int)
+    
+    participants = AdminController.get_event_participants_page(event_id, page)
+    payments = AdminController.get_event_payments_page(event_id, payments_page)
     
     return render_template('admin/view_participants.html', 
                          event=event, 
                          participants=participants,
                          payments=payments)
 
+@admin_bp.route('/events/<int:event_id>/participants/confirm', methods=['POST'])
+@admin_required
+def confirm_participants(event_id):
+    """Confirm the selected pending registrations"""
+    registration_ids = request.form.getlist('registration_ids')
+    
+    success, message = AdminController.confirm_registrations(event_id, registration_ids)
+    flash(message, 'success' if success else 'danger')
+    
+    return redirect(url_for('admin.view_participants', event_id=event_id))
+
+@admin_bp.route('/events/<int:event_id>/participants/export.csv')
+@admin_required
+def export_participants(event_id):
+    """Download all participants of an event as CSV"""
+    chunks = AdminController.export_event_participants_csv(event_id)
+    return _csv_response(chunks, f'event_{event_id}_participants.csv')
+
+@admin_bp.route('/events/<int:event_id>/payments/export.csv')
+@admin_required
+def export_payments(event_id):
+    """Download all payments of an event as CSV"""
+    chunks = AdminController.export_event_payments_csv(event_id)
+    return _csv_response(chunks, f'event_{event_id}_payments.csv')
+
+def _csv_response(chunks, filename):
+    """Wrap a CSV chunk generator in a streaming download response"""
+    return Response(
+        stream_with_context(chunks),
+        mimetype='text/csv',
+        headers={
+            'Content-Disposition': f'attachment; filename={filename}',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+@admin_bp.route('/conflicts')
+@admin_required
+def venue_conflicts():
+    """Report of double-booked venues in a period (default: next six months)"""
+    start = request.args.get('from') or date.today().isoformat()
+    end = request.args.get('to') or (date.today() + timedelta(days=183)).isoformat()
+    
+    if not validate_date(start) or not validate_date(end):
+        flash('Invalid date format (use YYYY-MM-DD)', 'danger')
+        return redirect(url_for('admin.venue_conflicts'))
+    
+    # The end date is inclusive
+    conflicts = EventController.find_venue_conflicts(
+        datetime.strptime(start, '%Y-%m-%d'),
+        datetime.strptime(end, '%Y-%m-%d') + timedelta(days=1)
+    )
+    
+    if conflicts is None:
+        flash('Could not load the venue schedule', 'danger')
+        conflicts = []
+    
+    return render_template('admin/venue_conflicts.html', conflicts=conflicts,
+                         start=start, end=end)
+
+@admin_bp.route('/events/<int:event_id>/seats', methods=['GET', 'POST'])
+@admin_required
+def seat_map(event_id):
+    """View an event's seat map, or create/resize it"""
+    event = EventController.get_event_details(event_id)
+    
+    if not event:
+        flash('Event not found', 'danger')
+        return redirect(url_for('admin.manage_events'))
+    
+    if request.method == 'POST':
+        success, message = SeatController.create_seat_map(
+            event_id, request.form.get('seat_rows'), request.form.get('seats_per_row')
+        )
+        flash(message, 'success' if success else 'danger')
+        return redirect(url_for('admin.seat_map', event_id=event_id))
+    
+    layout = SeatController.get_seat_layout(event_id)
+    
+    return render_template('admin/seat_map.html', event=event, layout=layout)
+
+@admin_bp.route('/events/<int:event_id>/checkin')
+@admin_required
+def checkin(event_id):
+    """Gate scanner page of an event"""
+    event = EventController.get_event_details(event_id)
+    
+    if not event:
+        flash('Event not found', 'danger')
+        return redirect(url_for('admin.manage_events'))
+    
+    stats = CheckinController.get_stats(event_id)
+    
+    return render_template('admin/checkin.html', event=event, stats=stats)
+
 @admin_bp.route('/users')
 @admin_required
 def manage_users():
@@ -0,0 +1,302 @@
+"""
+API Routes
+Versioned JSON API for the mobile app and kiosk screens
+"""
+
+import hashlib
+from functools import wraps
+from flask import Blueprint, request, session
+from app.controllers.event_controller import EventController
+from app.controllers.user_controller import UserController
+from app.controllers.payment_controller import PaymentController
+from app.controllers.checkin_controller import CheckinController
+from app.controllers.notification_controller import NotificationController
+from app.models.event import API_FIELDS as EVENT_FIELDS, PAGE_ORDER as EVENT_ORDER
+from app.models.registration import API_FIELDS as REGISTRATION_FIELDS
+from app.models.payment import API_FIELDS as PAYMENT_FIELDS
+from app.models.notification import API_FIELDS as NOTIFICATION_FIELDS
+from app.utils.validators import validate_date
+from app.utils.serializers import (json_response, parse_fields, select_fields,
+                                   encode_cursor, decode_cursor)
+from app.utils.http_cache import make_etag, is_not_modified, not_modified, apply_cache_headers
+
+# Create Blueprint
+api_bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# Seconds clients may reuse a response without revalidating
+API_MAX_AGE = 30
+
+class ApiError(Exception):
+    """Client error reported as a JSON error body"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+@api_bp.errorhandler(ApiError)
+def handle_api_error(error):
+    return json_response({'error': error.message}, error.status)
+
+def api_login_required(f):
+    """Like login_required, but answers 401 JSON instead of redirecting"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'user_id' not in session:
+            raise ApiError("Authentication required", 401)
+        return f(*args, **kwargs)
+    return decorated_function
+
+def api_admin_required(f):
+    """Like admin_required, but answers 401 JSON instead of redirecting"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'user_id' not in session or session.get('user_role') != 'admin':
+            raise ApiError("Admin access required", 401)
+        return f(*args, **kwargs)
+    return decorated_function
+
+def _fields(allowed, id_field):
+    """Parse ?fields=, always including the ID"""
+    try:
+        return parse_fields(request.args.get('fields', ''), allowed, always=(id_field,))
+    except ValueError as e:
+        raise ApiError(str(e))
+
+def _limit():
+    """Parse ?limit= (1 to MAX_LIMIT)"""
+    value = request.args.get('limit', str(DEFAULT_LIMIT))
+    if not value.isdigit() or not 1 <= int(value) <= MAX_LIMIT:
+        raise ApiError(f"limit must be between 1 and {MAX_LIMIT}")
+    return int(value)
+
+def _cursor(size):
+    """Parse ?cursor= into keyset values (None for the first page)"""
+    token = request.args.get('cursor')
+    if not token:
+        return None
+    try:
+        return decode_cursor(token, size)
+    except ValueError as e:
+        raise ApiError(str(e))
+
+def _date_arg(name):
+    """Parse an optional YYYY-MM-DD argument"""
+    value = request.args.get(name)
+    if value and not validate_date(value):
+        raise ApiError(f"{name} must be a date (YYYY-MM-DD)")
+    return value or None
+
+def _bool_arg(name):
+    """Parse an optional true/false argument"""
+    value = request.args.get(name)
+    if value is None or value == '':
+        return None
+    if value.lower() in ('1', 'true', 'yes'):
+        return True
+    if value.lower() in ('0', 'false', 'no'):
+        return False
+    raise ApiError(f"{name} must be true or false")
+
+def _page(rows, fields, limit, cursor_of):
+    """
+    Build a paged response body
+
+    Models are asked for limit + 1 rows; the extra row only tells
+    whether another page exists.
+    """
+    if rows is None:
+        raise ApiError("Database error", 500)
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return {
+        'data': [select_fields(row, fields) for row in rows],
+        'next_cursor': encode_cursor(cursor_of(rows[-1])) if has_more else None
+    }
+
+def _respond(body):
+    """
+    Encode a body with ETag validation
+
+    The ETag is derived from the encoded body, so unchanged data costs
+    the client a 304 without a payload.
+    """
+    response = json_response(body)
+    etag = make_etag('api', hashlib.sha1(response.get_data()).hexdigest())
+
+    if is_not_modified(etag):
+        return not_modified(etag, max_age=API_MAX_AGE)
+    return apply_cache_headers(response, etag, max_age=API_MAX_AGE)
+
+@api_bp.route('/events')
+def list_events():
+    """Events in date order, filterable by date range, category and is_paid"""
+    fields = _fields(EVENT_FIELDS, 'event_id')
+    limit = _limit()
+    after = _cursor(len(EVENT_ORDER))
+    filters = {
+        'start_date': _date_arg('from'),
+        'end_date': _date_arg('to'),
+        'category': request.args.get('category') or None,
+        'is_paid': _bool_arg('is_paid')
+    }
+
+    rows = EventController.get_events_page(fields, filters, after, limit + 1)
+
+    return _respond(_page(rows, fields, limit,
+                          lambda row: [row[name] for name in EVENT_ORDER]))
+
+@api_bp.route('/events/<int:event_id>')
+def get_event(event_id):
+    """Single event"""
+    fields = _fields(EVENT_FIELDS, 'event_id')
+    event = EventController.get_event_details(event_id)
+
+    if not event:
+        raise ApiError("Event not found", 404)
+
+    return _respond({'data': select_fields(event, fields)})
+
+@api_bp.route('/events/<int:event_id>/group-registrations', methods=['POST'])
+@api_login_required
+def register_group(event_id):
+    """Register a team: {"emails": [...]} with the teammates' account emails"""
+    body = request.get_json(silent=True) or {}
+    emails = body.get('emails')
+    if not isinstance(emails, list):
+        raise ApiError("emails must be a list")
+    
+    success, message, data = EventController.register_group(session['user_id'], event_id, emails)
+    
+    if not success:
+        raise ApiError(message, 404 if message == "Event not found" else 409)
+    
+    return json_response({'message': message, 'data': data}, 201)
+
+# HTTP status of each scan outcome
+SCAN_STATUS = {'ok': 200, 'duplicate': 409, 'wrong_event': 409, 'revoked': 409,
+               'invalid': 400, 'error': 503}
+
+@api_bp.route('/checkin/scans', methods=['POST'])
+@api_admin_required
+def scan_ticket():
+    """Check in a scanned ticket: {"token": ..., "event_id": ..., "gate": ...}"""
+    body = request.get_json(silent=True) or {}
+    event_id = body.get('event_id')
+    if event_id is not None and not isinstance(event_id, int):
+        raise ApiError("event_id must be an integer")
+    gate = body.get('gate')
+    if gate is not None and (not isinstance(gate, str) or len(gate) > 50):
+        raise ApiError("gate must be a string of up to 50 characters")
+    
+    status, message, data = CheckinController.scan(str(body.get('token', '')), event_id, gate)
+    
+    return json_response({'status': status, 'message': message, 'data': data}, SCAN_STATUS[status])
+
+@api_bp.route('/events/<int:event_id>/checkins')
+@api_admin_required
+def checkin_stats(event_id):
+    """Check-in progress of an event"""
+    return json_response({'data': CheckinController.get_stats(event_id)})
+
+@api_bp.route('/events/<int:event_id>/checkin/snapshot')
+@api_admin_required
+def checkin_snapshot(event_id):
+    """Registration snapshot for offline scanners; ?since=<version> for changes only"""
+    since = request.args.get('since')
+    if since is not None and not since.isdigit():
+        raise ApiError("since must be a snapshot version")
+    
+    success, message, data = CheckinController.get_snapshot(event_id, int(since) if since else None)
+    
+    if not success:
+        raise ApiError(message, 404 if message == "Event not found" else 503)
+    
+    return json_response({'data': data})
+
+@api_bp.route('/events/<int:event_id>/checkin/sync', methods=['POST'])
+@api_admin_required
+def checkin_sync(event_id):
+    """Upload offline scans: {"device": ..., "scans": [[registration_id, unix_time], ...]}"""
+    body = request.get_json(silent=True) or {}
+    device = body.get('device')
+    if device is not None and (not isinstance(device, str) or len(device) > 50):
+        raise ApiError("device must be a string of up to 50 characters")
+    
+    success, message, data = CheckinController.sync_scans(event_id, body.get('scans'), device)
+    
+    if not success:
+        if message == "Event not found":
+            raise ApiError(message, 404)
+        raise ApiError(message, 503 if message.startswith("Could not") else 400)
+    
+    return json_response({'message': message, 'data': data})
+
+@api_bp.route('/me/registrations')
+@api_login_required
+def my_registrations():
+    """The logged-in user's registrations, newest first"""
+    fields = _fields(REGISTRATION_FIELDS, 'registration_id')
+    limit = _limit()
+    after = _cursor(1)
+
+    rows = UserController.get_user_registrations_page(
+        session['user_id'], fields, request.args.get('status') or None,
+        after[0] if after else None, limit + 1
+    )
+
+    return _respond(_page(rows, fields, limit, lambda row: [row['registration_id']]))
+
+@api_bp.route('/me/payments')
+@api_login_required
+def my_payments():
+    """The logged-in user's payments, newest first"""
+    fields = _fields(PAYMENT_FIELDS, 'payment_id')
+    limit = _limit()
+    after = _cursor(1)
+
+    rows = PaymentController.get_user_payments_page(
+        session['user_id'], fields, request.args.get('status') or None,
+        after[0] if after else None, limit + 1
+    )
+
+    return _respond(_page(rows, fields, limit, lambda row: [row['payment_id']]))
+
+@api_bp.route('/me/notifications')
+@api_login_required
+def my_notifications():
+    """The logged-in user's notifications, newest first; filter unread=true"""
+    fields = _fields(NOTIFICATION_FIELDS, 'notification_id')
+    limit = _limit()
+    after = _cursor(1)
+
+    rows = NotificationController.get_feed_page(
+        session['user_id'], fields, bool(_bool_arg('unread')),
+        after[0] if after else None, limit + 1
+    )
+
+    body = _page(rows, fields, limit, lambda row: [row['notification_id']])
+    body['unread'] = NotificationController.get_unread_count(session['user_id'])
+    return json_response(body)
+
+@api_bp.route('/me/notifications/read', methods=['POST'])
+@api_login_required
+def mark_notifications_read():
+    """Mark notifications as read: {"ids": [...]}, or {} for all"""
+    body = request.get_json(silent=True) or {}
+    ids = body.get('ids')
+    if ids is not None and not isinstance(ids, list):
+        raise ApiError("ids must be a list")
+
+    success, message = NotificationController.mark_read(session['user_id'], ids)
+
+    if not success:
+        raise ApiError(message, 400 if message == "Invalid notification IDs" else 500)
+
+    return json_response({'message': message,
+                          'unread': NotificationController.get_unread_count(session['user_id'])})
@@ -3,45 +3,217 @@ Event Routes
 Handles event-related public routes
 """
 
-from flask import Blueprint, render_template, request, jsonify
+from datetime import date
+import json
+import os
+from flask import Blueprint, render_template, request, jsonify, make_response, session, url_for, Response
 from app.controllers.event_controller import EventController
+from app.controllers.notification_controller import NotificationController
+from app.controllers.waitlist_controller import WaitlistController
+from app.utils.http_cache import make_etag, is_not_modified, not_modified, apply_cache_headers
+from app.utils.page_cache import cached_page
+from app.utils.serializers import json_response
+from app.utils.ical import iter_calendar, calendar_response
 
 # Create Blueprint
 event_bp = Blueprint('event', __name__, url_prefix='/events')
 
+# Seconds browsers and proxies may reuse a public page without revalidating
+PAGE_MAX_AGE = 60
+
+# Most event IDs accepted by one seats lookup
+MAX_SEAT_IDS = 100
+
+# Seat streams: keep-alive comment interval, and how long one connection
+# may hold a worker thread before the browser reconnects
+SEAT_STREAM_HEARTBEAT = 15
+SEAT_STREAM_MAX_SECONDS = int(os.getenv('SEAT_STREAM_MAX_SECONDS', 300))
+
+def _unread_count():
+    """
+    Unread notifications of a logged-in user (None otherwise)
+
+    The navigation badge in base.html shows it on every page, so it is
+    part of the ETags of logged-in viewers.
+    """
+    if session.get('user_id') and session.get('user_role') == 'user':
+        return NotificationController.get_unread_count(session['user_id'])
+    return None
+
+def _listing_etag(name, version, *extra):
+    """Build the ETag of a listing from its version row"""
+    # The listing is filtered on CURDATE(), so it also changes at midnight
+    return make_etag(name, date.today(), version['count'], version['updated_at'],
+                     version['participants'], _unread_count(), *extra)
+
 @event_bp.route('/')
+@cached_page('listings')
 def list_events():
     """Public events listing page"""
+    version = EventController.get_listing_version() or {}
+    etag = _listing_etag('list', version) if version else None
+    
+    if etag and is_not_modified(etag, version['updated_at']):
+        return not_modified(etag, version['updated_at'], PAGE_MAX_AGE)
+    
     events = EventController.get_upcoming_events()
-    return render_template('user/events.html', events=events)
+    response = make_response(render_template('user/events.html', events=events))
+    
+    if etag:
+        apply_cache_headers(response, etag, version['updated_at'], PAGE_MAX_AGE)
+    return response
 
 @event_bp.route('/<int:event_id>')
+@cached_page('event:{event_id}')
 def view_event(event_id):
     """Public event details page"""
+    version = EventController.get_event_version(event_id)
+    
+    if not version:
+        return "Event not found", 404
+    
+    # Per-user part of the page, rendered outside the cached fragments;
+    # joining or leaving the waitlist doesn't touch the event row, so it
+    # is part of the ETag
+    is_registered = False
+    waitlist_position = None
+    if session.get('user_role') == 'user':
+        is_registered = EventController.is_user_registered(session['user_id'], event_id)
+        if not is_registered:
+            waitlist_position = WaitlistController.get_position(session['user_id'], event_id)
+    
+    etag = make_etag('event', event_id, version['updated_at'], version['current_participants'],
+                     _unread_count(), is_registered, waitlist_position)
+    
+    if is_not_modified(etag, version['updated_at']):
+        return not_modified(etag, version['updated_at'], PAGE_MAX_AGE)
+    
     event = EventController.get_event_details(event_id)
     
     if not event:
         return "Event not found", 404
     
-    return render_template('user/event_details.html', event=event)
+    response = make_response(render_template('user/event_details.html', event=event,
+                                              is_registered=is_registered,
+                                              waitlist_position=waitlist_position))
+    return apply_cache_headers(response, etag, version['updated_at'], PAGE_MAX_AGE)
 
 @event_bp.route('/category/<category>')
+@cached_page('listings')
 def events_by_category(category):
     """Events filtered by category"""
+    version = EventController.get_listing_version(category) or {}
+    etag = _listing_etag('category', version, category) if version else None
+    
+    if etag and is_not_modified(etag, version['updated_at']):
+        return not_modified(etag, version['updated_at'], PAGE_MAX_AGE)
+    
     events = EventController.get_events_by_category(category)
-    return render_template('user/events.html', events=events, category=category)
+    response = make_response(render_template('user/events.html', events=events, category=category))
+    
+    if etag:
+        apply_cache_headers(response, etag, version['updated_at'], PAGE_MAX_AGE)
+    return response
 
 @event_bp.route('/search')
 def search_events():
     """Search events"""
     keyword = request.args.get('q', '')
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+    
+    version = EventController.get_listing_version() or {}
+    etag = _listing_etag('search', version, keyword, is_ajax) if version else None
+    
+    if etag and is_not_modified(etag, version['updated_at']):
+        return not_modified(etag, version['updated_at'], PAGE_MAX_AGE)
+    
     events = EventController.search_events(keyword)
     
     # Return JSON for AJAX requests
-    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-        return jsonify({
+    if is_ajax:
+        # json_response also encodes TIME columns, which jsonify rejects
+        response = json_response({
             'success': True,
             'events': events
         })
+    else:
+        response = make_response(render_template('user/events.html', events=events, search=keyword))
+    
+    if etag:
+        apply_cache_headers(response, etag, version['updated_at'], PAGE_MAX_AGE)
+        response.vary.add('X-Requested-With')
+    return response
+
+@event_bp.route('/seats')
+def seats():
+    """Live seat counts and registration flags for cached pages"""
+    ids = []
+    for value in request.args.get('ids', '').split(',')[:MAX_SEAT_IDS]:
+        if value.strip().isdigit():
+            ids.append(int(value))
+    
+    user_id = session.get('user_id') if session.get('user_role') == 'user' else None
+    seats_left, registered = EventController.get_seats(ids, user_id)
+    
+    response = jsonify({
+        'success': True,
+        'seats': seats_left,
+        'registered': registered
+    })
+    response.cache_control.no_store = True
+    return response
+
+@event_bp.route('/<int:event_id>/seats/stream')
+def seat_stream(event_id):
+    """Server-Sent Events stream of an event's seats left"""
+    if not EventController.get_event_details(event_id):
+        return jsonify({'success': False, 'message': 'Event not found'}), 404
+    
+    updates = EventController.watch_seats(event_id, SEAT_STREAM_HEARTBEAT, SEAT_STREAM_MAX_SECONDS)
     
-    return render_template('user/events.html', events=events, search=keyword)
+    def events():
+        # EventSource reconnects after `retry` ms when the stream ends
+        yield 'retry: 3000\n\n'
+        try:
+            for seats_left in updates:
+                if seats_left is None:
+                    yield ': keep-alive\n\n'
+                else:
+                    data = json.dumps({'event_id': event_id, 'seats': seats_left})
+                    yield f'event: seats\ndata: {data}\n\n'
+        finally:
+            # Client gone: stop watching
+            updates.close()
+    
+    response = Response(events(), mimetype='text/event-stream')
+    response.cache_control.no_store = True
+    # Tell nginx not to buffer the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+def _calendar_feed(category=None):
+    """Streamed iCalendar feed of public events"""
+    version = EventController.get_calendar_version(category)
+    
+    if not version:
+        return "Calendar temporarily unavailable", 503
+    
+    name = f"{category} Events" if category else "All Events"
+    base_url = url_for('event.list_events', _external=True)
+    
+    def chunks():
+        return iter_calendar(EventController.iter_calendar_events(category), name,
+                             request.host.split(':')[0], lambda event_id: f"{base_url}{event_id}")
+    
+    # The feed window moves at midnight, so the date is part of the ETag
+    return calendar_response(version, chunks, category, date.today())
+
+@event_bp.route('/calendar.ics')
+def calendar_feed():
+    """iCalendar feed of all events"""
+    return _calendar_feed()
+
+@event_bp.route('/category/<category>/calendar.ics')
+def category_calendar_feed(category):
+    """iCalendar feed of one category"""
+    return _calendar_feed(category)
@@ -0,0 +1,35 @@
+"""
+Metrics Routes
+Prometheus scrape endpoint
+"""
+
+import hmac
+import os
+from flask import Blueprint, Response, request, session, current_app
+from app.utils import metrics
+
+# Create Blueprint
+metrics_bp = Blueprint('metrics', __name__)
+
+# Bearer token Prometheus sends (scrape_config `authorization`)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+def _allowed():
+    """Scraper with the token, or (without a token configured) an admin or debug mode"""
+    if METRICS_TOKEN:
+        supplied = request.headers.get('Authorization', '')
+        if supplied.startswith('Bearer '):
+            supplied = supplied[len('Bearer '):]
+        return hmac.compare_digest(supplied.encode(), METRICS_TOKEN.encode())
+    return current_app.debug or session.get('user_role') == 'admin'
+
+@metrics_bp.route('/metrics')
+def scrape():
+    """All metrics in the Prometheus text format"""
+    if not _allowed():
+        return Response('Forbidden\n', status=403, mimetype='text/plain')
+    
+    response = Response(metrics.render(), mimetype='text/plain')
+    response.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+    response.cache_control.no_store = True
+    return response
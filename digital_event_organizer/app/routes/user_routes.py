@@ -6,7 +6,12 @@ Handles all user-related HTTP routes
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify
 from app.controllers.user_controller import UserController
 from app.controllers.event_controller import EventController
+from app.controllers.waitlist_controller import WaitlistController
+from app.controllers.checkin_controller import CheckinController
+from app.controllers.notification_controller import NotificationController
 from functools import wraps
+from datetime import date
+from app.utils.ical import iter_calendar, calendar_response
 
 # Create Blueprint
 user_bp = Blueprint('user', __name__, url_prefix='/user')
@@ -21,6 +26,13 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+@user_bp.app_context_processor
+def inject_unread_notifications():
+    """Unread count for the navigation badge (from the counter cache)"""
+    if session.get('user_id') and session.get('user_role') == 'user':
+        return {'unread_notifications': NotificationController.get_unread_count(session['user_id'])}
+    return {}
+
 @user_bp.route('/register', methods=['GET', 'POST'])
 def register():
     """User registration page"""
@@ -120,9 +132,14 @@ def event_details(event_id):
     from app.models.registration import Registration
     is_registered = Registration.is_user_registered(user_id, event_id)
     
+    waitlist_position = None
+    if not is_registered and event['current_participants'] >= event['max_participants']:
+        waitlist_position = WaitlistController.get_position(user_id, event_id)
+    
     return render_template('user/event_details.html', 
                          event=event, 
-                         is_registered=is_registered)
+                         is_registered=is_registered,
+                         waitlist_position=waitlist_position)
 
 @user_bp.route('/events/<int:event_id>/register', methods=['POST'])
 @login_required
@@ -150,14 +167,120 @@ def register_event(event_id):
     
     return redirect(url_for('user.event_details', event_id=event_id))
 
+@user_bp.route('/events/<int:event_id>/register-group', methods=['POST'])
+@login_required
+def register_group(event_id):
+    """Register a team for an event"""
+    success, message, data = EventController.register_group(
+        session.get('user_id'), event_id, request.form.get('emails', '')
+    )
+    
+    if success and data.get('payment_required'):
+        session['payment_data'] = data
+        flash(message, 'info')
+        return redirect(url_for('payment.initiate', registration_id=data['registration_id']))
+    
+    flash(message, 'success' if success else 'danger')
+    return redirect(url_for('user.event_details', event_id=event_id))
+
+@user_bp.route('/events/<int:event_id>/cancel', methods=['POST'])
+@login_required
+def cancel_event_registration(event_id):
+    """Cancel a registration; the seat goes to the next user on the waitlist"""
+    success, message = EventController.cancel_registration(session.get('user_id'), event_id)
+    
+    flash(message, 'success' if success else 'danger')
+    return redirect(url_for('user.my_registrations'))
+
+@user_bp.route('/events/<int:event_id>/waitlist', methods=['POST'])
+@login_required
+def join_waitlist(event_id):
+    """Join the waitlist of a full event"""
+    success, message, position = WaitlistController.join_waitlist(session.get('user_id'), event_id)
+    
+    flash(message, 'success' if success else 'danger')
+    return redirect(url_for('user.event_details', event_id=event_id))
+
+@user_bp.route('/events/<int:event_id>/waitlist/leave', methods=['POST'])
+@login_required
+def leave_waitlist(event_id):
+    """Leave an event's waitlist"""
+    success, message = WaitlistController.leave_waitlist(session.get('user_id'), event_id)
+    
+    flash(message, 'success' if success else 'danger')
+    return redirect(url_for('user.event_details', event_id=event_id))
+
 @user_bp.route('/registrations')
 @login_required
 def my_registrations():
     """View user's registrations"""
     user_id = session.get('user_id')
     registrations = UserController.get_user_registrations(user_id)
+    calendar_url = url_for('user.calendar_feed', token=UserController.get_calendar_token(user_id),
+                           _external=True)
+    
+    return render_template('user/my_registrations.html', registrations=registrations,
+                         calendar_url=calendar_url)
+
+@user_bp.route('/registrations/<int:registration_id>/ticket')
+@login_required
+def ticket(registration_id):
+    """Show the QR ticket of a confirmed registration"""
+    success, message, ticket = CheckinController.get_ticket(registration_id, session.get('user_id'))
+    
+    if not success:
+        flash(message, 'danger')
+        return redirect(url_for('user.my_registrations'))
+    
+    return render_template('user/ticket.html', ticket=ticket)
+
+@user_bp.route('/calendar/<token>.ics')
+def calendar_feed(token):
+    """Personal iCalendar feed (authenticated by the signed token in the URL)"""
+    user_id = UserController.get_user_id_from_calendar_token(token)
+    
+    if user_id is None:
+        return "Invalid calendar link", 404
+    
+    version = UserController.get_calendar_version(user_id)
+    
+    if not version:
+        return "Calendar temporarily unavailable", 503
+    
+    base_url = url_for('event.list_events', _external=True)
+    
+    def chunks():
+        return iter_calendar(UserController.iter_calendar_events(user_id), "My Events",
+                             request.host.split(':')[0], lambda event_id: f"{base_url}{event_id}")
+    
+    # The feed window moves at midnight, so the date is part of the ETag
+    return calendar_response(version, chunks, user_id, date.today(), private=True)
+
+@user_bp.route('/notifications')
+@login_required
+def notifications():
+    """Notification feed, newest first (?before= for older pages)"""
+    before = request.args.get('before', type=int)
+    items, next_before = NotificationController.get_feed(session.get('user_id'), before)
+    
+    return render_template('user/notifications.html', notifications=items,
+                         next_before=next_before, paged=before is not None)
+
+@user_bp.route('/notifications/read', methods=['POST'])
+@login_required
+def mark_notifications_read():
+    """Mark the selected notifications (or all) as read"""
+    ids = None if request.form.get('all') else request.form.getlist('notification_ids')
+    success, message = NotificationController.mark_read(session.get('user_id'), ids)
+    
+    flash(message, 'success' if success else 'danger')
     
-    return render_template('user/my_registrations.html', registrations=registrations)
+    # Only paths on this site; browsers follow //host and /\host to
+    # other sites
+    next_url = request.form.get('next', '')
+    if not next_url.startswith('/') or next_url.startswith(('//', '/\\')):
+        next_url = url_for('user.notifications')
+    return redirect(next_url)
 
 @user_bp.route('/profile')
 @login_required
@@ -9,8 +9,66 @@ document.addEventListener('DOMContentLoaded', function() {
             bsAlert.close();
         });
     }, 5000);
+    
+    refreshSeats();
+    streamSeats();
 });
 
+// Cached pages are shared between visitors, so seat counts and the
+// "Registered" badges are filled in from a live lookup
+function refreshSeats() {
+    var seatSpans = document.querySelectorAll('.js-seats[data-event-id]');
+    var badges = document.querySelectorAll('.js-registered[data-event-id]');
+    var ids = {};
+    
+    seatSpans.forEach(function(el) { ids[el.dataset.eventId] = true; });
+    badges.forEach(function(el) { ids[el.dataset.eventId] = true; });
+    
+    var idList = Object.keys(ids);
+    if (idList.length === 0) {
+        return;
+    }
+    
+    fetch('/events/seats?ids=' + idList.join(','), {credentials: 'same-origin'})
+        .then(function(response) { return response.json(); })
+        .then(function(data) {
+            if (!data.success) {
+                return;
+            }
+            seatSpans.forEach(function(el) {
+                var seats = data.seats[el.dataset.eventId];
+                if (seats !== undefined) {
+                    el.textContent = seats;
+                }
+            });
+            var registered = data.registered.map(String);
+            badges.forEach(function(el) {
+                el.classList.toggle('d-none', registered.indexOf(el.dataset.eventId) === -1);
+            });
+        })
+        .catch(function(error) {
+            console.log('Seat refresh failed:', error);
+        });
+}
+
+// Event pages follow their seat count live over Server-Sent Events;
+// the browser reconnects by itself when the stream ends
+function streamSeats() {
+    var page = document.querySelector('[data-seat-stream]');
+    if (!page || !window.EventSource) {
+        return;
+    }
+    
+    var source = new EventSource(page.dataset.seatStream);
+    source.addEventListener('seats', function(message) {
+        var data = JSON.parse(message.data);
+        document.querySelectorAll('.js-seats[data-event-id="' + data.event_id + '"]').forEach(function(el) {
+            el.textContent = data.seats;
+        });
+    });
+    window.addEventListener('pagehide', function() { source.close(); });
+}
+
 function confirmDelete(message) {
     return confirm(message || 'Are you sure you want to delete this item?');
 }
@@ -3,8 +3,8 @@ Utilities Package
 Contains helper modules for database, email, payment, and validation
 """
 
-from .db_config import get_db_connection, execute_query, execute_one
-from .email_service import send_email, send_registration_confirmation, send_payment_confirmation
+from .db_config import get_db_connection, execute_query, execute_one, execute_stream, execute_many, execute_rows, transaction, named_lock
+from .email_service import send_email, send_bulk_emails, send_registration_confirmation, send_payment_confirmation
 from .payment_service import create_order, verify_payment_signature
 from .validators import validate_email, validate_phone, validate_password
 
@@ -12,7 +12,13 @@ __all__ = [
     'get_db_connection',
     'execute_query',
     'execute_one',
+    'execute_stream',
+    'execute_many',
+    'execute_rows',
+    'transaction',
+    'named_lock',
     'send_email',
+    'send_bulk_emails',
     'send_registration_confirmation',
     'send_payment_confirmation',
     'create_order',
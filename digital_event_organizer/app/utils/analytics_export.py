@@ -0,0 +1,314 @@
+"""
+Analytics Export Module
+Writes registrations joined with events and payments to columnar files
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+
+import mysql.connector
+from app.utils.db_config import get_db_connection
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    import pyarrow.ipc as ipc
+except ImportError:
+    pa = None
+
+WATERMARK_FILE = '_watermark.json'
+
+# Column order of the export query; must match _export_schema() below
+EXPORT_COLUMNS = [
+    'registration_id', 'user_id', 'event_id', 'registration_date', 'status',
+    'payment_required', 'event_title', 'event_category', 'event_date',
+    'event_month', 'price', 'is_paid', 'payment_id', 'amount',
+    'payment_status', 'transaction_id', 'payment_method', 'payment_date',
+    'updated_at'
+]
+
+CHUNK_BOUNDARY_QUERY = """
+    SELECT MAX(registration_id) AS upper_id FROM (
+        SELECT registration_id FROM registrations
+        WHERE registration_id > %s
+        ORDER BY registration_id
+        LIMIT %s
+    ) AS chunk
+"""
+
+EXPORT_SELECT = """
+    SELECT r.registration_id, r.user_id, r.event_id, r.registration_date, r.status,
+           r.payment_required, e.title, e.category, e.event_date,
+           DATE_FORMAT(e.event_date, '%%Y-%%m'), e.price, e.is_paid,
+           p.payment_id, p.amount, p.payment_status, p.transaction_id,
+           p.payment_method, p.payment_date,
+           GREATEST(r.updated_at, COALESCE(p.updated_at, r.updated_at))
+    FROM registrations r
+    JOIN events e ON r.event_id = e.event_id
+    LEFT JOIN payments p ON p.registration_id = r.registration_id
+"""
+
+CHUNK_QUERY = EXPORT_SELECT + """
+    WHERE r.registration_id > %s AND r.registration_id <= %s
+    ORDER BY r.registration_id
+"""
+
+# Registrations exported by earlier runs whose row or payment changed
+# since; both halves use the updated_at indexes from migration 010
+CHANGED_IDS_QUERY = """
+    SELECT registration_id FROM registrations
+    WHERE updated_at >= %s AND registration_id <= %s
+    UNION
+    SELECT registration_id FROM payments
+    WHERE updated_at >= %s AND registration_id <= %s
+    ORDER BY registration_id
+"""
+
+CHANGED_QUERY = EXPORT_SELECT + """
+    WHERE r.registration_id IN ({})
+    ORDER BY r.registration_id
+"""
+
+def _export_schema():
+    """Arrow schema for exported rows (built lazily so pyarrow stays optional)"""
+    return pa.schema([
+        ('registration_id', pa.int64()),
+        ('user_id', pa.int64()),
+        ('event_id', pa.int64()),
+        ('registration_date', pa.timestamp('s')),
+        ('status', pa.string()),
+        ('payment_required', pa.bool_()),
+        ('event_title', pa.string()),
+        ('event_category', pa.string()),
+        ('event_date', pa.date32()),
+        ('event_month', pa.string()),
+        ('price', pa.decimal128(10, 2)),
+        ('is_paid', pa.bool_()),
+        ('payment_id', pa.int64()),
+        ('amount', pa.decimal128(10, 2)),
+        ('payment_status', pa.string()),
+        ('transaction_id', pa.string()),
+        ('payment_method', pa.string()),
+        ('payment_date', pa.timestamp('s')),
+        ('updated_at', pa.timestamp('s')),
+    ])
+
+def read_watermark(out_dir):
+    """
+    Read the watermarks of the previous export
+
+    Args:
+        out_dir: Export directory
+
+    Returns:
+        Tuple (last exported registration_id, database time the previous
+        run started at or None); (0, None) if there was no previous export
+    """
+    path = os.path.join(out_dir, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return 0, None
+
+    with open(path) as f:
+        data = json.load(f)
+
+    # Exports written before change tracking only have the ID watermark
+    changed_since = data.get('updated_at')
+    return (int(data.get('registration_id', 0)),
+            datetime.fromisoformat(changed_since) if changed_since else None)
+
+def write_watermark(out_dir, registration_id, changed_since, rows):
+    """
+    Record the watermarks of a finished export
+
+    Written via a temporary file and rename so a crash never leaves a
+    half-written watermark behind.
+    """
+    path = os.path.join(out_dir, WATERMARK_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({
+            'registration_id': registration_id,
+            'updated_at': changed_since.isoformat(),
+            'rows': rows,
+            'exported_at': datetime.now().isoformat(timespec='seconds')
+        }, f)
+    os.replace(tmp_path, path)
+
+def export_registrations(out_dir, chunk_size=50000, file_format='parquet', full=False):
+    """
+    Export registrations x events x payments partitioned by event month
+
+    Rows are read in registration_id ranges of at most chunk_size
+    registrations, converted straight into Arrow column batches and
+    appended to one file per event month, so memory stays bounded by a
+    single chunk regardless of table size.
+
+    Files are written under hidden temporary names and renamed into
+    place only when the whole run succeeded; a failed run removes them
+    and leaves the watermark alone, so rerunning it never duplicates
+    rows.
+
+    Incremental runs keep two watermarks from the previous export: new
+    registrations are read past its last registration_id, and older
+    ones whose row or payment changed since the database time it started
+    at are exported again. A registration can therefore appear in
+    several files; readers keep the rows with the latest updated_at for
+    each registration_id. The change watermark is taken before reading,
+    so a change racing the run is exported again next time rather than
+    missed.
+
+    Args:
+        out_dir: Directory to write the partitioned dataset into
+        chunk_size: Registrations per database round trip
+        file_format: 'parquet' or 'arrow' (Arrow IPC)
+        full: Ignore the watermark and export everything
+
+    Returns:
+        Dictionary with export statistics ('changed_rows' is None when
+        the previous export had no change watermark), or None on failure
+    """
+    if pa is None:
+        print("pyarrow is not installed. Run: pip install pyarrow")
+        return None
+
+    if file_format not in ('parquet', 'arrow'):
+        print(f"Unsupported export format: {file_format}")
+        return None
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    last_id, changed_since = (0, None) if full else read_watermark(out_dir)
+    exported_id = last_id
+    run_id = datetime.now().strftime('%Y%m%d%H%M%S')
+    schema = _export_schema()
+    writers = {}
+    total_rows = 0
+    changed_rows = None
+    started = time.monotonic()
+
+    connection = get_db_connection()
+    if not connection:
+        return None
+
+    finished = False
+    try:
+        cursor = connection.cursor()
+
+        cursor.execute("SELECT NOW()")
+        run_started_at = cursor.fetchone()[0]
+
+        while True:
+            cursor.execute(CHUNK_BOUNDARY_QUERY, (last_id, chunk_size))
+            upper_id = cursor.fetchone()[0]
+            if upper_id is None:
+                break
+
+            cursor.execute(CHUNK_QUERY, (last_id, upper_id))
+            rows = cursor.fetchall()
+
+            if rows:
+                _write_rows(rows, writers, out_dir, run_id, file_format, schema)
+                total_rows += len(rows)
+
+            last_id = upper_id
+
+        if changed_since is not None and exported_id:
+            cursor.execute(CHANGED_IDS_QUERY,
+                           (changed_since, exported_id, changed_since, exported_id))
+            changed_ids = [row[0] for row in cursor.fetchall()]
+            changed_rows = 0
+
+            for i in range(0, len(changed_ids), chunk_size):
+                chunk = changed_ids[i:i + chunk_size]
+                cursor.execute(CHANGED_QUERY.format(', '.join(['%s'] * len(chunk))), chunk)
+                rows = cursor.fetchall()
+                if rows:
+                    _write_rows(rows, writers, out_dir, run_id, file_format, schema)
+                    changed_rows += len(rows)
+
+        cursor.close()
+        finished = True
+
+    except mysql.connector.Error as err:
+        print(f"Database error: {err}")
+        return None
+
+    finally:
+        # Also runs for conversion and file errors, which propagate
+        connection.close()
+        _close_writers(writers, keep=finished)
+
+    write_watermark(out_dir, last_id, run_started_at, total_rows + (changed_rows or 0))
+
+    return {
+        'rows': total_rows,
+        'changed_rows': changed_rows,
+        'partitions': sorted(writers.keys()),
+        'watermark': last_id,
+        'seconds': round(time.monotonic() - started, 2)
+    }
+
+def _to_array(values, arrow_type):
+    """Build an Arrow array from one column of MySQL values"""
+    if arrow_type == pa.bool_():
+        # MySQL BOOLEAN columns come back as TINYINT 0/1
+        return pa.array(values, type=pa.int8()).cast(arrow_type)
+    return pa.array(values, type=arrow_type)
+
+def _write_rows(rows, writers, out_dir, run_id, file_format, schema):
+    """Convert fetched row tuples to a column batch and write it"""
+    # Transpose row tuples into columns in one pass
+    columns = list(zip(*rows))
+    batch = pa.Table.from_arrays(
+        [_to_array(col, schema.field(i).type) for i, col in enumerate(columns)],
+        schema=schema
+    )
+    _write_partitions(batch, writers, out_dir, run_id, file_format, schema)
+
+def _write_partitions(batch, writers, out_dir, run_id, file_format, schema):
+    """Append one column batch to the per-month writers"""
+    months = batch.column('event_month')
+
+    for month in months.unique().to_pylist():
+        part = batch.filter(pc.equal(months, month))
+
+        entry = writers.get(month)
+        if entry is None:
+            part_dir = os.path.join(out_dir, f'event_month={month}')
+            os.makedirs(part_dir, exist_ok=True)
+
+            # Dataset readers skip names starting with a dot
+            path = os.path.join(part_dir, f'part-{run_id}.{file_format}')
+            tmp_path = os.path.join(part_dir, f'.part-{run_id}.{file_format}.tmp')
+            if file_format == 'parquet':
+                writer = pq.ParquetWriter(tmp_path, schema, compression='snappy')
+            else:
+                writer = ipc.new_file(tmp_path, schema)
+            entry = writers[month] = (writer, tmp_path, path)
+
+        entry[0].write_table(part)
+
+def _close_writers(writers, keep=True):
+    """
+    Close all open partition writers
+
+    Args:
+        writers: Dictionary of month -> (writer, temporary path, path)
+        keep: True to move the files into place, False to delete them
+    """
+    for writer, tmp_path, path in writers.values():
+        try:
+            writer.close()
+        except Exception as e:
+            if keep:
+                raise
+            print(f"Error closing export file {tmp_path}: {e}")
+
+    for writer, tmp_path, path in writers.values():
+        if keep:
+            os.replace(tmp_path, path)
+        elif os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,144 @@
+"""
+Broadcaster Module
+In-process latest-value pub/sub for Server-Sent Event streams
+"""
+
+import threading
+import time
+
+class _Topic:
+    """Latest value of one key and the streams watching it"""
+
+    __slots__ = ('condition', 'value', 'version', 'watchers')
+
+    def __init__(self, lock):
+        self.condition = threading.Condition(lock)
+        self.value = None
+        self.version = 0
+        self.watchers = 0
+
+class Broadcaster:
+    """
+    Shares one upstream poll between all streams of a worker
+
+    Every watched key has a topic that holds its latest value. A single
+    background thread loads the values of all watched keys with one
+    loader call, every `interval` seconds or as soon as changed() is
+    called, and wakes the streams whose value changed. The database
+    cost is one query per poll, however many clients are watching, and
+    the thread does nothing while nobody is watching.
+
+    Streams only ever see the latest value: a burst of changes between
+    two polls reaches the clients as one update.
+    """
+
+    def __init__(self, loader, interval=2.0, min_interval=0.25):
+        """
+        Args:
+            loader: Callable(list of keys) returning a dict of key ->
+                value, or None on error
+            interval: Seconds between polls while keys are watched
+            min_interval: Minimum seconds between polls, so a burst of
+                changed() calls costs one query
+        """
+        self._loader = loader
+        self._interval = interval
+        self._min_interval = min_interval
+        self._topics = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self.polls = 0
+
+    def changed(self, key):
+        """Note that a key's value changed in this worker (poll soon)"""
+        if key in self._topics:
+            self._wake.set()
+
+    def publish(self, key, value):
+        """Set a key's value and wake its streams if it differs"""
+        with self._lock:
+            topic = self._topics.get(key)
+            if topic is None or (topic.version and topic.value == value):
+                return
+            topic.value = value
+            topic.version += 1
+            topic.condition.notify_all()
+
+    def watcher_count(self):
+        with self._lock:
+            return sum(topic.watchers for topic in self._topics.values())
+
+    def watch(self, key, heartbeat=15.0, max_duration=None):
+        """
+        Follow a key's value
+
+        Args:
+            key: Key to watch
+            heartbeat: Seconds without a change before None is yielded,
+                so the caller can send a keep-alive
+            max_duration: Seconds after which the generator ends (None
+                for no limit)
+
+        Yields:
+            Tuple (version, value) on every change (the current value
+            first), or None after `heartbeat` quiet seconds
+        """
+        with self._lock:
+            topic = self._topics.get(key)
+            if topic is None:
+                topic = self._topics[key] = _Topic(self._lock)
+            topic.watchers += 1
+            first = topic.version == 0
+        self._ensure_thread()
+        if first:
+            self._wake.set()
+
+        seen = 0
+        deadline = None if max_duration is None else time.monotonic() + max_duration
+        try:
+            while deadline is None or time.monotonic() < deadline:
+                with topic.condition:
+                    if topic.version == seen:
+                        topic.condition.wait(heartbeat)
+                    update = None
+                    if topic.version != seen:
+                        seen = topic.version
+                        update = (topic.version, topic.value)
+                yield update
+        finally:
+            with self._lock:
+                topic.watchers -= 1
+                if topic.watchers == 0 and self._topics.get(key) is topic:
+                    del self._topics[key]
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='broadcaster', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self._interval)
+            self._wake.clear()
+
+            with self._lock:
+                keys = list(self._topics)
+            if not keys:
+                continue
+
+            try:
+                values = self._loader(keys)
+            except Exception as e:
+                print(f"Broadcaster poll error: {e}")
+                values = None
+            self.polls += 1
+
+            for key, value in (values or {}).items():
+                self.publish(key, value)
+
+            time.sleep(self._min_interval)
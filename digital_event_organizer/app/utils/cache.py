@@ -0,0 +1,487 @@
+"""
+Cache Module
+In-process LRU caches with TTL, tag invalidation and hit/miss counters
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Sentinel for "not in cache" so that falsy values can still be cached
+MISSING = object()
+
+# All caches created through get_cache(), by name (used for stats reporting)
+_caches = {}
+_caches_lock = threading.Lock()
+
+class LocalSharedBackend:
+    """
+    Local stand-in for a shared cache server (Redis/Memcached style)
+
+    Stores values with an expiry time and integer tag versions. One
+    instance is shared by every cache in the process, so it behaves like
+    a second cache tier; a networked backend only has to provide the
+    same get/set/delete/incr methods.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return MISSING
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return MISSING
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key):
+        with self._lock:
+            value, expires_at = self._data.get(key, (0, None))
+            self._data[key] = (value + 1, expires_at)
+            return value + 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+shared_backend = LocalSharedBackend()
+
+class _Call:
+    """An in-flight load that other callers can wait on"""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key
+
+    The first caller for a key runs the function; callers arriving while
+    it runs wait and receive the same result (or exception) instead of
+    running it again.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """
+        Run fn once per key among concurrent callers
+
+        Args:
+            key: Key identifying the work
+            fn: Callable to run
+
+        Returns:
+            Result of fn (shared between coalesced callers)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self, key):
+        """Check whether a load for key is currently running"""
+        with self._lock:
+            return key in self._calls
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a TTL
+
+    Entries can carry tags; invalidate_tag() drops every entry with that
+    tag. When a shared backend is configured, local misses fall through
+    to it before calling the loader, and tag invalidation bumps a tag
+    version in the backend so other processes' entries are rejected too.
+
+    With stale_ttl, an expired entry is kept for that many extra seconds
+    and get_or_load() serves it while a single background load refreshes
+    it (stale-while-revalidate). Concurrent loads for one key are
+    coalesced, so a hot key costs one loader call per refresh.
+    """
+
+    def __init__(self, name, maxsize=1024, ttl=60, stale_ttl=0, backend=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.backend = backend
+        self._entries = OrderedDict()   # key -> (value, fresh_until, stale_until, tags)
+        self._tag_index = {}            # tag -> set of keys
+        self._lock = threading.RLock()
+        self._flight = SingleFlight()
+        # Loads in progress: key -> list of [tags, outdated] records.
+        # An invalidation marks only the loads of its key or tag, so
+        # loads that started before that write don't store their
+        # (already outdated) result while unrelated loads still do
+        self._loads = {}
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """
+        Get a cached value
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or MISSING if absent or expired
+        """
+        value, fresh = self._lookup(key)
+        if fresh:
+            return value
+
+        if self.backend is not None:
+            value = self._backend_get(key)
+            if value is not MISSING:
+                with self._lock:
+                    self.hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return MISSING
+
+    def set(self, key, value, tags=(), ttl=None):
+        """
+        Store a value
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            tags: Iterable of tags used for invalidation
+            ttl: Time to live in seconds (defaults to the cache TTL)
+        """
+        ttl = ttl or self.ttl
+        tags = tuple(tags)
+        self._store_local(key, value, tags, ttl)
+        self._store_backend(key, value, tags, ttl)
+
+    def get_or_load(self, key, loader, tags=(), ttl=None):
+        """
+        Read-through lookup: return the cached value or load and cache it
+
+        Fresh entries are returned directly. Stale entries (inside the
+        stale_ttl window) are returned immediately while one background
+        thread reloads them. Missing entries are loaded synchronously, with
+        concurrent callers for the same key sharing one loader call.
+
+        None results are returned but not cached, since the models use
+        None both for "not found" and for database errors.
+
+        Args:
+            key: Cache key
+            loader: Callable returning the fresh value
+            tags: Tags to attach to a newly loaded value
+            ttl: Time to live in seconds
+
+        Returns:
+            Cached or freshly loaded value
+        """
+        value, fresh = self._lookup(key)
+        if fresh:
+            return value
+
+        if value is not MISSING:
+            # Stale: serve it and refresh once in the background
+            with self._lock:
+                self.stale_hits += 1
+            if not self._flight.in_flight(key):
+                threading.Thread(
+                    target=self._refresh, args=(key, loader, tags, ttl), daemon=True
+                ).start()
+            return value
+
+        if self.backend is not None:
+            value = self._backend_get(key)
+            if value is not MISSING:
+                with self._lock:
+                    self.hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return self._flight.do(key, lambda: self._load(key, loader, tags, ttl))
+
+    def mark_stale(self, tag):
+        """
+        Expire entries with a tag without dropping them
+
+        Readers keep getting the old value while it is reloaded in the
+        background, which suits data that tolerates brief staleness.
+        Entries without a stale window are dropped instead.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for key in list(self._tag_index.get(tag, ())):
+                value, fresh_until, stale_until, tags = self._entries[key]
+                if stale_until > now:
+                    self._entries[key] = (value, now, stale_until, tags)
+                else:
+                    self._remove(key)
+                self.invalidations += 1
+            self._outdate_loads(tag=tag)
+
+    def invalidate(self, key):
+        """Remove a single key"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                self.invalidations += 1
+            self._outdate_loads(key=key)
+
+        if self.backend is not None:
+            self.backend.delete(self._backend_key(key))
+
+    def invalidate_tag(self, tag):
+        """Remove every entry carrying the given tag"""
+        with self._lock:
+            for key in list(self._tag_index.get(tag, ())):
+                self._remove(key)
+                self.invalidations += 1
+            self._outdate_loads(tag=tag)
+
+        if self.backend is not None:
+            self.backend.incr(self._tag_key(tag))
+
+    def clear(self):
+        """Remove all local entries"""
+        with self._lock:
+            self._entries.clear()
+            self._tag_index.clear()
+            self._outdate_loads()
+
+    def stats(self):
+        """
+        Get cache counters
+
+        Returns:
+            Dictionary with size, hits, misses, hit_ratio, evictions,
+            expirations and invalidations
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+                'stale_hits': self.stale_hits,
+                'coalesced': self._flight.coalesced,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
+
+    def _lookup(self, key):
+        """
+        Look up a key in the local tier
+
+        Returns:
+            Tuple (value, fresh); value is MISSING when absent or past the
+            stale window, fresh is False for stale values
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING, False
+
+            value, fresh_until, stale_until, tags = entry
+            if fresh_until > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value, True
+
+            if stale_until > now:
+                return value, False
+
+            self._remove(key)
+            self.expirations += 1
+            return MISSING, False
+
+    def _load(self, key, loader, tags, ttl):
+        """Call the loader and cache its result unless a write to it intervened"""
+        load = [frozenset(tags), False]
+        with self._lock:
+            self._loads.setdefault(key, []).append(load)
+
+        value = None
+        try:
+            value = loader()
+            return value
+        finally:
+            # Checked and stored under the lock, so an invalidation can't
+            # slip in between
+            tags, ttl = tuple(tags), ttl or self.ttl
+            with self._lock:
+                loads = self._loads[key]
+                loads.remove(load)
+                if not loads:
+                    del self._loads[key]
+                store = value is not None and not load[1]
+                if store:
+                    self._store_local(key, value, tags, ttl)
+            if store:
+                self._store_backend(key, value, tags, ttl)
+
+    def _outdate_loads(self, key=None, tag=None):
+        """
+        Mark loads in progress of a key, of a tag, or (neither given) all
+        of them as outdated (lock must be held)
+        """
+        if key is not None:
+            for load in self._loads.get(key, ()):
+                load[1] = True
+            return
+        for loads in self._loads.values():
+            for load in loads:
+                if tag is None or tag in load[0]:
+                    load[1] = True
+
+    def _refresh(self, key, loader, tags, ttl):
+        """Background reload of a stale entry"""
+        try:
+            self._flight.do(key, lambda: self._load(key, loader, tags, ttl))
+        except Exception as e:
+            print(f"Error refreshing cache entry {self.name}:{key}: {e}")
+
+    def _store_local(self, key, value, tags, ttl):
+        now = time.monotonic()
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (value, now + ttl, now + ttl + self.stale_ttl, tags)
+            for tag in tags:
+                self._tag_index.setdefault(tag, set()).add(key)
+
+            while len(self._entries) > self.maxsize:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _store_backend(self, key, value, tags, ttl):
+        if self.backend is not None:
+            versions = {tag: self._tag_version(tag) for tag in tags}
+            self.backend.set(self._backend_key(key), (value, versions), ttl)
+
+    def _remove(self, key):
+        """Drop a key and its tag index entries (lock must be held)"""
+        _, _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+    def _backend_get(self, key):
+        """Read from the shared tier, rejecting entries with stale tags"""
+        item = self.backend.get(self._backend_key(key))
+        if item is MISSING:
+            return MISSING
+
+        value, versions = item
+        for tag, version in versions.items():
+            if self._tag_version(tag) != version:
+                return MISSING
+
+        # Promote to the local tier for the remaining TTL of this cache
+        self._store_local(key, value, tuple(versions), self.ttl)
+        return value
+
+    def _tag_version(self, tag):
+        version = self.backend.get(self._tag_key(tag))
+        return 0 if version is MISSING else version
+
+    def _backend_key(self, key):
+        return f'{self.name}:{key}'
+
+    def _tag_key(self, tag):
+        return f'{self.name}:tag:{tag}'
+
+def get_cache(name, maxsize=1024, ttl=60, stale_ttl=0):
+    """
+    Get a named cache, creating it on first use
+
+    The shared tier is enabled with CACHE_BACKEND=shared in the
+    environment; the default 'local' keeps everything in-process.
+
+    Args:
+        name: Cache name
+        maxsize: Maximum number of local entries
+        ttl: Default time to live in seconds
+        stale_ttl: Extra seconds an expired entry may be served while
+            it is refreshed in the background
+
+    Returns:
+        TTLCache instance
+    """
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            backend = shared_backend if os.getenv('CACHE_BACKEND', 'local') == 'shared' else None
+            cache = TTLCache(name, maxsize=maxsize, ttl=ttl, stale_ttl=stale_ttl, backend=backend)
+            _caches[name] = cache
+        return cache
+
+def cache_stats():
+    """
+    Get counters for all named caches
+
+    Returns:
+        List of stats dictionaries
+    """
+    with _caches_lock:
+        caches = list(_caches.values())
+    return [cache.stats() for cache in caches]
@@ -0,0 +1,258 @@
+"""
+Change Feed Module
+Cross-worker cache invalidation by tailing the change outbox
+"""
+
+import os
+import socket
+import threading
+import time
+import uuid
+
+class ChangeFeed:
+    """
+    Keeps the in-process caches of every worker in step with writes
+    made by other workers and nodes
+
+    Write paths append (entity, entity_id) rows to the outbox through
+    publish(); the row's auto-increment change_id is its version. Each
+    worker runs one tailer thread that reads the rows past its high
+    watermark every `interval` seconds (a primary key range scan that
+    usually returns nothing) and calls the handlers subscribed to each
+    entity. Rows written by this worker are skipped, since the writer
+    already evicted its own caches.
+
+    Invalidation lag is measured per row with the database clock. If
+    the outbox can't be read for max_lag seconds, every handler is
+    called with None so caches are dropped rather than served at an
+    unknown age.
+    """
+
+    def __init__(self, writer, reader, latest, interval=0.5, max_lag=10.0,
+                 batch_size=1000, gap_timeout=10.0):
+        """
+        Args:
+            writer: Callable(list of (entity, entity_id, origin) tuples,
+                cursor or None) storing outbox rows; returns None on error
+            reader: Callable(after, gap_ids, limit) returning rows with
+                change_id, entity, entity_id, origin and lag_ms in
+                change_id order, or None on error
+            latest: Callable returning the highest change_id (0 for an
+                empty outbox), or None on error
+            interval: Seconds between polls
+            max_lag: Seconds without a successful poll before all
+                subscribed caches are dropped
+            batch_size: Most rows read per poll
+            gap_timeout: Seconds a skipped change_id is looked for again
+                (IDs are allocated before commit, so a slow transaction
+                can commit a lower ID after a higher one)
+        """
+        self._writer = writer
+        self._reader = reader
+        self._latest = latest
+        self._interval = interval
+        self._max_lag = max_lag
+        self._batch_size = batch_size
+        self._gap_timeout = gap_timeout
+        self._handlers = {}
+        self._lock = threading.Lock()
+        self._pid = None
+        self._origin = None
+        self._thread = None
+        self._watermark = None
+        self._gaps = {}                 # missing change_id -> give-up time
+        self._last_ok = time.monotonic()
+        self._last_reset = 0.0
+        self._stats = {'polls': 0, 'errors': 0, 'applied': 0, 'own': 0, 'resets': 0,
+                       'published': 0, 'publish_errors': 0,
+                       'last_lag_ms': 0.0, 'max_lag_ms': 0.0, 'total_lag_ms': 0.0}
+
+    @property
+    def origin(self):
+        """Identifier of this worker process in outbox rows"""
+        pid = os.getpid()
+        if self._pid != pid:
+            # New process (or a fork): new identity, and the parent's
+            # tailer thread does not exist here
+            self._pid = pid
+            self._origin = f"{socket.gethostname()[:40]}:{pid}:{uuid.uuid4().hex[:8]}"
+            self._thread = None
+        return self._origin
+
+    def subscribe(self, entity, handler):
+        """
+        Call a handler when another worker changes an entity
+
+        Args:
+            entity: Entity name, e.g. 'event'
+            handler: Callable(entity_id); entity_id is None when anything
+                of that entity may have changed
+        """
+        with self._lock:
+            self._handlers.setdefault(entity, []).append(handler)
+
+    def publish(self, entity, entity_id=None, cursor=None):
+        """
+        Append a change to the outbox
+
+        Args:
+            entity: Entity name
+            entity_id: Changed row (None for "any row")
+            cursor: Open transaction cursor, so the change commits (or
+                rolls back) with the write itself
+
+        Returns:
+            Boolean: True if the change was stored
+        """
+        return self.publish_many(entity, [entity_id], cursor)
+
+    def publish_many(self, entity, entity_ids, cursor=None, limit=50):
+        """
+        Append changes of many rows of one entity
+
+        More than `limit` rows are published as one "any row" change.
+
+        Returns:
+            Boolean: True if the changes were stored
+        """
+        entity_ids = list(dict.fromkeys(entity_ids))
+        if len(entity_ids) > limit:
+            entity_ids = [None]
+
+        origin = self.origin
+        stored = self._writer([(entity, entity_id, origin) for entity_id in entity_ids], cursor)
+        with self._lock:
+            if stored is None:
+                self._stats['publish_errors'] += 1
+                return False
+            self._stats['published'] += len(entity_ids)
+        return True
+
+    def start(self):
+        """Start this worker's tailer thread (once per process)"""
+        self.origin     # forgets the parent's thread after a fork
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            # Caches filled from now on are newer than every earlier
+            # change (None: the tailer retries)
+            self._watermark = self._latest()
+            self._gaps = {}
+            self._last_ok = time.monotonic()
+            self._thread = threading.Thread(target=self._run, name='change-feed', daemon=True)
+            self._thread.start()
+
+    def poll(self):
+        """
+        Apply the changes past the watermark
+
+        Returns:
+            Number of rows read, or None if the outbox could not be read
+        """
+        if self._watermark is None:
+            self._watermark = self._latest()
+            if self._watermark is None:
+                return None
+            self._last_ok = time.monotonic()
+            return 0
+
+        now = time.monotonic()
+        self._gaps = {change_id: until for change_id, until in self._gaps.items() if until > now}
+
+        rows = self._reader(self._watermark, sorted(self._gaps), self._batch_size)
+        if rows is None:
+            return None
+        self._last_ok = time.monotonic()
+
+        origin = self.origin
+        changes = {}
+        lags = []
+        own = 0
+        for row in rows:
+            change_id = row['change_id']
+            if change_id in self._gaps:
+                del self._gaps[change_id]
+            elif change_id > self._watermark:
+                for missing in range(self._watermark + 1, min(change_id, self._watermark + 1 + self._batch_size)):
+                    self._gaps[missing] = now + self._gap_timeout
+                self._watermark = change_id
+
+            if row['origin'] == origin:
+                own += 1
+                continue
+            # Several writes to the same row since the last poll need one eviction
+            changes[(row['entity'], row['entity_id'])] = True
+            lags.append(float(row['lag_ms']))
+
+        for entity, entity_id in changes:
+            self._dispatch(entity, entity_id)
+
+        with self._lock:
+            self._stats['own'] += own
+            self._stats['applied'] += len(lags)
+            if lags:
+                self._stats['last_lag_ms'] = lags[-1]
+                self._stats['max_lag_ms'] = max(self._stats['max_lag_ms'], max(lags))
+                self._stats['total_lag_ms'] += sum(lags)
+        return len(rows)
+
+    def reset(self):
+        """Call every handler with None (drop all subscribed caches)"""
+        with self._lock:
+            entities = list(self._handlers)
+            self._stats['resets'] += 1
+        for entity in entities:
+            self._dispatch(entity, None)
+
+    def stats(self):
+        """
+        Get feed counters
+
+        Returns:
+            Dictionary with poll/apply counts, lag in milliseconds
+            (last, max and average of applied changes), the watermark and
+            seconds since the last successful poll
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        applied = stats.pop('total_lag_ms')
+        stats['avg_lag_ms'] = round(applied / stats['applied'], 1) if stats['applied'] else 0.0
+        stats['watermark'] = self._watermark
+        stats['pending_gaps'] = len(self._gaps)
+        stats['running'] = self._thread is not None and self._pid == os.getpid()
+        stats['seconds_since_poll'] = round(time.monotonic() - self._last_ok, 1)
+        return stats
+
+    def _dispatch(self, entity, entity_id):
+        with self._lock:
+            handlers = list(self._handlers.get(entity, ()))
+        for handler in handlers:
+            try:
+                handler(entity_id)
+            except Exception as e:
+                print(f"Change feed handler error ({entity}): {e}")
+
+    def _run(self):
+        while True:
+            try:
+                read = self.poll()
+            except Exception as e:
+                print(f"Change feed poll error: {e}")
+                read = None
+
+            with self._lock:
+                self._stats['polls'] += 1
+                if read is None:
+                    self._stats['errors'] += 1
+
+            now = time.monotonic()
+            if read is None and now - self._last_ok > self._max_lag and now - self._last_reset > self._max_lag:
+                # Can't tell what changed: drop cached data every max_lag
+                # seconds until the outbox is readable again
+                self.reset()
+                self._last_reset = now
+
+            if read != self._batch_size:
+                time.sleep(self._interval)
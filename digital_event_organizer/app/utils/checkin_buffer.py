@@ -0,0 +1,195 @@
+"""
+Check-in Buffer Module
+In-memory duplicate-scan detection and batched check-in writes
+"""
+
+import atexit
+import threading
+import time
+from datetime import datetime
+
+class EventGate:
+    """Check-in state of one event in this worker"""
+
+    __slots__ = ('checked_in', 'revoked', 'loaded_at')
+
+    def __init__(self, checked_in, revoked):
+        self.checked_in = checked_in    # registration_id -> first scan time
+        self.revoked = revoked          # registration IDs that may not enter
+        self.loaded_at = time.monotonic()
+
+class CheckinBuffer:
+    """
+    Records ticket scans without a database round trip per scan
+
+    Scans are checked against per-event sets in memory (loaded once per
+    event and refreshed every max_age seconds) and queued; a background
+    thread writes the queue with one multi-row insert every
+    flush_interval seconds, or sooner once batch_size scans are waiting.
+
+    The sets only know the scans of this worker plus those of other
+    workers written before the last reload. The writer publishes new
+    check-ins to the change feed, which invalidates the event in the
+    other workers, so a ticket scanned through several workers at
+    once can be accepted by each of them for about flush_interval plus
+    the feed's poll interval. The database keeps one check-in per
+    registration either way.
+    """
+
+    def __init__(self, writer, loader, batch_size=200, flush_interval=2.0, max_age=60):
+        """
+        Args:
+            writer: Callable taking a list of (registration_id, event_id,
+                user_id, checked_in_at, gate) tuples; returns None on error
+            loader: Callable(event_id) returning (dict of registration_id ->
+                check-in time, set of revoked registration IDs), or None
+            batch_size: Queued scans that trigger an early flush
+            flush_interval: Seconds between background flushes
+            max_age: Seconds before an event's sets are reloaded
+        """
+        self._writer = writer
+        self._loader = loader
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_age = max_age
+        self._events = {}
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self.flushed = 0
+
+    def record(self, registration_id, event_id, user_id, gate=None):
+        """
+        Record a verified scan
+
+        Returns:
+            Tuple (status, time): ('ok', scan time), ('duplicate', time of
+            the first scan), ('revoked', None), or ('unavailable', None)
+            if the event's state could not be loaded
+        """
+        event = self._event(event_id)
+        if event is None:
+            return 'unavailable', None
+
+        now = datetime.now()
+        with self._lock:
+            if registration_id in event.revoked:
+                return 'revoked', None
+
+            first = event.checked_in.get(registration_id)
+            if first is not None:
+                return 'duplicate', first
+
+            event.checked_in[registration_id] = now
+            self._pending.append((registration_id, event_id, user_id, now, gate))
+            waiting = len(self._pending)
+
+        self._ensure_thread()
+        if waiting >= self._batch_size:
+            self._wakeup.set()
+        return 'ok', now
+
+    def revoke(self, event_id, registration_id):
+        """Refuse a registration's ticket in this worker (e.g. after a cancellation)"""
+        with self._lock:
+            event = self._events.get(event_id)
+            if event is not None:
+                event.revoked.add(registration_id)
+
+    def allow(self, event_id, registration_id):
+        """Accept a registration's ticket again (e.g. after a late confirmation)"""
+        with self._lock:
+            event = self._events.get(event_id)
+            if event is not None:
+                event.revoked.discard(registration_id)
+
+    def merge(self, event_id, rows):
+        """
+        Mark check-ins stored by another path (e.g. an offline scanner's
+        upload) so this worker reports their tickets as duplicates
+
+        Args:
+            event_id: Event ID
+            rows: (registration_id, event_id, user_id, checked_in_at, gate) tuples
+        """
+        with self._lock:
+            event = self._events.get(event_id)
+            if event is None:
+                return
+            for row in rows:
+                first = event.checked_in.get(row[0])
+                if first is None or row[3] < first:
+                    event.checked_in[row[0]] = row[3]
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self):
+        """
+        Write all queued scans
+
+        Returns:
+            Number of scans written (failed batches stay queued)
+        """
+        with self._flush_lock:
+            with self._lock:
+                rows, self._pending = self._pending, []
+            if not rows:
+                return 0
+
+            if self._writer(rows) is None:
+                with self._lock:
+                    self._pending[:0] = rows
+                return 0
+
+            self.flushed += len(rows)
+            return len(rows)
+
+    def invalidate(self, event_id=None):
+        """Force a reload of one event (or all events) on next scan"""
+        with self._lock:
+            if event_id is None:
+                self._events.clear()
+            else:
+                self._events.pop(event_id, None)
+
+    def _event(self, event_id):
+        with self._lock:
+            event = self._events.get(event_id)
+            if event is not None and time.monotonic() - event.loaded_at < self._max_age:
+                return event
+
+        state = self._loader(event_id)
+        if state is None:
+            return event
+
+        checked_in, revoked = state
+        with self._lock:
+            # Keep scans of this worker that are not written yet
+            for registration_id, queued_event, user_id, scanned_at, gate in self._pending:
+                if queued_event == event_id:
+                    checked_in.setdefault(registration_id, scanned_at)
+            event = self._events[event_id] = EventGate(checked_in, revoked)
+        return event
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='checkin-flush', daemon=True)
+            self._thread.start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self._flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Check-in flush error: {e}")
@@ -0,0 +1,44 @@
+"""
+CSV Export Module
+Turns row iterators into CSV text chunks for streaming responses
+"""
+
+import csv
+import io
+
+# Flush the buffer to the client once it grows past this many characters
+CHUNK_SIZE = 8192
+
+def iter_csv(rows, columns, headers=None):
+    """
+    Convert an iterable of row dictionaries into CSV text chunks
+
+    Only one small chunk is held in memory at a time, so this can be fed
+    straight into a Flask streaming response.
+
+    Args:
+        rows: Iterable of row dictionaries
+        columns: List of keys to write, in order
+        headers: Optional list of header labels (defaults to columns)
+
+    Yields:
+        CSV formatted text chunks
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(headers or columns)
+
+    for row in rows:
+        writer.writerow(['' if row[col] is None else row[col] for col in columns])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield _drain(buffer)
+
+    yield _drain(buffer)
+
+def _drain(buffer):
+    """Return buffered text and reset the buffer"""
+    value = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate(0)
+    return value
@@ -5,7 +5,14 @@ Provides database connection for all modules
 
 import mysql.connector
 import os
+import sys
+import time
+from contextlib import contextmanager
+from functools import wraps
 from dotenv import load_dotenv
+from app.utils.rows import make_rows
+from app.utils.request_timing import record_query
+from app.utils.metrics import DB_QUERY_SECONDS, DB_CONNECT_SECONDS, DB_CONNECT_ERRORS, DB_CONNECTIONS_IN_USE
 
 load_dotenv()
 
@@ -14,6 +21,7 @@ def get_db_connection():
     Create and return a MySQL database connection
     Returns: MySQL connection object
     """
+    start = time.perf_counter()
     try:
         connection = mysql.connector.connect(
             host=os.getenv('DB_HOST', 'localhost'),
@@ -21,11 +29,37 @@ def get_db_connection():
             password=os.getenv('DB_PASSWORD', ''),
             database=os.getenv('DB_NAME', 'digital_event_organizer')
         )
+        DB_CONNECT_SECONDS.observe(time.perf_counter() - start)
         return connection
     except mysql.connector.Error as err:
         print(f"Error connecting to database: {err}")
+        DB_CONNECT_ERRORS.inc()
         return None
 
+def timed_query(func):
+    """
+    Count the statement and its time (connecting included) in the
+    request's timings and in the latency histogram of the calling
+    model method
+    """
+    @wraps(func)
+    def wrapper(query, *args, **kwargs):
+        # e.g. 'Event.get_event_by_id' (also for lambdas defined in it);
+        # before Python 3.11 only the function name is available
+        code = sys._getframe(1).f_code
+        method = getattr(code, 'co_qualname', code.co_name).split('.<locals>')[0]
+        DB_CONNECTIONS_IN_USE.inc()
+        start = time.perf_counter()
+        try:
+            return func(query, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            DB_CONNECTIONS_IN_USE.dec()
+            DB_QUERY_SECONDS.observe(elapsed, method)
+            record_query(query, elapsed)
+    return wrapper
+
+@timed_query
 def execute_query(query, params=None, fetch=False):
     """
     Execute a SQL query with optional parameters
@@ -70,6 +104,7 @@ def execute_query(query, params=None, fetch=False):
         connection.close()
         return None
 
+@timed_query
 def execute_one(query, params=None):
     """
     Execute a query and fetch one result
@@ -102,3 +137,236 @@ def execute_one(query, params=None):
         print(f"Database error: {err}")
         connection.close()
         return None
+
+@timed_query
+def execute_rows(query, params=None):
+    """
+    Execute a SELECT query and return compact row objects
+    
+    Same as execute_query(..., fetch=True) but rows are slot-based
+    objects instead of dictionaries, which roughly halves the memory of
+    large listings. Rows support row.column and row['column'] access.
+    
+    Args:
+        query: SQL query string
+        params: Tuple of parameters for the query
+    
+    Returns:
+        List of CompactRow objects, or None on error
+    """
+    connection = get_db_connection()
+    if not connection:
+        return None
+    
+    try:
+        cursor = connection.cursor()
+        
+        if params:
+            cursor.execute(query, params)
+        else:
+            cursor.execute(query)
+        
+        result = make_rows(cursor.column_names, cursor.fetchall())
+        cursor.close()
+        connection.close()
+        return result
+        
+    except mysql.connector.Error as err:
+        print(f"Database error: {err}")
+        connection.close()
+        return None
+
+def execute_stream(query, params=None, chunk_size=500, as_dict=True):
+    """
+    Execute a SELECT query and yield rows one at a time
+    
+    Uses an unbuffered cursor so rows are read from the server in chunks
+    of chunk_size instead of being loaded into memory all at once. The
+    connection stays checked out until the generator is exhausted or
+    closed. A Flask streaming response closes it when the response
+    ends; callers that stop early themselves (e.g. break out of a
+    for-loop) must call close() on it.
+    
+    Errors are raised rather than ending the stream early, so a
+    streamed response aborts instead of sending a truncated body with a
+    200 status.
+    
+    Args:
+        query: SQL query string
+        params: Tuple of parameters for the query
+        chunk_size: Number of rows fetched per round trip
+        as_dict: True to yield dictionaries, False to yield plain tuples
+    
+    Yields:
+        Each row as dictionary (or tuple when as_dict is False)
+    
+    Raises:
+        mysql.connector.Error: If the connection or the query fails,
+            including after some rows were yielded
+    """
+    connection = get_db_connection()
+    if not connection:
+        raise mysql.connector.Error(msg="Could not connect to database")
+    
+    DB_CONNECTIONS_IN_USE.inc()
+    cursor = None
+    exhausted = False
+    try:
+        cursor = connection.cursor(dictionary=as_dict, buffered=False)
+        
+        if params:
+            cursor.execute(query, params)
+        else:
+            cursor.execute(query)
+        
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row
+        exhausted = True
+        
+    except mysql.connector.Error as err:
+        print(f"Database error: {err}")
+        raise
+        
+    finally:
+        # An unbuffered cursor with unread rows cannot be closed cleanly,
+        # so only close it when the result set was fully consumed
+        if cursor is not None and exhausted:
+            cursor.close()
+        connection.close()
+        DB_CONNECTIONS_IN_USE.dec()
+
+@timed_query
+def execute_many(query, param_list, batch_size=500):
+    """
+    Execute one statement for many parameter tuples in batches
+    
+    For INSERT ... VALUES statements the MySQL connector rewrites each
+    batch into a single multi-row INSERT, so a batch costs one round
+    trip. Each batch runs in its own transaction; if a batch fails it is
+    rolled back and no further batches are sent, while batches before it
+    stay committed.
+    
+    Args:
+        query: SQL query string with %s placeholders for one row
+        param_list: List of parameter tuples
+        batch_size: Number of rows per batch / transaction
+    
+    Returns:
+        List of per-batch dictionaries with 'affected_rows' and 'last_id'
+        (for multi-row inserts last_id is the ID of the first inserted row),
+        or None on error
+    """
+    param_list = list(param_list)
+    if not param_list:
+        return []
+    
+    connection = get_db_connection()
+    if not connection:
+        return None
+    
+    results = []
+    try:
+        cursor = connection.cursor()
+        
+        for start in range(0, len(param_list), batch_size):
+            batch = param_list[start:start + batch_size]
+            cursor.executemany(query, batch)
+            connection.commit()
+            results.append({
+                'affected_rows': cursor.rowcount,
+                'last_id': cursor.lastrowid
+            })
+        
+        cursor.close()
+        connection.close()
+        return results
+        
+    except mysql.connector.Error as err:
+        print(f"Database error: {err} (after {len(results)} committed batches)")
+        connection.rollback()
+        connection.close()
+        return None
+
+@contextmanager
+def transaction():
+    """
+    Run several statements in one database transaction
+    
+    Commits when the block finishes and rolls back if it raises, so a
+    multi-step write either fully happens or not at all. Use SELECT ...
+    FOR UPDATE inside the block to lock rows that are read and then
+    changed.
+    
+    Usage:
+        with transaction() as cursor:
+            cursor.execute(...)
+    
+    Yields:
+        Dictionary cursor
+    
+    Raises:
+        mysql.connector.Error: If the connection or any statement fails
+    """
+    connection = get_db_connection()
+    if not connection:
+        raise mysql.connector.Error(msg="Could not connect to database")
+    
+    DB_CONNECTIONS_IN_USE.inc()
+    cursor = connection.cursor(dictionary=True)
+    try:
+        connection.start_transaction()
+        yield cursor
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+        connection.close()
+        DB_CONNECTIONS_IN_USE.dec()
+
+@contextmanager
+def named_lock(name, timeout=5):
+    """
+    Hold a MySQL named lock (GET_LOCK) for the duration of a block
+    
+    Serializes a check and the write that depends on it across all
+    workers and nodes, for writes that have no row to lock yet (e.g.
+    two events booked into the same venue slot). The lock lives on its
+    own connection and is released when the block ends.
+    
+    Usage:
+        with named_lock('venue:main hall'):
+            ...
+    
+    Args:
+        name: Lock name (at most 64 characters)
+        timeout: Seconds to wait for the lock
+    
+    Raises:
+        mysql.connector.Error: If the connection fails or the lock isn't
+            acquired within timeout
+    """
+    connection = get_db_connection()
+    if not connection:
+        raise mysql.connector.Error(msg="Could not connect to database")
+    
+    DB_CONNECTIONS_IN_USE.inc()
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (name, timeout))
+        if cursor.fetchone()[0] != 1:
+            raise mysql.connector.Error(msg=f"Timed out waiting for lock {name}")
+        try:
+            yield
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (name,))
+            cursor.fetchone()
+    finally:
+        cursor.close()
+        connection.close()
+        DB_CONNECTIONS_IN_USE.dec()
@@ -6,6 +6,8 @@ Handles sending emails for notifications and confirmations
 from flask_mail import Message
 from app import mail
 from flask import current_app
+from app.utils.request_timing import timed
+from app.utils.metrics import EMAILS, DEPENDENCY_ERRORS
 
 def send_email(to_email, subject, body):
     """
@@ -26,16 +28,65 @@ def send_email(to_email, subject, body):
             html=body,
             sender=current_app.config['MAIL_DEFAULT_SENDER']
         )
-        mail.send(msg)
+        with timed('smtp', 'send'):
+            mail.send(msg)
+        EMAILS.inc('sent')
         return True
     except Exception as e:
         print(f"Error sending email: {e}")
+        EMAILS.inc('failed')
+        DEPENDENCY_ERRORS.inc('smtp', 'send')
         return False
 
+def send_bulk_emails(messages, batch_size=50):
+    """
+    Send many emails, reusing one SMTP connection per batch
+    
+    Opening an SMTP connection (TLS handshake and login) costs more than
+    sending a message, so each batch shares one connection.
+    
+    Args:
+        messages: List of (to_email, subject, body) tuples
+        batch_size: Messages sent per SMTP connection
+    
+    Returns:
+        Number of messages sent successfully
+    """
+    sent = 0
+    sender = current_app.config['MAIL_DEFAULT_SENDER']
+    
+    for start in range(0, len(messages), batch_size):
+        batch = messages[start:start + batch_size]
+        batch_sent = 0
+        try:
+            with timed('smtp', 'send_batch'), mail.connect() as connection:
+                for to_email, subject, body in batch:
+                    connection.send(Message(subject=subject, recipients=[to_email],
+                                            html=body, sender=sender))
+                    batch_sent += 1
+        except Exception as e:
+            print(f"Error sending email batch: {e}")
+            DEPENDENCY_ERRORS.inc('smtp', 'send_batch')
+        sent += batch_sent
+        EMAILS.inc('sent', amount=batch_sent)
+        EMAILS.inc('failed', amount=len(batch) - batch_sent)
+    
+    return sent
+
 def send_registration_confirmation(user_email, user_name, event_title, event_date, event_time, venue):
     """
     Send registration confirmation email
     """
+    subject, body = registration_confirmation_email(user_name, event_title, event_date, event_time, venue)
+    return send_email(user_email, subject, body)
+
+def registration_confirmation_email(user_name, event_title, event_date, event_time, venue):
+    """
+    Build the registration confirmation email
+    
+    Returns:
+        Tuple (subject, body) for send_email or send_bulk_emails
+    """
     subject = f"Registration Confirmed - {event_title}"
     body = f"""
     <html>
@@ -56,7 +107,7 @@ def send_registration_confirmation(user_email, user_name, event_title, event_dat
         </body>
     </html>
     """
-    return send_email(user_email, subject, body)
+    return subject, body
 
 def send_payment_confirmation(user_email, user_name, event_title, amount, transaction_id):
     """
@@ -131,3 +182,37 @@ def send_event_cancellation(user_email, user_name, event_title):
     </html>
     """
     return send_email(user_email, subject, body)
+
+def waitlist_promotion_email(user_name, event_title, event_date, event_time, venue, payment_required=False):
+    """
+    Build the email telling a waitlisted user they got a seat
+    
+    Returns:
+        Tuple (subject, body) for send_bulk_emails
+    """
+    subject = f"You're In - {event_title}"
+    if payment_required:
+        next_step = "<p>A seat is being held for you. Please complete your payment from <strong>My Registrations</strong> to confirm it.</p>"
+    else:
+        next_step = "<p>Your registration is confirmed.</p>"
+    
+    body = f"""
+    <html>
+        <body style="font-family: Arial, sans-serif;">
+            <h2>A Seat Opened Up!</h2>
+            <p>Dear {user_name},</p>
+            <p>You have been moved from the waitlist to the following event:</p>
+            
+            <div style="background-color: #e3f2fd; padding: 15px; border-radius: 5px;">
+                <h3 style="color: #333;">{event_title}</h3>
+                <p><strong>Date:</strong> {event_date}</p>
+                <p><strong>Time:</strong> {event_time}</p>
+                <p><strong>Venue:</strong> {venue}</p>
+            </div>
+            
+            {next_step}
+            <p>Best regards,<br>Event Organizer Team</p>
+        </body>
+    </html>
+    """
+    return subject, body
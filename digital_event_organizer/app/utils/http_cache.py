@@ -0,0 +1,135 @@
+"""
+HTTP Cache Module
+ETag / Last-Modified helpers for conditional GET on public pages
+"""
+
+import hashlib
+from datetime import timezone
+from flask import request, session, make_response
+
+def viewer_key():
+    """
+    Identify who a page is rendered for
+
+    Pages extend base.html, whose navbar depends on the logged-in user,
+    so the same URL renders differently per viewer.
+
+    Returns:
+        Tuple describing the viewer ('anon' for anonymous visitors)
+    """
+    if 'user_id' not in session:
+        return ('anon',)
+    return (session.get('user_id'), session.get('user_name'), session.get('user_role'))
+
+def is_cacheable_request():
+    """
+    Check whether the current request may be answered from a cached copy
+
+    Pending flash messages are rendered once and then dropped, so a page
+    with flashes must always be rendered fresh.
+
+    Returns:
+        Boolean: True for GET/HEAD requests without pending flashes
+    """
+    return request.method in ('GET', 'HEAD') and '_flashes' not in session
+
+def make_etag(*parts):
+    """
+    Build an ETag from version parts and the current viewer
+
+    Args:
+        *parts: Values that change whenever the representation changes
+
+    Returns:
+        ETag string (without quotes)
+    """
+    raw = repr((parts, viewer_key())).encode('utf-8')
+    return hashlib.sha1(raw).hexdigest()[:20]
+
+def _to_utc(value):
+    """Convert a naive MySQL timestamp (server local time) to aware UTC"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.astimezone()
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+def is_not_modified(etag, last_modified=None):
+    """
+    Check the request's conditional headers against the current version
+
+    If-None-Match takes precedence over If-Modified-Since, as in RFC 7232.
+
+    Args:
+        etag: Current ETag
+        last_modified: Current last modification datetime (optional)
+
+    Returns:
+        Boolean: True if the client's copy is still valid
+    """
+    if not is_cacheable_request():
+        return False
+
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+
+    if last_modified is not None and request.if_modified_since is not None:
+        return _to_utc(last_modified) <= request.if_modified_since
+
+    return False
+
+def apply_cache_headers(response, etag, last_modified=None, max_age=60, private=False):
+    """
+    Add ETag, Last-Modified and Cache-Control headers to a response
+
+    Anonymous pages are public so a reverse proxy can share them;
+    pages for logged-in users are private and always revalidated.
+
+    Args:
+        response: Flask response
+        etag: ETag string
+        last_modified: Last modification datetime (optional)
+        max_age: Seconds a public copy may be reused without revalidation
+        private: Force private caching (e.g. per-user content behind a
+            secret URL instead of a session)
+
+    Returns:
+        The same response
+    """
+    if not is_cacheable_request():
+        return response
+
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = _to_utc(last_modified)
+
+    if viewer_key() == ('anon',) and not private:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    elif private:
+        # Per-user content behind a secret URL: only the client may reuse it
+        response.cache_control.private = True
+        response.cache_control.max_age = max_age
+    else:
+        response.cache_control.private = True
+        response.cache_control.max_age = 0
+        response.cache_control.must_revalidate = True
+    response.vary.add('Cookie')
+
+    return response
+
+def not_modified(etag, last_modified=None, max_age=60, private=False):
+    """
+    Build an empty 304 Not Modified response with cache headers
+
+    Args:
+        etag: ETag string
+        last_modified: Last modification datetime (optional)
+        max_age: Seconds a public copy may be reused
+        private: Force private caching
+
+    Returns:
+        Flask response with status 304
+    """
+    response = make_response('', 304)
+    return apply_cache_headers(response, etag, last_modified, max_age, private)
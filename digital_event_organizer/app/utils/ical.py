@@ -0,0 +1,166 @@
+"""
+iCalendar Module
+Streams events as an RFC 5545 calendar (.ics)
+"""
+
+import os
+from datetime import timedelta, timezone
+from flask import Response, stream_with_context
+from app.utils.http_cache import make_etag, is_not_modified, not_modified, apply_cache_headers
+
+# Length used for rows without duration_minutes
+DEFAULT_DURATION = timedelta(hours=2)
+
+# Optional IANA zone name of the stored local times (e.g. Asia/Kolkata).
+# Without it, times are written as floating local times.
+CALENDAR_TIMEZONE = os.getenv('CALENDAR_TIMEZONE', '')
+
+PRODID = '-//Digital Event Organizer//Events//EN'
+
+# Calendar apps poll every few minutes; let them reuse a feed for 5 minutes
+FEED_MAX_AGE = 300
+
+def escape_text(value):
+    """Escape a TEXT property value"""
+    if value is None:
+        return ''
+    return (str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n').replace('\r', '\\n'))
+
+def fold_line(line):
+    """
+    Fold a content line at 75 octets as required by RFC 5545
+
+    Args:
+        line: Unfolded content line
+
+    Returns:
+        Line with CRLF line ending (continuations start with a space)
+    """
+    data = line.encode('utf-8')
+    if len(data) <= 75:
+        return line + '\r\n'
+
+    parts = []
+    start = 0
+    limit = 75
+    while start < len(data):
+        end = min(start + limit, len(data))
+        # Don't split a multi-byte UTF-8 character
+        while end < len(data) and (data[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(data[start:end].decode('utf-8'))
+        start = end
+        limit = 74
+    return '\r\n '.join(parts) + '\r\n'
+
+def _local_time(value):
+    """Format a naive local datetime"""
+    return value.strftime('%Y%m%dT%H%M%S')
+
+def _utc_time(value):
+    """Format a naive MySQL timestamp (server local time) in UTC"""
+    return value.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+def _start_property(name, value):
+    if CALENDAR_TIMEZONE:
+        return f'{name};TZID={CALENDAR_TIMEZONE}:{_local_time(value)}'
+    return f'{name}:{_local_time(value)}'
+
+def format_event(event, uid_domain, url=None):
+    """
+    Format one event as a VEVENT block
+
+    Args:
+        event: Event dictionary with event_id, title, description, venue,
+            category, starts_at, duration_minutes and updated_at
+        uid_domain: Domain used in the stable UID
+        url: Event page URL (optional)
+
+    Returns:
+        VEVENT text with CRLF line endings
+    """
+    duration = DEFAULT_DURATION
+    if event.get('duration_minutes'):
+        duration = timedelta(minutes=event['duration_minutes'])
+
+    lines = [
+        'BEGIN:VEVENT',
+        f"UID:event-{event['event_id']}@{uid_domain}",
+        f"DTSTAMP:{_utc_time(event['updated_at'])}",
+        f"LAST-MODIFIED:{_utc_time(event['updated_at'])}",
+        _start_property('DTSTART', event['starts_at']),
+        _start_property('DTEND', event['starts_at'] + duration),
+        f"SUMMARY:{escape_text(event['title'])}",
+        f"LOCATION:{escape_text(event['venue'])}",
+    ]
+    if event.get('description'):
+        lines.append(f"DESCRIPTION:{escape_text(event['description'])}")
+    if event.get('category'):
+        lines.append(f"CATEGORIES:{escape_text(event['category'])}")
+    if event.get('status') == 'pending':
+        lines.append('STATUS:TENTATIVE')
+    else:
+        lines.append('STATUS:CONFIRMED')
+    if url:
+        lines.append(f'URL:{url}')
+    lines.append('END:VEVENT')
+
+    return ''.join(fold_line(line) for line in lines)
+
+def iter_calendar(events, name, uid_domain, url_for_event=None):
+    """
+    Stream a VCALENDAR, one VEVENT at a time
+
+    Args:
+        events: Iterable of event dictionaries (e.g. a streamed query)
+        name: Calendar name shown by calendar apps
+        uid_domain: Domain used in event UIDs
+        url_for_event: Callable mapping an event ID to its page URL (optional)
+
+    Yields:
+        Chunks of calendar text
+    """
+    header = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escape_text(name)}',
+    ]
+    if CALENDAR_TIMEZONE:
+        header.append(f'X-WR-TIMEZONE:{CALENDAR_TIMEZONE}')
+    yield ''.join(fold_line(line) for line in header)
+
+    for event in events:
+        url = url_for_event(event['event_id']) if url_for_event else None
+        yield format_event(event, uid_domain, url)
+
+    yield fold_line('END:VCALENDAR')
+
+def calendar_response(version, chunks, *etag_parts, private=False):
+    """
+    Build a streamed .ics response with ETag-conditional GET
+
+    The version (from a cheap aggregate query) decides the ETag, so a
+    poll with a current ETag is answered with 304 before the events
+    are queried.
+
+    Args:
+        version: Dictionary with count, updated_at and checksum
+        chunks: Callable returning the calendar chunk iterator
+        *etag_parts: Extra values identifying the feed
+        private: True for per-user feeds
+
+    Returns:
+        Flask response
+    """
+    etag = make_etag('ics', version['count'], version['updated_at'], version['checksum'], *etag_parts)
+
+    if is_not_modified(etag, version['updated_at']):
+        return not_modified(etag, version['updated_at'], FEED_MAX_AGE, private)
+
+    response = Response(stream_with_context(chunks()), mimetype='text/calendar')
+    response.headers['Content-Disposition'] = 'inline; filename="events.ics"'
+    return apply_cache_headers(response, etag, version['updated_at'], FEED_MAX_AGE, private)
@@ -0,0 +1,66 @@
+"""
+ID Codec Module
+Compact text encoding of sorted ID sets for offline device snapshots
+"""
+
+import base64
+
+def encode_ids(ids):
+    """
+    Encode a set of positive integer IDs
+
+    The IDs are sorted and each is stored as the gap to the previous one
+    in LEB128 varint form (7 bits per byte, high bit = more bytes), then
+    base64 encoded. Registration IDs of one event are mostly close
+    together, so most gaps fit one byte: 100,000 IDs take about 135 KB
+    instead of about 720 KB as a JSON array.
+
+    Args:
+        ids: Iterable of integers >= 0
+
+    Returns:
+        ASCII string (empty for no IDs)
+    """
+    out = bytearray()
+    previous = 0
+    for value in sorted(set(ids)):
+        gap = value - previous
+        previous = value
+        while gap > 0x7F:
+            out.append(gap & 0x7F | 0x80)
+            gap >>= 7
+        out.append(gap)
+    return base64.b64encode(bytes(out)).decode('ascii')
+
+def decode_ids(text):
+    """
+    Decode a string produced by encode_ids
+
+    Returns:
+        Sorted list of IDs
+
+    Raises:
+        ValueError: If the text is not a valid encoding
+    """
+    try:
+        data = base64.b64decode(text, validate=True)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid ID encoding")
+
+    ids = []
+    value = 0
+    gap = 0
+    shift = 0
+    for byte in data:
+        gap |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        value += gap
+        ids.append(value)
+        gap = 0
+        shift = 0
+
+    if shift:
+        raise ValueError("Invalid ID encoding")
+    return ids
@@ -0,0 +1,88 @@
+"""
+Identity Map Module
+Request-scoped memo of model rows so one request never reads a row twice
+"""
+
+from flask import g, has_request_context
+
+_MISSING = object()
+
+def _store():
+    """Get the identity map of the current request"""
+    store = getattr(g, '_identity_map', None)
+    if store is None:
+        store = g._identity_map = {}
+        g._identity_hits = 0
+    return store
+
+def _copy(value):
+    """Return a copy of dictionary rows so callers can't change the map"""
+    return dict(value) if isinstance(value, dict) else value
+
+def _normalize(key):
+    """Normalize IDs so 5 and '5' map to the same entry"""
+    if isinstance(key, tuple):
+        return tuple(str(part) for part in key)
+    return str(key)
+
+def identity_get(kind, key, loader):
+    """
+    Get a row from the request's identity map, loading it on first use
+
+    Outside a request (CLI jobs, background threads) the loader is
+    simply called.
+
+    Args:
+        kind: Row type, e.g. 'event' or 'user'
+        key: Row identifier (ID or tuple of IDs)
+        loader: Callable that reads the row from the database
+
+    Returns:
+        Row dictionary (a copy) or None
+    """
+    if not has_request_context():
+        return _copy(loader())
+
+    store = _store()
+    ident = (kind, _normalize(key))
+    value = store.get(ident, _MISSING)
+
+    if value is _MISSING:
+        value = loader()
+        store[ident] = value
+    else:
+        g._identity_hits += 1
+
+    return _copy(value)
+
+def identity_evict(kind, key=None):
+    """
+    Remove rows from the request's identity map after a write
+
+    Args:
+        kind: Row type
+        key: Row identifier, or None to evict every row of this kind
+    """
+    if not has_request_context():
+        return
+
+    store = getattr(g, '_identity_map', None)
+    if not store:
+        return
+
+    if key is None:
+        for ident in [ident for ident in store if ident[0] == kind]:
+            del store[ident]
+    else:
+        store.pop((kind, _normalize(key)), None)
+
+def queries_avoided():
+    """
+    Get the number of lookups answered from the identity map
+
+    Returns:
+        Count for the current request (0 outside a request)
+    """
+    if not has_request_context():
+        return 0
+    return getattr(g, '_identity_hits', 0)
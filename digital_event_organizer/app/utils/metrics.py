@@ -0,0 +1,297 @@
+"""
+Metrics Module
+Prometheus counters, gauges and histograms kept per thread and merged on scrape
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from app.utils.cache import cache_stats
+
+# Seconds; covers a cache hit through a slow payment gateway call
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# With several worker processes, each one writes its values here and a
+# scrape merges every file (unset: this process only)
+METRICS_DIR = os.getenv('METRICS_DIR', '')
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 10))
+
+class _Shard:
+    """Values written by one thread; only that thread changes them"""
+
+    __slots__ = ('thread', 'values', 'histograms')
+
+    def __init__(self, thread):
+        self.thread = thread
+        self.values = {}            # (name, label values) -> number
+        self.histograms = {}        # (name, label values) -> bucket counts + [sum]
+
+_local = threading.local()
+_shards = []
+_retired = _Shard(None)             # totals of threads that have exited
+_lock = threading.Lock()            # shard list changes and scrapes only
+_metrics = {}
+_collectors = []
+_flusher = None
+
+def _shard():
+    shard = getattr(_local, 'shard', None)
+    if shard is None:
+        shard = _local.shard = _Shard(threading.current_thread())
+        with _lock:
+            _shards.append(shard)
+    return shard
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _metrics[name] = self
+
+class Counter(_Metric):
+    """Monotonic count"""
+
+    kind = 'counter'
+
+    def inc(self, *labelvalues, amount=1):
+        values = _shard().values
+        key = (self.name, labelvalues)
+        values[key] = values.get(key, 0) + amount
+
+class Gauge(_Metric):
+    """Value that goes up and down (e.g. connections in use)"""
+
+    kind = 'gauge'
+
+    def inc(self, *labelvalues, amount=1):
+        values = _shard().values
+        key = (self.name, labelvalues)
+        values[key] = values.get(key, 0) + amount
+
+    def dec(self, *labelvalues, amount=1):
+        self.inc(*labelvalues, amount=-amount)
+
+class Histogram(_Metric):
+    """Distribution of observed values in fixed buckets"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labelvalues):
+        histograms = _shard().histograms
+        key = (self.name, labelvalues)
+        counts = histograms.get(key)
+        if counts is None:
+            # One slot per bucket, one for +Inf, then the sum
+            counts = histograms[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+def register_collector(collector):
+    """
+    Add a callable run on every scrape
+
+    Args:
+        collector: Callable returning (metric, label values tuple, value)
+            tuples for values read at scrape time (cache sizes, queue
+            depths); the metrics are declared once like any other
+    """
+    _collectors.append(collector)
+
+def _merge_shard(into, shard):
+    for key, value in list(shard.values.items()):
+        into.values[key] = into.values.get(key, 0) + value
+    for key, counts in list(shard.histograms.items()):
+        total = into.histograms.get(key)
+        if total is None:
+            into.histograms[key] = list(counts)
+        else:
+            for index, count in enumerate(counts):
+                total[index] += count
+
+def _collect_local():
+    """
+    Merge every thread's values and the collectors of this process
+
+    Returns:
+        Dictionary with 'values' ([name, label values, number] lists)
+        and 'histograms' ([name, label values, counts] lists)
+    """
+    merged = _Shard(None)
+    with _lock:
+        # Exited threads are folded into one shard, so the list stays
+        # as long as the number of live threads
+        for shard in [shard for shard in _shards if not shard.thread.is_alive()]:
+            _merge_shard(_retired, shard)
+            _shards.remove(shard)
+        shards = list(_shards) + [_retired]
+
+    for shard in shards:
+        # Dictionary copies are atomic under the GIL, so the owning
+        # threads never wait for a scrape
+        copy = _Shard(None)
+        copy.values = dict(shard.values)
+        copy.histograms = {key: list(counts) for key, counts in dict(shard.histograms).items()}
+        _merge_shard(merged, copy)
+
+    values = [[name, list(labels), value] for (name, labels), value in merged.values.items()]
+    for collector in _collectors:
+        try:
+            for metric, labelvalues, value in collector():
+                values.append([metric.name, [str(label) for label in labelvalues], value])
+        except Exception as e:
+            print(f"Metrics collector error: {e}")
+
+    histograms = [[name, list(labels), counts] for (name, labels), counts in merged.histograms.items()]
+    return {'values': values, 'histograms': histograms}
+
+def _write_snapshot():
+    """Write this process's values to METRICS_DIR"""
+    snapshot = _collect_local()
+    snapshot['time'] = time.time()
+    snapshot['kinds'] = {name: metric.kind for name, metric in _metrics.items()}
+    path = os.path.join(METRICS_DIR, f'{os.getpid()}.json')
+    with open(f'{path}.tmp', 'w') as handle:
+        json.dump(snapshot, handle)
+    os.replace(f'{path}.tmp', path)
+
+def _flush_loop():
+    while True:
+        time.sleep(METRICS_FLUSH_INTERVAL)
+        try:
+            _write_snapshot()
+        except OSError as e:
+            print(f"Metrics snapshot error: {e}")
+
+def start_flusher():
+    """Write this process's values to METRICS_DIR periodically (once per process)"""
+    global _flusher
+    if not METRICS_DIR or (_flusher is not None and _flusher[0] == os.getpid()):
+        return
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    thread = threading.Thread(target=_flush_loop, name='metrics-flush', daemon=True)
+    _flusher = (os.getpid(), thread)
+    thread.start()
+
+def _collect():
+    """Values of this process, or of every process when METRICS_DIR is set"""
+    if not METRICS_DIR:
+        return [_collect_local()]
+
+    _write_snapshot()
+    snapshots = []
+    for filename in os.listdir(METRICS_DIR):
+        if not filename.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(METRICS_DIR, filename)) as handle:
+                snapshot = json.load(handle)
+        except (OSError, ValueError):
+            continue
+        # Counters of exited workers still count; their gauges don't
+        if time.time() - snapshot['time'] > 3 * METRICS_FLUSH_INTERVAL:
+            snapshot['values'] = [value for value in snapshot['values']
+                                  if snapshot['kinds'].get(value[0]) == 'counter']
+        snapshots.append(snapshot)
+    return snapshots
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+               for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render():
+    """
+    Render all metrics in the Prometheus text exposition format
+
+    Returns:
+        Text for a text/plain; version=0.0.4 response
+    """
+    values = {}
+    histograms = {}
+    for snapshot in _collect():
+        for name, labels, value in snapshot['values']:
+            key = (name, tuple(labels))
+            values[key] = values.get(key, 0) + value
+        for name, labels, counts in snapshot['histograms']:
+            key = (name, tuple(labels))
+            total = histograms.get(key)
+            if total is None:
+                histograms[key] = list(counts)
+            else:
+                for index, count in enumerate(counts):
+                    total[index] += count
+
+    lines = []
+    for name in sorted(_metrics):
+        metric = _metrics[name]
+        if metric.kind == 'histogram':
+            samples = sorted((labels, counts) for (sample, labels), counts in histograms.items()
+                             if sample == name)
+        else:
+            samples = sorted((labels, value) for (sample, labels), value in values.items()
+                             if sample == name)
+        if not samples:
+            continue
+
+        lines.append(f'# HELP {name} {metric.documentation}')
+        lines.append(f'# TYPE {name} {metric.kind}')
+        for labels, value in samples:
+            if metric.kind != 'histogram':
+                lines.append(f'{name}{_format_labels(metric.labelnames, labels)} {_format_number(value)}')
+                continue
+            # Count is the sum of the buckets, so it always matches them
+            cumulative = 0
+            for bound, count in zip(metric.buckets + (float('inf'),), value[:-1]):
+                cumulative += count
+                le = _format_labels(metric.labelnames, labels, [('le', _format_number(float(bound)))])
+                lines.append(f'{name}_bucket{le} {cumulative}')
+            plain = _format_labels(metric.labelnames, labels)
+            lines.append(f'{name}_sum{plain} {_format_number(float(value[-1]))}')
+            lines.append(f'{name}_count{plain} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+# Application metrics. Modules with values read at scrape time (queue
+# depths, feed lag) declare theirs next to the objects they describe.
+REQUEST_SECONDS = Histogram('http_request_duration_seconds', 'Request latency',
+                            ('blueprint', 'endpoint', 'method', 'status'))
+DB_QUERY_SECONDS = Histogram('db_query_duration_seconds',
+                             'Database call latency (connecting included) by calling model method',
+                             ('method',))
+DB_CONNECT_SECONDS = Histogram('db_connect_duration_seconds', 'Time to open a database connection')
+DB_CONNECT_ERRORS = Counter('db_connect_errors_total', 'Failed database connection attempts')
+DB_CONNECTIONS_IN_USE = Gauge('db_connections_in_use', 'Database connections currently open')
+DEPENDENCY_SECONDS = Histogram('dependency_duration_seconds', 'SMTP and payment gateway call latency',
+                               ('dependency', 'operation'))
+DEPENDENCY_ERRORS = Counter('dependency_errors_total', 'Failed SMTP and payment gateway calls',
+                            ('dependency', 'operation'))
+EMAILS = Counter('emails_total', 'Emails by result', ('result',))
+CACHE_HITS = Counter('cache_hits_total', 'Cache lookups answered from the cache', ('cache',))
+CACHE_MISSES = Counter('cache_misses_total', 'Cache lookups that loaded the value', ('cache',))
+CACHE_EVICTIONS = Counter('cache_evictions_total', 'Entries dropped to stay within maxsize', ('cache',))
+CACHE_ENTRIES = Gauge('cache_entries', 'Entries currently cached', ('cache',))
+
+def _cache_values():
+    for stats in cache_stats():
+        yield CACHE_HITS, (stats['name'],), stats['hits']
+        yield CACHE_MISSES, (stats['name'],), stats['misses']
+        yield CACHE_EVICTIONS, (stats['name'],), stats['evictions']
+        yield CACHE_ENTRIES, (stats['name'],), stats['size']
+
+register_collector(_cache_values)
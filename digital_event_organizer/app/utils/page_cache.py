@@ -0,0 +1,138 @@
+"""
+Page Cache Module
+Full-response cache for anonymous pages and a Jinja fragment cache
+"""
+
+import os
+from functools import wraps
+from flask import request, make_response
+from markupsafe import Markup
+from app.utils.cache import get_cache
+from app.utils.http_cache import viewer_key, is_cacheable_request, is_not_modified, not_modified, apply_cache_headers
+
+# Rendered pages for anonymous visitors. Entries are dropped by the Event
+# write methods through tags; seat counts are not part of the cache key
+# because pages refresh them from /events/seats.
+page_cache = get_cache(
+    'pages',
+    maxsize=int(os.getenv('PAGE_CACHE_SIZE', 512)),
+    ttl=int(os.getenv('PAGE_CACHE_TTL', 60))
+)
+
+# Rendered template fragments, keyed by the version of the data they show
+fragment_cache = get_cache(
+    'fragments',
+    maxsize=int(os.getenv('FRAGMENT_CACHE_SIZE', 2048)),
+    ttl=int(os.getenv('FRAGMENT_CACHE_TTL', 600))
+)
+
+def invalidate_pages(event_id=None):
+    """
+    Drop cached pages and fragments that show an event
+
+    Args:
+        event_id: Changed event (None when only listings are affected)
+    """
+    if event_id is not None:
+        page_cache.invalidate_tag(f'event:{event_id}')
+        fragment_cache.invalidate_tag(f'event:{event_id}')
+    page_cache.invalidate_tag('listings')
+
+def clear_pages():
+    """Drop every cached page and fragment"""
+    page_cache.clear()
+    fragment_cache.clear()
+
+def _page_key():
+    """Cache key for the current request: path plus sorted query args"""
+    args = sorted(request.args.items(multi=True))
+    return repr((request.path, args, request.headers.get('X-Requested-With')))
+
+def _to_entry(response):
+    """Turn a rendered response into a cache entry, or None if not storable"""
+    if response.status_code != 200 or response.direct_passthrough:
+        return None
+
+    etag, _ = response.get_etag()
+    if not etag:
+        return None
+
+    return {
+        'body': response.get_data(),
+        'mimetype': response.mimetype,
+        'etag': etag,
+        'last_modified': response.last_modified,
+        'max_age': response.cache_control.max_age or 0
+    }
+
+def _from_entry(entry):
+    """Build a response from a cache entry, answering conditional requests"""
+    if is_not_modified(entry['etag'], entry['last_modified']):
+        return not_modified(entry['etag'], entry['last_modified'], entry['max_age'])
+
+    response = make_response(entry['body'])
+    response.mimetype = entry['mimetype']
+    response.headers['X-Page-Cache'] = 'hit'
+    return apply_cache_headers(response, entry['etag'], entry['last_modified'], entry['max_age'])
+
+def cached_page(*tags):
+    """
+    Cache a view's full response for anonymous visitors
+
+    Tags are format strings filled from the view arguments, e.g.
+    'event:{event_id}'. A hit skips both the database and template
+    rendering; concurrent misses for one page render it once.
+
+    Args:
+        *tags: Tag templates used for invalidation
+
+    Returns:
+        View decorator
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if viewer_key() != ('anon',) or not is_cacheable_request():
+                return view(*args, **kwargs)
+
+            rendered = {}
+
+            def render():
+                response = rendered['response'] = make_response(view(*args, **kwargs))
+                return _to_entry(response)
+
+            entry = page_cache.get_or_load(
+                _page_key(), render, tags=[tag.format(**kwargs) for tag in tags]
+            )
+
+            if 'response' in rendered:
+                return rendered['response']
+            if entry is None:
+                # Another request rendered an uncacheable response
+                return view(*args, **kwargs)
+            return _from_entry(entry)
+        return wrapper
+    return decorator
+
+def cache_fragment(name, *key, tags=(), caller=None):
+    """
+    Render a template block once per key
+
+    Used from templates with a call block:
+        {% call cache_fragment('event-card', event.event_id, event.updated_at) %}
+
+    Args:
+        name: Fragment name
+        *key: Values that change whenever the fragment output changes
+        tags: Tags used for invalidation
+        caller: Block body (passed by Jinja)
+
+    Returns:
+        Rendered markup
+    """
+    cache_key = repr((name,) + key)
+    return Markup(fragment_cache.get_or_load(cache_key, lambda: str(caller()), tags=tags))
+
+def init_app(app):
+    """Expose the fragment cache to templates"""
+    app.jinja_env.globals['cache_fragment'] = cache_fragment
@@ -5,6 +5,8 @@ Handles Razorpay payment gateway integration
 
 import razorpay
 from flask import current_app
+from app.utils.request_timing import timed
+from app.utils.metrics import DEPENDENCY_ERRORS
 import hashlib
 import hmac
 
@@ -44,11 +46,13 @@ def create_order(amount, currency='INR', receipt=None):
             'payment_capture': 1  # Auto capture payment
         }
         
-        order = client.order.create(data=order_data)
+        with timed('razorpay', 'create_order'):
+            order = client.order.create(data=order_data)
         return order
     
     except Exception as e:
         print(f"Error creating Razorpay order: {e}")
+        DEPENDENCY_ERRORS.inc('razorpay', 'create_order')
         return None
 
 def verify_payment_signature(order_id, payment_id, signature):
@@ -94,9 +98,11 @@ def fetch_payment_details(payment_id):
     """
     try:
         client = get_razorpay_client()
-        payment = client.payment.fetch(payment_id)
+        with timed('razorpay', 'fetch_payment'):
+            payment = client.payment.fetch(payment_id)
         return payment
     
     except Exception as e:
         print(f"Error fetching payment details: {e}")
+        DEPENDENCY_ERRORS.inc('razorpay', 'fetch_payment')
         return None
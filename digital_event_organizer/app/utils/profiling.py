@@ -0,0 +1,213 @@
+"""
+Profiling Module
+Opt-in CPU and memory profiles of single requests, requested by admins
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from flask import g, request, session
+
+# Profiles are written here, newest PROFILE_KEEP kept
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+PROFILE_KEEP = int(os.getenv('PROFILE_KEEP', 100))
+
+# Rate limits per worker process: seconds between two profiles, and
+# profiles per hour
+PROFILE_MIN_INTERVAL = float(os.getenv('PROFILE_MIN_INTERVAL', 30))
+PROFILE_MAX_PER_HOUR = int(os.getenv('PROFILE_MAX_PER_HOUR', 20))
+
+# Seconds between two stack samples
+PROFILE_SAMPLE_INTERVAL = float(os.getenv('PROFILE_SAMPLE_INTERVAL', 0.005))
+
+# Allocation sites listed in the memory report
+TOP_ALLOCATIONS = 25
+
+PROFILE_SUFFIXES = ('.collapsed', '.alloc.txt')
+
+class StackSampler:
+    """
+    Samples one thread's call stack from a background thread
+
+    Each sample costs one walk of the stack, so the request runs at
+    close to normal speed (unlike cProfile, which hooks every call).
+    Samples are counted per distinct stack, ready for flame graphs.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self):
+        """Stacks in the collapsed format of flamegraph.pl and speedscope"""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+    def _run(self):
+        # The first sample is taken right away, so short requests get one
+        while True:
+            self._sample()
+            if self._stop.wait(self.interval):
+                return
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            filename = os.path.basename(code.co_filename)
+            # co_qualname (with the class name) is new in Python 3.11
+            name = getattr(code, 'co_qualname', code.co_name)
+            names.append(f'{name} ({filename}:{code.co_firstlineno})'.replace(';', ','))
+            frame = frame.f_back
+        self.stacks[';'.join(reversed(names))] += 1
+        self.samples += 1
+
+class _RateLimit:
+    """Minimum interval and hourly cap on profiles in this process"""
+
+    def __init__(self, min_interval, max_per_hour):
+        self.min_interval = min_interval
+        self.max_per_hour = max_per_hour
+        self.recent = []
+        self.lock = threading.Lock()
+
+    def allow(self):
+        now = time.monotonic()
+        with self.lock:
+            self.recent = [started for started in self.recent if now - started < 3600]
+            if self.recent and now - self.recent[-1] < self.min_interval:
+                return False
+            if len(self.recent) >= self.max_per_hour:
+                return False
+            self.recent.append(now)
+            return True
+
+_rate_limit = _RateLimit(PROFILE_MIN_INTERVAL, PROFILE_MAX_PER_HOUR)
+
+# tracemalloc traces the whole process, so one profile runs at a time
+_active = threading.Lock()
+
+def _requested():
+    """Profile flag set by an admin (X-Profile header or ?_profile=1)"""
+    flag = request.headers.get('X-Profile') or request.args.get('_profile')
+    return flag in ('1', 'true') and session.get('user_role') == 'admin'
+
+def _start_profile():
+    if not _requested():
+        return
+    if not _active.acquire(blocking=False):
+        g._profile_status = 'busy'
+        return
+    if not _rate_limit.allow():
+        _active.release()
+        g._profile_status = 'rate-limited'
+        return
+
+    # Leave tracing alone if it was already on (PYTHONTRACEMALLOC)
+    owns_tracing = not tracemalloc.is_tracing()
+    if owns_tracing:
+        tracemalloc.start()
+    sampler = StackSampler(threading.get_ident(), PROFILE_SAMPLE_INTERVAL)
+    sampler.start()
+    g._profile = (sampler, time.perf_counter(), owns_tracing)
+
+def _stop_profile():
+    """Stop the request's profilers; returns the data or None"""
+    profile = g.pop('_profile', None)
+    if profile is None:
+        return None
+
+    sampler, started, owns_tracing = profile
+    try:
+        sampler.stop()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        if owns_tracing:
+            tracemalloc.stop()
+        _active.release()
+    return sampler, time.perf_counter() - started, snapshot, peak
+
+def _write_profile(sampler, elapsed, snapshot, peak, status):
+    """Write the flame graph stacks and the allocation report"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    endpoint = re.sub(r'[^A-Za-z0-9_.-]', '_', request.endpoint or 'unmatched')
+    name = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{endpoint}-{os.getpid()}"
+
+    collapsed, report = PROFILE_SUFFIXES
+    with open(os.path.join(PROFILE_DIR, name + collapsed), 'w') as handle:
+        handle.write(sampler.collapsed())
+
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__),
+              tracemalloc.Filter(False, __file__))
+    stats = snapshot.filter_traces(ignore).statistics('lineno')
+    with open(os.path.join(PROFILE_DIR, name + report), 'w') as handle:
+        handle.write(f"{request.method} {request.full_path} -> {status}\n")
+        handle.write(f"wall time {elapsed * 1000:.1f} ms, {sampler.samples} stack samples, "
+                     f"peak traced memory {peak / 1024:.1f} KiB\n")
+        handle.write("Memory still allocated at the end of the request, by line "
+                     "(other threads' allocations included):\n\n")
+        for stat in stats[:TOP_ALLOCATIONS]:
+            handle.write(f"{stat}\n")
+
+    # Keep the newest profiles only (names start with the time)
+    profiles = sorted({filename[:-len(suffix)] for filename in os.listdir(PROFILE_DIR)
+                       for suffix in PROFILE_SUFFIXES if filename.endswith(suffix)})
+    for old in profiles[:-PROFILE_KEEP]:
+        for suffix in PROFILE_SUFFIXES:
+            path = os.path.join(PROFILE_DIR, old + suffix)
+            if os.path.exists(path):
+                os.remove(path)
+    return name
+
+def _finish_profile(response):
+    status = g.pop('_profile_status', None)
+    data = _stop_profile()
+    if data is not None:
+        try:
+            status = _write_profile(*data, response.status_code)
+        except OSError as e:
+            print(f"Error writing profile: {e}")
+            status = 'write-failed'
+    if status:
+        response.headers['X-Profile'] = status
+    return response
+
+def _abandon_profile(error=None):
+    # The response failed before after_request ran
+    _stop_profile()
+
+def init_app(app):
+    """
+    Let admins profile single requests of an application
+
+    With PROFILING=1, an admin request sent with an `X-Profile: 1` header
+    or `?_profile=1` runs under a stack sampler and tracemalloc. It
+    writes <name>.collapsed (flame graph stacks) and <name>.alloc.txt
+    (top allocations) to PROFILE_DIR and returns <name> in the
+    X-Profile response header.
+    """
+    if os.getenv('PROFILING', '0') != '1':
+        return
+
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
+    app.teardown_request(_abandon_profile)
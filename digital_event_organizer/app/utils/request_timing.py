@@ -0,0 +1,203 @@
+"""
+Request Timing Module
+Per-request query counts and timers, reported as Server-Timing and access log lines
+"""
+
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from flask import g, request, session, has_request_context, template_rendered, before_render_template
+from app.utils.metrics import REQUEST_SECONDS, DEPENDENCY_SECONDS
+
+# Server-Timing metric names and descriptions, in header order
+TIMERS = (
+    ('db', 'Database'),
+    ('tpl', 'Template render'),
+    ('smtp', 'SMTP'),
+    ('razorpay', 'Razorpay'),
+)
+
+# Debug mode warns about requests running more queries than this
+QUERY_WARNING_THRESHOLD = int(os.getenv('QUERY_WARNING_THRESHOLD', 20))
+
+# Longest statement text kept for the access log
+MAX_STATEMENT_LENGTH = 200
+
+access_log = logging.getLogger('app.access')
+
+class RequestTimings:
+    """Counters of one request"""
+
+    __slots__ = ('started', 'totals', 'counts', 'slowest', 'slowest_query', 'statements',
+                 'render_depth', 'render_started')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.totals = {}            # timer name -> seconds
+        self.counts = {}            # timer name -> calls
+        self.slowest = 0.0
+        self.slowest_query = None
+        self.statements = {}        # query text -> executions
+        self.render_depth = 0
+        self.render_started = 0.0
+
+    def add(self, name, seconds):
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+def current():
+    """
+    Get the timings of the current request
+
+    Returns:
+        RequestTimings, or None outside a request (CLI jobs, background
+        threads), where nothing is recorded
+    """
+    if not has_request_context():
+        return None
+    return getattr(g, '_timings', None)
+
+def record(name, seconds):
+    """Add a measured duration to the current request's timer"""
+    timings = current()
+    if timings is not None:
+        timings.add(name, seconds)
+
+def record_query(query, seconds):
+    """
+    Count a database statement of the current request
+
+    Args:
+        query: SQL text with placeholders (so repeated lookups of
+            different rows count as the same statement)
+        seconds: Time spent, connecting included
+    """
+    timings = current()
+    if timings is None:
+        return
+
+    timings.add('db', seconds)
+    timings.statements[query] = timings.statements.get(query, 0) + 1
+    if seconds >= timings.slowest:
+        timings.slowest = seconds
+        timings.slowest_query = query
+
+@contextmanager
+def timed(name, operation):
+    """
+    Time a dependency call into the current request's timer and the
+    dependency latency histogram
+
+    Usage:
+        with timed('smtp', 'send'):
+            mail.send(msg)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        DEPENDENCY_SECONDS.observe(elapsed, name, operation)
+        record(name, elapsed)
+
+def _compact(query):
+    """Single-line, length-limited statement text for logs"""
+    text = ' '.join(query.split())
+    if len(text) > MAX_STATEMENT_LENGTH:
+        text = text[:MAX_STATEMENT_LENGTH - 3] + '...'
+    return text
+
+def _ms(seconds):
+    return round(seconds * 1000, 1)
+
+def _start_request():
+    g._timings = RequestTimings()
+
+def _render_started(sender, template, context, **extra):
+    timings = current()
+    if timings is not None:
+        # Only the outermost render is timed, so nested renders
+        # (e.g. emails rendered inside a page) are not counted twice
+        if timings.render_depth == 0:
+            timings.render_started = time.perf_counter()
+        timings.render_depth += 1
+
+def _render_finished(sender, template, context, **extra):
+    timings = current()
+    if timings is not None and timings.render_depth:
+        timings.render_depth -= 1
+        if timings.render_depth == 0:
+            timings.add('tpl', time.perf_counter() - timings.render_started)
+
+def _finish_request(app, response):
+    timings = current()
+    if timings is None:
+        return response
+
+    total = time.perf_counter() - timings.started
+    queries = timings.counts.get('db', 0)
+    REQUEST_SECONDS.observe(total, request.blueprint or '', request.endpoint or 'unmatched',
+                            request.method, str(response.status_code))
+
+    # Streamed bodies (feeds, event streams) are produced after this point
+    # and are not included
+    metrics = []
+    for name, description in TIMERS:
+        if name in timings.totals:
+            desc = f"{queries} queries" if name == 'db' else description
+            metrics.append(f'{name};dur={_ms(timings.totals[name])};desc="{desc}"')
+    metrics.append(f'total;dur={_ms(total)}')
+    response.headers['Server-Timing'] = ', '.join(metrics)
+
+    if access_log.isEnabledFor(logging.INFO):
+        entry = {
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'duration_ms': _ms(total),
+            'user_id': session.get('user_id'),
+            'db_queries': queries,
+        }
+        for name, _ in TIMERS:
+            if name in timings.totals:
+                entry[f'{name}_ms'] = _ms(timings.totals[name])
+        if timings.slowest_query is not None:
+            entry['slowest_query_ms'] = _ms(timings.slowest)
+            entry['slowest_query'] = _compact(timings.slowest_query)
+        access_log.info(json.dumps(entry, default=str))
+
+    if app.debug and queries > QUERY_WARNING_THRESHOLD:
+        statement, repeats = max(timings.statements.items(), key=lambda item: item[1])
+        app.logger.warning(f"{request.method} {request.path} ran {queries} queries "
+                           f"(most repeated, {repeats}x: {_compact(statement)}); "
+                           f"possible N+1 query pattern")
+
+    return response
+
+def init_app(app):
+    """
+    Time every request of an application
+
+    Adds a Server-Timing header (database, template, SMTP and Razorpay
+    time, plus the total) to each response and writes one JSON access
+    log line per request to the 'app.access' logger, on stderr unless
+    ACCESS_LOG=0 or the logger is configured elsewhere.
+    """
+    if not access_log.handlers:
+        if os.getenv('ACCESS_LOG', '1') == '0':
+            access_log.disabled = True
+        else:
+            handler = logging.StreamHandler(sys.stderr)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            access_log.addHandler(handler)
+            access_log.setLevel(logging.INFO)
+            access_log.propagate = False
+
+    app.before_request(_start_request)
+    app.after_request(lambda response: _finish_request(app, response))
+    before_render_template.connect(_render_started, app)
+    template_rendered.connect(_render_finished, app)
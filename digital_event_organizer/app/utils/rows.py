@@ -0,0 +1,113 @@
+"""
+Compact Row Module
+Memory-light row objects used instead of per-row dictionaries
+"""
+
+import keyword
+
+_row_classes = {}
+
+class CompactRow:
+    """
+    Base class for generated row classes
+
+    Values live in __slots__ instead of a per-row dictionary. Rows can be
+    read both as attributes (row.title, as Jinja templates do) and with
+    dictionary syntax (row['title'], row.get('title')), so they can stand
+    in for the dictionaries returned by execute_query in read-only code.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __eq__(self, other):
+        if isinstance(other, CompactRow):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{type(self).__name__}({fields})'
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def keys(self):
+        return list(self.__slots__)
+
+    def values(self):
+        return [getattr(self, name) for name in self.__slots__]
+
+    def items(self):
+        return [(name, getattr(self, name)) for name in self.__slots__]
+
+    def to_dict(self):
+        """Convert to a plain dictionary (e.g. for jsonify)"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+def row_class(columns):
+    """
+    Get (or generate) the row class for a list of column names
+
+    Classes are cached per column tuple, so every row of a result set
+    shares one class.
+
+    Args:
+        columns: Sequence of column names from the cursor
+
+    Returns:
+        CompactRow subclass with one slot per column
+    """
+    columns = tuple(columns)
+    cls = _row_classes.get(columns)
+
+    if cls is None:
+        for name in columns:
+            if not name.isidentifier() or keyword.iskeyword(name) or hasattr(CompactRow, name):
+                raise ValueError(f"Column name {name!r} cannot be used as a row attribute; alias it in SQL")
+        if len(set(columns)) != len(columns):
+            raise ValueError(f"Duplicate column names in {columns}")
+
+        # Unpack the whole tuple in one statement instead of a setattr loop
+        targets = ', '.join(f'self.{name}' for name in columns) or '_'
+        source = f"def __init__(self, values):\n    {targets}, = values\n"
+        namespace = {}
+        exec(source, namespace)
+
+        cls = type('Row', (CompactRow,), {
+            '__slots__': columns,
+            '__init__': namespace['__init__']
+        })
+        _row_classes[columns] = cls
+
+    return cls
+
+def make_rows(columns, tuples):
+    """
+    Wrap result tuples in compact row objects
+
+    Args:
+        columns: Sequence of column names
+        tuples: Iterable of row tuples
+
+    Returns:
+        List of CompactRow instances
+    """
+    cls = row_class(columns)
+    return [cls(values) for values in tuples]
@@ -0,0 +1,187 @@
+"""
+Seat Bitmap Module
+Compact seat availability bitmaps with bit-parallel best-available search
+"""
+
+def row_label(row):
+    """Spreadsheet-style row label: 0 -> A, 25 -> Z, 26 -> AA"""
+    label = ''
+    row += 1
+    while row:
+        row, remainder = divmod(row - 1, 26)
+        label = chr(ord('A') + remainder) + label
+    return label
+
+def _runs(bits, length):
+    """
+    Mark every bit that starts a run of `length` set bits
+
+    Combines shifted copies by doubling, so a run of n costs about
+    2 * log2(n) big-integer operations over the whole hall instead of a
+    loop over seats.
+    """
+    result = bits
+    covered = 1
+    while covered * 2 <= length:
+        result &= result >> covered
+        covered *= 2
+    if covered < length:
+        result &= result >> (length - covered)
+    return result
+
+class SeatBitmap:
+    """
+    Availability of a rows x seats_per_row hall, one bit per seat
+
+    Seat index i is row i // seats_per_row, seat i % seats_per_row; a set
+    bit means the seat is free. The bitmap is a Python int, so block
+    searches run as a few shifts and ANDs over all seats at once, and it
+    is stored as seats / 8 bytes.
+    """
+
+    __slots__ = ('rows', 'seats_per_row', 'bits', '_row_mask')
+
+    def __init__(self, rows, seats_per_row, bits=None):
+        self.rows = rows
+        self.seats_per_row = seats_per_row
+        self._row_mask = (1 << seats_per_row) - 1
+        self.bits = self.full_mask() if bits is None else bits
+
+    @classmethod
+    def from_bytes(cls, rows, seats_per_row, data):
+        """Load a bitmap stored with to_bytes()"""
+        return cls(rows, seats_per_row, int.from_bytes(data, 'little'))
+
+    def to_bytes(self):
+        """Serialize to ceil(seats / 8) bytes"""
+        return self.bits.to_bytes((self.capacity + 7) // 8, 'little')
+
+    @property
+    def capacity(self):
+        return self.rows * self.seats_per_row
+
+    def full_mask(self):
+        return (1 << self.capacity) - 1
+
+    def free_count(self):
+        return self.bits.bit_count() if hasattr(int, 'bit_count') else bin(self.bits).count('1')
+
+    def is_free(self, index):
+        return bool(self.bits >> index & 1)
+
+    def row_bits(self, row):
+        """Free seats of one row as an int (bit 0 = first seat)"""
+        return self.bits >> (row * self.seats_per_row) & self._row_mask
+
+    def label(self, index):
+        """Human-readable seat label, e.g. C12"""
+        row, seat = divmod(index, self.seats_per_row)
+        return f'{row_label(row)}{seat + 1}'
+
+    def parse_label(self, label):
+        """
+        Convert a seat label back to its index
+
+        Returns:
+            Seat index, or None if the label is not a seat of this hall
+        """
+        label = label.strip().upper()
+        letters = len(label) - len(label.lstrip('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+        if not letters or not label[letters:].isdigit():
+            return None
+
+        row = 0
+        for char in label[:letters]:
+            row = row * 26 + ord(char) - ord('A') + 1
+        row -= 1
+        seat = int(label[letters:]) - 1
+
+        if not (0 <= row < self.rows and 0 <= seat < self.seats_per_row):
+            return None
+        return row * self.seats_per_row + seat
+
+    def take(self, indexes):
+        """
+        Mark seats as taken
+
+        Returns:
+            Boolean: False (and no change) if any seat was not free
+        """
+        mask = 0
+        for index in indexes:
+            mask |= 1 << index
+        if self.bits & mask != mask:
+            return False
+        self.bits &= ~mask
+        return True
+
+    def free(self, indexes):
+        """Mark seats as free again"""
+        for index in indexes:
+            self.bits |= 1 << index
+
+    def find_block(self, count):
+        """
+        Find the best free block of adjacent seats in one row
+
+        Rows are tried front to back; within a row the block closest to
+        the centre wins. Candidate starts for the whole hall come from
+        one bit-parallel run search, and the nearest start to the centre
+        of a row is found with two bit scans.
+
+        Args:
+            count: Number of adjacent seats
+
+        Returns:
+            List of seat indexes, or None if no row has such a block
+        """
+        width = self.seats_per_row
+        if count < 1 or count > width or self.bits == 0:
+            return None
+
+        starts = _runs(self.bits, count)
+        # A run may not continue into the next row
+        start_mask = (1 << (width - count + 1)) - 1
+        centre = (width - count) // 2
+
+        for row in range(self.rows):
+            candidates = starts >> (row * width) & start_mask
+            if not candidates:
+                continue
+
+            # Nearest candidate at or left of the centre...
+            left = candidates & ((1 << (centre + 1)) - 1)
+            best = left.bit_length() - 1 if left else None
+            # ...and nearest one right of it
+            right = candidates >> (centre + 1)
+            if right:
+                nearest = centre + 1 + (right & -right).bit_length() - 1
+                if best is None or nearest - centre < centre - best:
+                    best = nearest
+
+            first = row * width + best
+            return list(range(first, first + count))
+
+        return None
+
+    def find_seats(self, count):
+        """
+        Find seats for a party, adjacent if possible
+
+        Falls back to the first free seats front to back when no row has
+        a block of the requested size.
+
+        Returns:
+            List of seat indexes, or None if fewer seats are free
+        """
+        block = self.find_block(count)
+        if block is not None:
+            return block
+
+        seats = []
+        bits = self.bits
+        while bits and len(seats) < count:
+            lowest = bits & -bits
+            seats.append(lowest.bit_length() - 1)
+            bits ^= lowest
+        return seats if len(seats) == count else None
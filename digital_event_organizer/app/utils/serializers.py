@@ -0,0 +1,141 @@
+"""
+Serializers Module
+Fast JSON encoding, field selection and pagination cursors for the API
+"""
+
+import base64
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from flask import Response
+from app.utils.rows import CompactRow
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(value):
+    """Encode the non-JSON types returned by mysql-connector"""
+    if isinstance(value, Decimal):
+        # Strings keep money exact (no float rounding)
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        # TIME columns come back as timedelta
+        seconds = int(value.total_seconds())
+        return f'{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}'
+    if isinstance(value, CompactRow):
+        return value.to_dict()
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode('utf-8')
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(data):
+    """
+    Encode data as compact JSON
+
+    Uses orjson when installed (several times faster on large lists),
+    otherwise the standard library; both produce the same output.
+
+    Args:
+        data: Data to encode
+
+    Returns:
+        UTF-8 encoded JSON bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=_default)
+    return json.dumps(data, default=_default, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def json_response(data, status=200):
+    """
+    Build a JSON response with the fast encoder
+
+    Args:
+        data: Data to encode
+        status: HTTP status code
+
+    Returns:
+        Flask response
+    """
+    return Response(dumps(data), status=status, mimetype='application/json')
+
+def parse_fields(value, allowed, always=()):
+    """
+    Parse a ?fields= parameter
+
+    Args:
+        value: Comma separated field names (empty for all fields)
+        allowed: Iterable of selectable field names
+        always: Fields that are always included (e.g. the ID)
+
+    Returns:
+        List of field names
+
+    Raises:
+        ValueError: If an unknown field is requested
+    """
+    if not value:
+        return list(allowed)
+
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    return list(always) + [name for name in fields if name not in always]
+
+def select_fields(row, fields):
+    """
+    Keep only the requested fields of a row
+
+    Args:
+        row: Row dictionary or compact row
+        fields: List of field names
+
+    Returns:
+        Dictionary
+    """
+    return {name: row[name] for name in fields}
+
+def encode_cursor(values):
+    """
+    Encode keyset values into an opaque cursor token
+
+    Args:
+        values: List of sort key values of the last returned row
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = dumps(list(values))
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(token, size):
+    """
+    Decode a cursor token
+
+    Args:
+        token: Cursor string from a previous response
+        size: Expected number of key values
+
+    Returns:
+        List of key values
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    if not all(isinstance(value, (str, int)) and not isinstance(value, bool) for value in values):
+        raise ValueError("Invalid cursor")
+
+    return values
@@ -0,0 +1,215 @@
+"""
+Static Snapshot Module
+Renders the public event pages to static HTML and JSON for nginx
+"""
+
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import quote
+
+from app.models.event import Event
+
+MANIFEST_FILE = '_manifest.json'
+RELEASES_DIR = 'releases'
+CURRENT_LINK = 'current'
+
+def read_manifest(release_dir):
+    """
+    Read the event versions a release was built from
+
+    Args:
+        release_dir: Release directory
+
+    Returns:
+        Dictionary of event ID (string) -> updated_at (ISO string)
+    """
+    path = os.path.join(release_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+
+    try:
+        with open(path) as f:
+            return json.load(f).get('events', {})
+    except (OSError, ValueError) as e:
+        print(f"Error reading snapshot manifest: {e}")
+        return {}
+
+def _write_file(path, data):
+    """
+    Write a file via a temporary file and rename
+
+    Releases share unchanged files with the previous release through
+    hard links, so files must be replaced, never rewritten in place.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def _to_json(data):
+    """Serialize model rows (dates, times and decimals become strings)"""
+    return json.dumps(data, default=str, separators=(',', ':')).encode('utf-8')
+
+def _is_safe_segment(value):
+    """
+    Check that a category can be used as a directory name
+
+    nginx matches the decoded, normalized request path against the
+    directory, so separators, dot segments ('.', '..' and hidden names)
+    and control characters (NUL included) could never be served.
+    """
+    return (bool(value) and '/' not in value and '\\' not in value
+            and not value.startswith('.')
+            and not any(ord(char) < 32 or ord(char) == 127 for char in value))
+
+def _render(app, release, job):
+    """
+    Render one page to index.html and index.json in its directory
+
+    Args:
+        app: Flask application
+        release: Release directory
+        job: Tuple (url, directory relative to the release, data loader)
+
+    Returns:
+        Error message, or None on success
+    """
+    url, rel_dir, load_data = job
+
+    response = app.test_client().get(url)
+    if response.status_code != 200:
+        return f"{url}: HTTP {response.status_code}"
+
+    with app.app_context():
+        data = load_data()
+    if data is None:
+        return f"{url}: could not load data"
+
+    target = os.path.join(release, rel_dir)
+    _write_file(os.path.join(target, 'index.html'), response.get_data())
+    _write_file(os.path.join(target, 'index.json'), _to_json(data))
+    return None
+
+def publish(out_root, release):
+    """
+    Point the 'current' symlink at a release atomically
+
+    A new link is created next to the old one and renamed over it, so
+    nginx always sees either the old or the new release, never a mix.
+
+    Args:
+        out_root: Snapshot root directory
+        release: Release directory to publish
+    """
+    current = os.path.join(out_root, CURRENT_LINK)
+    tmp_link = current + '.tmp'
+
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(os.path.relpath(release, out_root), tmp_link)
+    os.replace(tmp_link, current)
+
+def _prune(out_root, keep):
+    """Delete old releases, keeping the newest ones and the published one"""
+    releases_dir = os.path.join(out_root, RELEASES_DIR)
+    current = os.path.realpath(os.path.join(out_root, CURRENT_LINK))
+    releases = sorted(os.listdir(releases_dir), reverse=True)
+
+    for name in releases[keep:]:
+        path = os.path.join(releases_dir, name)
+        if os.path.realpath(path) != current:
+            shutil.rmtree(path, ignore_errors=True)
+
+def build_snapshot(app, out_root, workers=8, full=False, keep=3):
+    """
+    Render /events/, every /events/<id> and every category listing
+
+    Each run builds a new release directory. Unless full is set, the
+    previous release is hard-link copied first and only events whose
+    updated_at changed are rendered again; listings are always rendered
+    since any change can affect them. Pages are rendered through the
+    app's own routes by a pool of worker threads, then the release is
+    published by swapping the 'current' symlink.
+
+    Args:
+        app: Flask application
+        out_root: Snapshot root directory (serve <out_root>/current)
+        workers: Number of rendering threads
+        full: Render every event again
+        keep: Number of releases to keep on disk
+
+    Returns:
+        Dictionary with snapshot statistics, or None on failure
+    """
+    started = time.monotonic()
+
+    with app.app_context():
+        versions = Event.get_event_versions()
+    if versions is None:
+        return None
+
+    releases_dir = os.path.join(out_root, RELEASES_DIR)
+    os.makedirs(releases_dir, exist_ok=True)
+
+    current = os.path.join(out_root, CURRENT_LINK)
+    previous = os.path.realpath(current) if os.path.islink(current) else None
+    old_manifest = {} if full or previous is None else read_manifest(previous)
+
+    release = os.path.join(releases_dir, datetime.now().strftime('%Y%m%d%H%M%S%f'))
+    if old_manifest:
+        shutil.copytree(previous, release, copy_function=os.link)
+    else:
+        os.makedirs(release)
+
+    manifest = {str(row['event_id']): row['updated_at'].isoformat() for row in versions}
+    changed = [event_id for event_id, version in manifest.items()
+               if old_manifest.get(event_id) != version]
+    removed = [event_id for event_id in old_manifest if event_id not in manifest]
+
+    for event_id in removed:
+        shutil.rmtree(os.path.join(release, 'events', event_id), ignore_errors=True)
+
+    # Categories are few and cheap to render, so they are rebuilt each run
+    shutil.rmtree(os.path.join(release, 'events', 'category'), ignore_errors=True)
+    categories = sorted({row['category'] for row in versions if _is_safe_segment(row['category'])})
+
+    jobs = [('/events/', 'events', Event.get_upcoming_events)]
+    for category in categories:
+        # Quoted so '#', '?' and '&' reach the route as part of the category
+        jobs.append((f"/events/category/{quote(category, safe='')}",
+                     os.path.join('events', 'category', category),
+                     lambda category=category: Event.get_events_by_category(category)))
+    for event_id in changed:
+        jobs.append((f'/events/{event_id}', os.path.join('events', event_id),
+                     lambda event_id=event_id: Event.get_event_by_id(event_id)))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        errors = [error for error in pool.map(lambda job: _render(app, release, job), jobs) if error]
+
+    if errors:
+        for error in errors:
+            print(f"Snapshot error: {error}")
+        shutil.rmtree(release, ignore_errors=True)
+        return None
+
+    _write_file(os.path.join(release, MANIFEST_FILE), json.dumps({
+        'events': manifest,
+        'built_at': datetime.now().isoformat(timespec='seconds')
+    }).encode('utf-8'))
+
+    publish(out_root, release)
+    _prune(out_root, keep)
+
+    return {
+        'release': os.path.basename(release),
+        'pages': len(jobs),
+        'events_rendered': len(changed),
+        'events_reused': len(manifest) - len(changed),
+        'events_removed': len(removed),
+        'seconds': round(time.monotonic() - started, 2)
+    }
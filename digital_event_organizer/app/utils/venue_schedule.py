@@ -0,0 +1,228 @@
+"""
+Venue Schedule Module
+In-memory per-venue interval index used to detect double bookings
+"""
+
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+
+def venue_key(venue):
+    """Normalize a venue name so 'Main  Auditorium' and 'main auditorium' match"""
+    return ' '.join((venue or '').split()).casefold()
+
+class VenueIntervals:
+    """
+    Bookings of one venue sorted by start time
+
+    Besides the sorted starts, the index keeps the longest booking
+    length. Any booking overlapping [start, end) must then start in
+    (start - longest, end), so a query is two bisections plus a check of
+    the bookings in that window instead of a scan of the venue.
+    """
+
+    __slots__ = ('keys', 'bookings', 'longest')
+
+    def __init__(self):
+        self.keys = []          # sorted (starts_at, event_id)
+        self.bookings = []      # booking dictionaries, same order as keys
+        self.longest = timedelta(0)
+
+    def add(self, booking):
+        key = (booking['starts_at'], booking['event_id'])
+        index = bisect_left(self.keys, key)
+        self.keys.insert(index, key)
+        self.bookings.insert(index, booking)
+        self.longest = max(self.longest, booking['ends_at'] - booking['starts_at'])
+
+    def remove(self, booking):
+        index = bisect_left(self.keys, (booking['starts_at'], booking['event_id']))
+        if index < len(self.keys) and self.keys[index][1] == booking['event_id']:
+            del self.keys[index]
+            del self.bookings[index]
+
+    def overlapping(self, starts_at, ends_at, exclude_id=None):
+        """
+        Get bookings overlapping [starts_at, ends_at)
+
+        Returns:
+            List of booking dictionaries in start order
+        """
+        low = bisect_right(self.keys, (starts_at - self.longest, float('inf')))
+        high = bisect_left(self.keys, (ends_at, -1))
+        return [booking for booking in self.bookings[low:high]
+                if booking['ends_at'] > starts_at and booking['event_id'] != exclude_id]
+
+class VenueSchedule:
+    """
+    Interval index of all event bookings, grouped by venue
+
+    Built lazily from the database on first use and kept current by the
+    event write paths. Because other worker processes write too, the
+    index is rebuilt once it is older than max_age seconds.
+    """
+
+    def __init__(self, loader, max_age=300, range_loader=None):
+        """
+        Args:
+            loader: Callable returning rows with event_id, title, venue,
+                starts_at and duration_minutes (None on error)
+            max_age: Seconds before the index is rebuilt from the database
+            range_loader: Callable(start, end) returning the same rows for
+                bookings that may overlap [start, end), used to verify a
+                slot the index reports as free (None on error)
+        """
+        self._loader = loader
+        self._range_loader = range_loader
+        self._max_age = max_age
+        self._venues = {}       # venue key -> VenueIntervals
+        self._by_event = {}     # event_id -> booking
+        self._built_at = None
+        self._lock = threading.RLock()
+
+    def rebuild(self):
+        """
+        Reload every booking from the database
+
+        Returns:
+            Boolean: True if the index was rebuilt
+        """
+        rows = self._loader()
+        if rows is None:
+            return False
+
+        venues = {}
+        by_event = {}
+        for row in sorted(rows, key=lambda row: (row['starts_at'], row['event_id'])):
+            booking = self._booking(row['event_id'], row['title'], row['venue'],
+                                    row['starts_at'], row['duration_minutes'])
+            venues.setdefault(venue_key(row['venue']), VenueIntervals()).add(booking)
+            by_event[row['event_id']] = booking
+
+        with self._lock:
+            self._venues = venues
+            self._by_event = by_event
+            self._built_at = time.monotonic()
+        return True
+
+    def upsert(self, event_id, title, venue, starts_at, duration_minutes):
+        """Add or move an event's booking after a write"""
+        with self._lock:
+            if self._built_at is None:
+                return
+            self._remove(event_id)
+            booking = self._booking(event_id, title, venue, starts_at, duration_minutes)
+            self._venues.setdefault(venue_key(venue), VenueIntervals()).add(booking)
+            self._by_event[event_id] = booking
+
+    def remove(self, event_id):
+        """Drop an event's booking after a delete"""
+        with self._lock:
+            self._remove(event_id)
+
+    def invalidate(self):
+        """Force a rebuild on next use"""
+        with self._lock:
+            self._built_at = None
+
+    def find_conflicts(self, venue, starts_at, duration_minutes, exclude_id=None, verify=False):
+        """
+        Find bookings of a venue that overlap a proposed time slot
+
+        Args:
+            venue: Venue name
+            starts_at: Proposed start (datetime)
+            duration_minutes: Proposed length in minutes
+            exclude_id: Event being edited (ignored in the check)
+            verify: Confirm a free slot against the database, since the
+                index can miss a booking another worker just made (use
+                before a write, under a lock on the venue)
+
+        Returns:
+            List of conflicting booking dictionaries, or None if the
+            index could not be built (callers must then refuse the
+            booking rather than assume the slot is free)
+        """
+        if not self._ensure_built():
+            return None
+
+        ends_at = starts_at + timedelta(minutes=duration_minutes)
+        with self._lock:
+            intervals = self._venues.get(venue_key(venue))
+            conflicts = [] if intervals is None else intervals.overlapping(starts_at, ends_at, exclude_id)
+
+        if conflicts or not verify or self._range_loader is None:
+            return conflicts
+
+        rows = self._range_loader(starts_at, ends_at)
+        if rows is None:
+            return None
+        intervals = VenueIntervals()
+        for row in sorted(rows, key=lambda row: (row['starts_at'], row['event_id'])):
+            if venue_key(row['venue']) == venue_key(venue):
+                intervals.add(self._booking(row['event_id'], row['title'], row['venue'],
+                                            row['starts_at'], row['duration_minutes']))
+        return intervals.overlapping(starts_at, ends_at, exclude_id)
+
+    def find_all_conflicts(self, start=None, end=None):
+        """
+        Find every pair of overlapping bookings
+
+        Sweeps each venue's bookings in start order, comparing a booking
+        only with the ones that start before it ends, so the cost is the
+        number of bookings plus the number of conflicts.
+
+        Args:
+            start: Only bookings ending after this datetime (optional)
+            end: Only bookings starting before this datetime (optional)
+
+        Returns:
+            List of (booking, booking) tuples ordered by venue and time,
+            or None if the index could not be built
+        """
+        if not self._ensure_built():
+            return None
+
+        with self._lock:
+            venues = [list(intervals.bookings) for intervals in self._venues.values()]
+
+        conflicts = []
+        for bookings in venues:
+            if start is not None or end is not None:
+                bookings = [booking for booking in bookings
+                            if (start is None or booking['ends_at'] > start)
+                            and (end is None or booking['starts_at'] < end)]
+
+            for i, first in enumerate(bookings):
+                for j in range(i + 1, len(bookings)):
+                    second = bookings[j]
+                    if second['starts_at'] >= first['ends_at']:
+                        break
+                    conflicts.append((first, second))
+
+        conflicts.sort(key=lambda pair: (venue_key(pair[0]['venue']), pair[0]['starts_at']))
+        return conflicts
+
+    def _ensure_built(self):
+        with self._lock:
+            fresh = (self._built_at is not None
+                     and time.monotonic() - self._built_at < self._max_age)
+        return fresh or self.rebuild()
+
+    def _remove(self, event_id):
+        booking = self._by_event.pop(event_id, None)
+        if booking is not None:
+            intervals = self._venues.get(venue_key(booking['venue']))
+            if intervals is not None:
+                intervals.remove(booking)
+
+    @staticmethod
+    def _booking(event_id, title, venue, starts_at, duration_minutes):
+        return {
+            'event_id': event_id,
+            'title': title,
+            'venue': venue,
+            'starts_at': starts_at,
+            'ends_at': starts_at + timedelta(minutes=duration_minutes)
+        }
@@ -0,0 +1,190 @@
+"""
+Waitlist Index Module
+In-memory FIFO waitlist positions backed by Fenwick (binary indexed) trees
+"""
+
+import threading
+import time
+
+class FenwickTree:
+    """
+    Prefix sums over a growable array of integers
+
+    add() and prefix_sum() are O(log n); append() is amortized O(1)
+    because the tree is rebuilt (in O(n)) only when capacity doubles.
+    """
+
+    __slots__ = ('_values', '_tree', '_capacity')
+
+    def __init__(self, values=()):
+        self._values = list(values)
+        self._capacity = 0
+        self._tree = [0]
+        self._rebuild(max(len(self._values), 16))
+
+    def __len__(self):
+        return len(self._values)
+
+    def append(self, value):
+        """Add a value at the end, returning its (1-based) index"""
+        self._values.append(value)
+        if len(self._values) > self._capacity:
+            self._rebuild(self._capacity * 2)
+        else:
+            self._add(len(self._values), value)
+        return len(self._values)
+
+    def add(self, index, delta):
+        """Add delta to the value at a 1-based index"""
+        self._values[index - 1] += delta
+        self._add(index, delta)
+
+    def prefix_sum(self, index):
+        """Sum of the values at indexes 1..index"""
+        total = 0
+        while index > 0:
+            total += self._tree[index]
+            index -= index & -index
+        return total
+
+    def total(self):
+        """Sum of all values"""
+        return self.prefix_sum(len(self._values))
+
+    def _add(self, index, delta):
+        while index <= self._capacity:
+            self._tree[index] += delta
+            index += index & -index
+
+    def _rebuild(self, capacity):
+        """Build the tree in O(n) for a new capacity"""
+        self._capacity = capacity
+        tree = [0] * (capacity + 1)
+        tree[1:len(self._values) + 1] = self._values
+        # Push every node into its parent, including the empty tail, so
+        # later appends find complete partial sums
+        for i in range(1, capacity + 1):
+            parent = i + (i & -i)
+            if parent <= capacity:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+class WaitlistQueue:
+    """
+    Waiting users of one event in join order
+
+    Every user who joined gets a slot holding 1 while they wait and 0
+    once they leave or are promoted; a user's position is the prefix sum
+    up to their slot.
+    """
+
+    __slots__ = ('slots', 'last_id', 'tree', 'loaded_at')
+
+    def __init__(self, rows):
+        self.slots = {}         # user_id -> 1-based slot
+        self.last_id = 0
+        self.tree = FenwickTree([1] * len(rows))
+        for slot, row in enumerate(rows, start=1):
+            self.slots[row['user_id']] = slot
+            self.last_id = row['waitlist_id']
+        self.loaded_at = time.monotonic()
+
+    def position(self, user_id):
+        slot = self.slots.get(user_id)
+        if slot is None:
+            return None
+        return self.tree.prefix_sum(slot)
+
+    def join(self, waitlist_id, user_id):
+        """Append a user; returns False if the order can't be kept locally"""
+        if waitlist_id <= self.last_id:
+            return False
+        self.remove(user_id)
+        self.slots[user_id] = self.tree.append(1)
+        self.last_id = waitlist_id
+        return True
+
+    def remove(self, user_id):
+        slot = self.slots.pop(user_id, None)
+        if slot is not None:
+            self.tree.add(slot, -1)
+
+class WaitlistIndex:
+    """
+    Waitlist positions for all events, loaded lazily per event
+
+    Position lookups are O(log n). Each event's queue is reloaded from
+    the database once it is older than max_age seconds, so joins and
+    promotions made by other worker processes are picked up.
+    """
+
+    def __init__(self, loader, max_age=60):
+        """
+        Args:
+            loader: Callable(event_id) returning waiting rows (waitlist_id,
+                user_id) in join order, or None on error
+            max_age: Seconds before an event's queue is reloaded
+        """
+        self._loader = loader
+        self._max_age = max_age
+        self._queues = {}
+        self._lock = threading.RLock()
+
+    def position(self, event_id, user_id):
+        """
+        Get a user's 1-based position in an event's waitlist
+
+        Returns:
+            Position, or None if the user is not waiting
+        """
+        queue = self._queue(event_id)
+        if queue is None:
+            return None
+        with self._lock:
+            return queue.position(user_id)
+
+    def length(self, event_id):
+        """Number of users waiting for an event"""
+        queue = self._queue(event_id)
+        if queue is None:
+            return 0
+        with self._lock:
+            return queue.tree.total()
+
+    def joined(self, event_id, waitlist_id, user_id):
+        """Record a join made by this process"""
+        with self._lock:
+            queue = self._queues.get(event_id)
+            if queue is not None and not queue.join(waitlist_id, user_id):
+                del self._queues[event_id]
+
+    def removed(self, event_id, user_ids):
+        """Record users that left or were promoted"""
+        with self._lock:
+            queue = self._queues.get(event_id)
+            if queue is not None:
+                for user_id in user_ids:
+                    queue.remove(user_id)
+
+    def invalidate(self, event_id=None):
+        """Force a reload of one event (or all events) on next use"""
+        with self._lock:
+            if event_id is None:
+                self._queues.clear()
+            else:
+                self._queues.pop(event_id, None)
+
+    def _queue(self, event_id):
+        with self._lock:
+            queue = self._queues.get(event_id)
+            if queue is not None and time.monotonic() - queue.loaded_at < self._max_age:
+                return queue
+
+        rows = self._loader(event_id)
+        if rows is None:
+            return None
+
+        queue = WaitlistQueue(rows)
+        with self._lock:
+            self._queues[event_id] = queue
+        return queue
@@ -0,0 +1,56 @@
+"""
+Check-in Throughput Benchmark
+Measures gate scans per second: signature check plus in-memory check-in
+
+Run from the project folder:
+    python benchmarks/checkin_throughput.py [attendees]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.checkin_buffer import CheckinBuffer
+from app.utils.tickets import TicketSigner
+
+EVENT_ID = 1
+
+def measure(label, scan, tokens):
+    start = time.perf_counter()
+    for token in tokens:
+        scan(token)
+    seconds = time.perf_counter() - start
+    print(f"{label:<26} {len(tokens) / seconds:12,.0f} scans/s  {seconds / len(tokens) * 1e6:6.1f} us/scan")
+
+def main():
+    attendees = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    signer = TicketSigner('benchmark-secret')
+    tokens = [signer.sign(registration_id, EVENT_ID, registration_id + 10)
+              for registration_id in range(1, attendees + 1)]
+
+    written = []
+    def writer(rows):
+        written.extend(rows)
+        return len(rows)
+
+    # Large interval: flushes come from batch_size, as under a real rush
+    buffer = CheckinBuffer(writer, lambda event_id: ({}, set()), batch_size=200, flush_interval=60)
+
+    def scan(token):
+        registration_id, event_id, user_id = signer.verify(token)
+        return buffer.record(registration_id, event_id, user_id, 'A')
+
+    print(f"{attendees} tickets of {len(tokens[0])} characters")
+    measure('verify only', signer.verify, tokens)
+    measure('verify + check in', scan, tokens)
+    measure('verify + duplicate', scan, tokens)
+    measure('forged token', signer.verify, [token[:-2] + 'AA' for token in tokens])
+
+    buffer.flush()
+    assert len(written) == attendees
+    print(f"{len(written)} check-ins written")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Row Memory Benchmark
+Compares dictionary rows with compact rows for a large listing
+
+Run from the project folder:
+    python benchmarks/row_memory.py [row_count]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date, time as dtime, datetime
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jinja2 import Template
+from app.utils.rows import make_rows
+
+COLUMNS = ['event_id', 'title', 'description', 'event_date', 'event_time', 'venue',
+           'category', 'price', 'is_paid', 'max_participants', 'current_participants',
+           'registration_deadline', 'image_url', 'created_by', 'created_at', 'updated_at']
+
+LISTING = Template(
+    "{% for event in events %}"
+    "<tr><td>{{ event.event_id }}</td><td>{{ event.title }}</td>"
+    "<td>{{ event.event_date }}</td><td>{{ event.venue }}</td>"
+    "<td>{{ event.current_participants }}/{{ event.max_participants }}</td></tr>"
+    "{% endfor %}"
+)
+
+def fake_tuples(count):
+    """Generate rows shaped like SELECT * FROM events"""
+    now = datetime.now()
+    return [
+        (i, f'Event {i}', 'Lorem ipsum dolor sit amet', date(2026, 3, 1 + i % 28),
+         dtime(10, 0), 'Main Auditorium', 'Technology', Decimal('250.00'), 1, 200,
+         i % 200, date(2026, 2, 25), None, 1, now, now)
+        for i in range(count)
+    ]
+
+def measure(label, build):
+    """Measure memory held by the built rows and the time to render them"""
+    tracemalloc.start()
+    rows = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    LISTING.render(events=rows)
+    render_seconds = time.perf_counter() - started
+
+    print(f"{label:<14} {size / 1024 / 1024:8.1f} MB  {size / len(rows):7.0f} B/row  "
+          f"render {render_seconds:6.2f}s")
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    tuples = fake_tuples(count)
+    print(f"{count} rows x {len(COLUMNS)} columns (row values shared, containers measured)")
+
+    measure('dict rows', lambda: [dict(zip(COLUMNS, values)) for values in tuples])
+    measure('compact rows', lambda: make_rows(COLUMNS, tuples))
+
+if __name__ == '__main__':
+    main()
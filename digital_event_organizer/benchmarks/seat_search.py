@@ -0,0 +1,58 @@
+"""
+Seat Search Benchmark
+Times best-available block search on a seat bitmap against a per-seat scan
+
+Run from the project folder:
+    python benchmarks/seat_search.py [rows] [seats_per_row] [block]
+"""
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.seat_bitmap import SeatBitmap
+
+def naive_block(seats, rows, width, count):
+    """Per-seat scan with the same preference order as SeatBitmap.find_block"""
+    centre = (width - count) // 2
+    for row in range(rows):
+        best = None
+        run = 0
+        for seat in range(width):
+            run = run + 1 if seats[row * width + seat] else 0
+            if run >= count:
+                start = seat - count + 1
+                if best is None or abs(start - centre) < abs(best - centre):
+                    best = start
+        if best is not None:
+            return list(range(row * width + best, row * width + best + count))
+    return None
+
+def measure(label, search, number):
+    seconds = min(timeit.repeat(search, number=number, repeat=5)) / number
+    print(f"{label:<22} {seconds * 1e6:10.1f} us")
+    return search()
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    count = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    random.seed(42)
+
+    print(f"{rows} x {width} = {rows * width} seats, block of {count}")
+    for occupancy in (0.5, 0.8, 0.95):
+        bitmap = SeatBitmap(rows, width)
+        bitmap.take([index for index in range(bitmap.capacity) if random.random() < occupancy])
+        seats = [bitmap.is_free(index) for index in range(bitmap.capacity)]
+
+        print(f"-- {occupancy:.0%} taken, {bitmap.free_count()} free, "
+              f"{len(bitmap.to_bytes())} bytes stored")
+        fast = measure('bitmap find_block', lambda: bitmap.find_block(count), 2000)
+        slow = measure('per-seat scan', lambda: naive_block(seats, rows, width, count), 20)
+        assert fast == slow
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Sync Snapshot Benchmark
+Size and encode/decode time of offline scanner snapshots
+
+Run from the project folder:
+    python benchmarks/sync_snapshot.py [attendees]
+"""
+
+import json
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.id_codec import encode_ids, decode_ids
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<28} {(time.perf_counter() - start) * 1000:8.1f} ms")
+    return result
+
+def main():
+    attendees = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    random.seed(42)
+
+    # Registration IDs of one event interleave with other events' IDs
+    ids = sorted(random.sample(range(1, attendees * 3), attendees))
+    revoked = random.sample(ids, attendees // 50)
+
+    print(f"{attendees} confirmed registrations, {len(revoked)} revoked")
+    encoded = timed('encode valid IDs', lambda: encode_ids(ids))
+    decoded = timed('decode valid IDs', lambda: decode_ids(encoded))
+    assert decoded == ids
+    valid = timed('build device lookup set', lambda: set(decoded))
+    timed(f'{attendees} lookups', lambda: sum(1 for value in ids if value in valid))
+
+    # Bloom filter bits for a 1% false positive rate: -n ln(p) / ln(2)^2
+    bloom = math.ceil(-attendees * math.log(0.01) / math.log(2) ** 2 / 8)
+    print(f"{'delta-varint (base64)':<28} {len(encoded) / 1024:8.1f} KB")
+    print(f"{'JSON array':<28} {len(json.dumps(ids)) / 1024:8.1f} KB")
+    print(f"{'uint32 array':<28} {attendees * 4 / 1024:8.1f} KB")
+    print(f"{'bloom filter, 1% false +':<28} {bloom / 1024:8.1f} KB")
+    print(f"{'revocation list':<28} {len(encode_ids(revoked)) / 1024:8.1f} KB")
+
+if __name__ == '__main__':
+    main()
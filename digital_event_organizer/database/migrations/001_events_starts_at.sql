@@ -0,0 +1,10 @@
+-- ============================================
+-- Migration 001: indexed event start time
+-- Adds a stored generated column combining event_date and event_time
+-- so calendar range queries can use an index
+-- ============================================
+USE digital_event_organizer;
+
+ALTER TABLE events
+    ADD COLUMN starts_at DATETIME AS (TIMESTAMP(event_date, event_time)) STORED,
+    ADD INDEX idx_starts_at (starts_at);
@@ -0,0 +1,8 @@
+-- ============================================
+-- Migration 002: event duration
+-- Events get a length so venue bookings can be checked for overlaps
+-- ============================================
+USE digital_event_organizer;
+
+ALTER TABLE events
+    ADD COLUMN duration_minutes INT NOT NULL DEFAULT 120 AFTER event_time;
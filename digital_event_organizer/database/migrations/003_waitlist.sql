@@ -0,0 +1,19 @@
+-- ============================================
+-- Migration 003: event waitlist
+-- Users queue for full events and are promoted when seats free up
+-- ============================================
+USE digital_event_organizer;
+
+CREATE TABLE waitlist (
+    waitlist_id INT PRIMARY KEY AUTO_INCREMENT,
+    event_id INT NOT NULL,
+    user_id INT NOT NULL,
+    status ENUM('waiting', 'promoted', 'left') DEFAULT 'waiting',
+    joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    promoted_at TIMESTAMP NULL,
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+    FOREIGN KEY (event_id) REFERENCES events(event_id) ON DELETE CASCADE,
+    UNIQUE KEY unique_waitlist (event_id, user_id),
+    INDEX idx_event_queue (event_id, status, waitlist_id),
+    INDEX idx_user_id (user_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -0,0 +1,21 @@
+-- ============================================
+-- Migration 004: group registrations
+-- A leader registers a team in one transaction; members share a group_id
+-- ============================================
+USE digital_event_organizer;
+
+CREATE TABLE registration_groups (
+    group_id INT PRIMARY KEY AUTO_INCREMENT,
+    event_id INT NOT NULL,
+    leader_id INT NOT NULL,
+    size INT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (event_id) REFERENCES events(event_id) ON DELETE CASCADE,
+    FOREIGN KEY (leader_id) REFERENCES users(user_id) ON DELETE CASCADE,
+    INDEX idx_event_id (event_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+ALTER TABLE registrations
+    ADD COLUMN group_id INT NULL AFTER event_id,
+    ADD FOREIGN KEY (group_id) REFERENCES registration_groups(group_id) ON DELETE SET NULL,
+    ADD INDEX idx_group_id (group_id);
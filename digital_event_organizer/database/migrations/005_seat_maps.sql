@@ -0,0 +1,31 @@
+-- ============================================
+-- Migration 005: reserved seating
+-- Per-event seat availability bitmaps and seat assignments
+-- ============================================
+USE digital_event_organizer;
+
+CREATE TABLE seat_maps (
+    event_id INT PRIMARY KEY,
+    seat_rows INT NOT NULL,
+    seats_per_row INT NOT NULL,
+    availability BLOB NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (event_id) REFERENCES events(event_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- ============================================
+-- Table: seat_assignments
+-- Seats held (payment pending) or confirmed for a registration
+-- ============================================
+CREATE TABLE seat_assignments (
+    event_id INT NOT NULL,
+    seat_index INT NOT NULL,
+    seat_label VARCHAR(10) NOT NULL,
+    registration_id INT NOT NULL,
+    status ENUM('held', 'confirmed') DEFAULT 'held',
+    assigned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (event_id, seat_index),
+    FOREIGN KEY (event_id) REFERENCES events(event_id) ON DELETE CASCADE,
+    FOREIGN KEY (registration_id) REFERENCES registrations(registration_id) ON DELETE CASCADE,
+    INDEX idx_registration_id (registration_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -0,0 +1,19 @@
+-- ============================================
+-- Migration 006: ticket check-in
+-- Gate check-ins of ticket holders (one per registration)
+-- ============================================
+USE digital_event_organizer;
+
+CREATE TABLE checkins (
+    checkin_id INT PRIMARY KEY AUTO_INCREMENT,
+    registration_id INT NOT NULL,
+    event_id INT NOT NULL,
+    user_id INT NOT NULL,
+    checked_in_at DATETIME NOT NULL,
+    gate VARCHAR(50),
+    FOREIGN KEY (registration_id) REFERENCES registrations(registration_id) ON DELETE CASCADE,
+    FOREIGN KEY (event_id) REFERENCES events(event_id) ON DELETE CASCADE,
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+    UNIQUE KEY unique_checkin (registration_id),
+    INDEX idx_event_checked_in (event_id, checked_in_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
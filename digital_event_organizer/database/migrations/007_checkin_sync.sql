@@ -0,0 +1,13 @@
+-- ============================================
+-- Migration 007: offline check-in sync
+-- Change times so scanners can download only what changed
+-- ============================================
+USE digital_event_organizer;
+
+ALTER TABLE registrations
+    ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP AFTER payment_required,
+    ADD INDEX idx_event_updated (event_id, updated_at);
+
+ALTER TABLE checkins
+    ADD COLUMN synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP AFTER gate,
+    ADD INDEX idx_event_synced (event_id, synced_at);
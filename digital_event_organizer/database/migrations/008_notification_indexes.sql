@@ -0,0 +1,9 @@
+-- ============================================
+-- Migration 008: notification feed indexes
+-- Unread counts and "already reminded" checks read only one user's rows
+-- ============================================
+USE digital_event_organizer;
+
+ALTER TABLE notifications
+    ADD INDEX idx_user_unread (user_id, is_read),
+    ADD INDEX idx_user_event_type (user_id, event_id, notification_type);
@@ -0,0 +1,15 @@
+-- ============================================
+-- Migration 009: change outbox
+-- Every worker tails this table to evict caches after writes made by
+-- other workers; prune it with `flask prune-changes`
+-- ============================================
+USE digital_event_organizer;
+
+CREATE TABLE change_outbox (
+    change_id BIGINT PRIMARY KEY AUTO_INCREMENT,
+    entity VARCHAR(32) NOT NULL,
+    entity_id INT,
+    origin VARCHAR(64) NOT NULL,
+    created_at TIMESTAMP(3) DEFAULT CURRENT_TIMESTAMP(3),
+    INDEX idx_created_at (created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -0,0 +1,13 @@
+-- ============================================
+-- Migration 010: analytics export change times
+-- Lets `flask export-analytics` find registrations and payments that
+-- changed since the previous export
+-- ============================================
+USE digital_event_organizer;
+
+ALTER TABLE registrations
+    ADD INDEX idx_updated_at (updated_at);
+
+ALTER TABLE payments
+    ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP AFTER payment_date,
+    ADD INDEX idx_updated_at (updated_at);
@@ -32,6 +32,7 @@ CREATE TABLE events (
     description TEXT,
     event_date DATE NOT NULL,
     event_time TIME NOT NULL,
+    duration_minutes INT NOT NULL DEFAULT 120,
     venue VARCHAR(255) NOT NULL,
     category VARCHAR(50),
     price DECIMAL(10, 2) DEFAULT 0.00,
@@ -43,12 +44,29 @@ CREATE TABLE events (
     created_by INT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    starts_at DATETIME AS (TIMESTAMP(event_date, event_time)) STORED,
     FOREIGN KEY (created_by) REFERENCES users(user_id) ON DELETE SET NULL,
     INDEX idx_event_date (event_date),
+    INDEX idx_starts_at (starts_at),
     INDEX idx_category (category),
     INDEX idx_is_paid (is_paid)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
+-- ============================================
+-- Table: registration_groups
+-- Teams registered together by one leader
+-- ============================================
+CREATE TABLE registration_groups (
+    group_id INT PRIMARY KEY AUTO_INCREMENT,
+    event_id INT NOT NULL,
+    leader_id INT NOT NULL,
+    size INT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (event_id) REFERENCES events(event_id) ON DELETE CASCADE,
+    FOREIGN KEY (leader_id) REFERENCES users(user_id) ON DELETE CASCADE,
+    INDEX idx_event_id (event_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
 -- ============================================
 -- Table: registrations
 -- Stores event registrations
@@ -57,15 +75,89 @@ CREATE TABLE registrations (
     registration_id INT PRIMARY KEY AUTO_INCREMENT,
     user_id INT NOT NULL,
     event_id INT NOT NULL,
+    group_id INT NULL,
     registration_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     status ENUM('pending', 'confirmed', 'cancelled') DEFAULT 'pending',
     payment_required BOOLEAN DEFAULT FALSE,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
     FOREIGN KEY (event_id) REFERENCES events(event_id) ON DELETE CASCADE,
+    FOREIGN KEY (group_id) REFERENCES registration_groups(group_id) ON DELETE SET NULL,
     UNIQUE KEY unique_registration (user_id, event_id),
     INDEX idx_user_id (user_id),
     INDEX idx_event_id (event_id),
-    INDEX idx_status (status)
+    INDEX idx_group_id (group_id),
+    INDEX idx_status (status),
+    INDEX idx_event_updated (event_id, updated_at),
+    INDEX idx_updated_at (updated_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- ============================================
+-- Table: waitlist
+-- Users waiting for a seat at a full event (FIFO by waitlist_id)
+-- ============================================
+CREATE TABLE waitlist (
+    waitlist_id INT PRIMARY KEY AUTO_INCREMENT,
+    event_id INT NOT NULL,
+    user_id INT NOT NULL,
+    status ENUM('waiting', 'promoted', 'left') DEFAULT 'waiting',
+    joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    promoted_at TIMESTAMP NULL,
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+    FOREIGN KEY (event_id) REFERENCES events(event_id) ON DELETE CASCADE,
+    UNIQUE KEY unique_waitlist (event_id, user_id),
+    INDEX idx_event_queue (event_id, status, waitlist_id),
+    INDEX idx_user_id (user_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- ============================================
+-- Table: seat_maps
+-- Reserved seating: one availability bitmap per event (bit set = free)
+-- ============================================
+CREATE TABLE seat_maps (
+    event_id INT PRIMARY KEY,
+    seat_rows INT NOT NULL,
+    seats_per_row INT NOT NULL,
+    availability BLOB NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (event_id) REFERENCES events(event_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- ============================================
+-- Table: seat_assignments
+-- Seats held (payment pending) or confirmed for a registration
+-- ============================================
+CREATE TABLE seat_assignments (
+    event_id INT NOT NULL,
+    seat_index INT NOT NULL,
+    seat_label VARCHAR(10) NOT NULL,
+    registration_id INT NOT NULL,
+    status ENUM('held', 'confirmed') DEFAULT 'held',
+    assigned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (event_id, seat_index),
+    FOREIGN KEY (event_id) REFERENCES events(event_id) ON DELETE CASCADE,
+    FOREIGN KEY (registration_id) REFERENCES registrations(registration_id) ON DELETE CASCADE,
+    INDEX idx_registration_id (registration_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- ============================================
+-- Table: checkins
+-- Gate check-ins of ticket holders (one per registration)
+-- ============================================
+CREATE TABLE checkins (
+    checkin_id INT PRIMARY KEY AUTO_INCREMENT,
+    registration_id INT NOT NULL,
+    event_id INT NOT NULL,
+    user_id INT NOT NULL,
+    checked_in_at DATETIME NOT NULL,
+    gate VARCHAR(50),
+    synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (registration_id) REFERENCES registrations(registration_id) ON DELETE CASCADE,
+    FOREIGN KEY (event_id) REFERENCES events(event_id) ON DELETE CASCADE,
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+    UNIQUE KEY unique_checkin (registration_id),
+    INDEX idx_event_checked_in (event_id, checked_in_at),
+    INDEX idx_event_synced (event_id, synced_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
 -- ============================================
@@ -82,18 +174,20 @@ CREATE TABLE payments (
     transaction_id VARCHAR(100) UNIQUE,
     payment_method VARCHAR(50),
     payment_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (registration_id) REFERENCES registrations(registration_id) ON DELETE CASCADE,
     FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
     FOREIGN KEY (event_id) REFERENCES events(event_id) ON DELETE CASCADE,
     INDEX idx_payment_status (payment_status),
     INDEX idx_transaction_id (transaction_id),
     INDEX idx_user_id (user_id),
-    INDEX idx_event_id (event_id)
+    INDEX idx_event_id (event_id),
+    INDEX idx_updated_at (updated_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
 -- ============================================
--- Table: notifications (Optional)
--- Stores user notifications
+-- Table: notifications
+-- In-app notification feed
 -- ============================================
 CREATE TABLE notifications (
     notification_id INT PRIMARY KEY AUTO_INCREMENT,
@@ -106,7 +200,22 @@ CREATE TABLE notifications (
     FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
     FOREIGN KEY (event_id) REFERENCES events(event_id) ON DELETE SET NULL,
     INDEX idx_user_id (user_id),
-    INDEX idx_is_read (is_read)
+    INDEX idx_is_read (is_read),
+    INDEX idx_user_unread (user_id, is_read),
+    INDEX idx_user_event_type (user_id, event_id, notification_type)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- ============================================
+-- Table: change_outbox
+-- Writes other workers must evict from their caches
+-- ============================================
+CREATE TABLE change_outbox (
+    change_id BIGINT PRIMARY KEY AUTO_INCREMENT,
+    entity VARCHAR(32) NOT NULL,
+    entity_id INT,
+    origin VARCHAR(64) NOT NULL,
+    created_at TIMESTAMP(3) DEFAULT CURRENT_TIMESTAMP(3),
+    INDEX idx_created_at (created_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
 -- ============================================